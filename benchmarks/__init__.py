@@ -0,0 +1 @@
+"""Performance benchmarks for polars_expr_transformer (not part of the package)."""
@@ -0,0 +1,196 @@
+"""
+Compile-pipeline benchmark with a per-stage breakdown.
+
+Times every stage of ``build_func`` separately for each formula in the corpus
+(``benchmarks/corpus.py``), writes the medians as JSON and compares them with
+a saved baseline. Any stage that got slower than the tolerance allows makes
+the run exit with status 1.
+
+Baselines are machine specific: regenerate one on the machine you compare on
+with ``--update-baseline`` before relying on the comparison.
+
+Usage:
+    python -m benchmarks.compile_benchmark [--repeat N] [--output results.json]
+        [--baseline benchmarks/compile_baseline.json] [--tolerance 0.25]
+        [--update-baseline]
+"""
+
+import argparse
+import json
+import platform
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import polars as pl
+
+from benchmarks.corpus import CORPUS
+from polars_expr_transformer.process.hierarchy_builder import build_hierarchy
+from polars_expr_transformer.process.interning import intern_tree
+from polars_expr_transformer.process.polars_expr_transformer import finalize_hierarchy
+from polars_expr_transformer.process.process_inline import parse_inline_functions
+from polars_expr_transformer.process.token_classifier import classify_tokens
+from polars_expr_transformer.process.tokenize import lex
+
+STAGES = (
+    "lex",
+    "classify_tokens",
+    "build_hierarchy",
+    "parse_inline_functions",
+    "finalize_hierarchy",
+    "intern",
+    "lowering",
+)
+
+DEFAULT_BASELINE = Path(__file__).with_name("compile_baseline.json")
+
+# Differences below this many seconds are timer noise, whatever the ratio.
+MIN_DELTA = 50e-6
+
+
+def _run_stages(formula: str) -> Dict[str, float]:
+    timings = {}
+
+    def timed(stage, func, *args):
+        start = time.perf_counter()
+        result = func(*args)
+        timings[stage] = time.perf_counter() - start
+        return result
+
+    raw_tokens = timed("lex", lex, formula)
+    tokens = timed("classify_tokens", classify_tokens, raw_tokens)
+    hierarchy = timed("build_hierarchy", build_hierarchy, tokens)
+    timed("parse_inline_functions", parse_inline_functions, hierarchy)
+    func = timed("finalize_hierarchy", finalize_hierarchy, hierarchy)
+    func = timed("intern", intern_tree, func)
+    timed("lowering", func.get_pl_func)
+    return timings
+
+
+def time_stages(formula: str, repeat: int = 50) -> Dict[str, float]:
+    """
+    Time each compile stage for one formula.
+
+    Args:
+        formula: The formula to compile.
+        repeat: How many times to compile it.
+
+    Returns:
+        The median time in seconds per stage, plus their sum as 'total'.
+    """
+    runs = [_run_stages(formula) for _ in range(repeat)]
+    medians = {stage: statistics.median(run[stage] for run in runs) for stage in STAGES}
+    medians["total"] = sum(medians.values())
+    return medians
+
+
+def run_benchmark(repeat: int = 50, corpus: Dict[str, str] = CORPUS) -> dict:
+    """Benchmark every formula of the corpus and return the JSON-ready results."""
+    return {
+        "environment": {
+            "python": platform.python_version(),
+            "polars": pl.__version__,
+            "machine": platform.machine(),
+            "repeat": repeat,
+        },
+        "results": {name: time_stages(formula, repeat) for name, formula in corpus.items()},
+    }
+
+
+def compare(
+    results: dict, baseline: dict, tolerance: float = 0.25
+) -> List[Tuple[str, str, float, float]]:
+    """
+    Find the stages that got slower than the baseline allows.
+
+    Args:
+        results: Output of :func:`run_benchmark`.
+        baseline: A previously saved output of :func:`run_benchmark`.
+        tolerance: Allowed slowdown as a fraction, e.g. 0.25 for 25%.
+
+    Returns:
+        (formula, stage, baseline seconds, current seconds) per regression.
+    """
+    regressions = []
+    for name, stages in results["results"].items():
+        base_stages = baseline["results"].get(name, {})
+        for stage, current in stages.items():
+            base = base_stages.get(stage)
+            if base is None:
+                continue
+            if current > base * (1 + tolerance) and current - base > MIN_DELTA:
+                regressions.append((name, stage, base, current))
+    return regressions
+
+
+def uncompared_stages(results: dict, baseline: dict) -> List[Tuple[str, str]]:
+    """The (formula, stage) pairs of the results that the baseline has no timing for."""
+    return [
+        (name, stage)
+        for name, stages in results["results"].items()
+        for stage in stages
+        if stage not in baseline["results"].get(name, {})
+    ]
+
+
+def _format_table(results: dict) -> str:
+    columns = STAGES + ("total",)
+    lines = [f"{'formula':<22}" + "".join(f"{c[:12]:>14}" for c in columns)]
+    for name, stages in results["results"].items():
+        lines.append(
+            f"{name:<22}" + "".join(f"{stages[c] * 1e3:>12.3f}ms" for c in columns)
+        )
+    return "\n".join(lines)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--output", type=Path, help="Write the results to this JSON file.")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    parser.add_argument(
+        "--update-baseline",
+        action="store_true",
+        help="Overwrite the baseline with this run instead of comparing.",
+    )
+    args = parser.parse_args(argv)
+
+    results = run_benchmark(repeat=args.repeat)
+    print(_format_table(results))
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2) + "\n")
+
+    if args.update_baseline:
+        args.baseline.write_text(json.dumps(results, indent=2) + "\n")
+        print(f"Baseline written to {args.baseline}")
+        return 0
+    if not args.baseline.exists():
+        print(f"No baseline at {args.baseline}; run with --update-baseline first.")
+        return 0
+
+    baseline = json.loads(args.baseline.read_text())
+    missing = uncompared_stages(results, baseline)
+    if missing:
+        print(
+            f"{len(missing)} stage(s) are not in the baseline and were not compared, e.g. "
+            f"{missing[0][0]}/{missing[0][1]}; regenerate it with --update-baseline."
+        )
+    regressions = compare(results, baseline, args.tolerance)
+    for name, stage, base, current in regressions:
+        print(
+            f"REGRESSION {name}/{stage}: {base * 1e3:.3f}ms -> {current * 1e3:.3f}ms "
+            f"({current / base - 1:+.0%})"
+        )
+    if regressions:
+        print(f"{len(regressions)} stage(s) slower than the baseline allows "
+              f"(tolerance {args.tolerance:.0%}).")
+        return 1
+    print("No regressions against the baseline.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
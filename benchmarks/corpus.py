@@ -0,0 +1,49 @@
+"""
+Formula corpus used by the benchmarks.
+
+Each entry is a realistic formula shape that stresses a different part of the
+compile pipeline. The formulas are generated deterministically, so timings are
+comparable between runs and against the saved baseline.
+"""
+
+from typing import Dict
+
+
+def short_column_math() -> str:
+    return "([price] * [quantity] - [discount]) / 100 + [tax]"
+
+
+def if_elseif_mapping(branches: int = 50) -> str:
+    lines = ["if [code] = 0 then \"code_0\""]
+    lines += [f'elseif [code] = {i} then "code_{i}"' for i in range(1, branches)]
+    lines.append('else "unknown" endif')
+    return "\n".join(lines)
+
+
+def deep_nesting(depth: int = 30) -> str:
+    formula = "[name]"
+    for i in range(depth):
+        formula = f"trim(lowercase({formula}))" if i % 2 else f"concat({formula}, \"_\")"
+    return formula
+
+
+def long_string_literals(count: int = 5, length: int = 2000) -> str:
+    parts = [f'"{chr(ord("a") + i) * length}"' for i in range(count)]
+    return f"concat([name], {', '.join(parts)})"
+
+
+def many_comments(lines: int = 40) -> str:
+    body = [
+        f"// step {i}: add the correction factor for bucket {i}\n[value] * {i} +"
+        for i in range(lines)
+    ]
+    return "\n".join(body) + "\n0 // done"
+
+
+CORPUS: Dict[str, str] = {
+    "short_column_math": short_column_math(),
+    "if_elseif_mapping": if_elseif_mapping(),
+    "deep_nesting": deep_nesting(),
+    "long_string_literals": long_string_literals(),
+    "many_comments": many_comments(),
+}
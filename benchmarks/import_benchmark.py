@@ -0,0 +1,113 @@
+"""
+Import-time benchmark.
+
+Measures what ``import polars_expr_transformer`` costs on top of
+``import polars`` in fresh interpreters, which is what short-lived workers and
+serverless handlers pay on every cold start. The run fails (exit status 1) when
+the median exceeds the budget or when a dependency that should only load on
+first use was imported.
+
+``--detail`` prints the package's slowest modules from ``python -X importtime``.
+
+Usage:
+    python -m benchmarks.import_benchmark [--repeat N] [--budget SECONDS] [--detail]
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+# Median seconds the package may add to the import of polars itself.
+IMPORT_BUDGET = 0.05
+
+# Heavy dependencies that only specific functions need.
+LAZY_MODULES = ("polars_ds", "pydantic")
+
+_MEASURE = """
+import json, sys, time
+import polars
+start = time.perf_counter()
+import polars_expr_transformer
+seconds = time.perf_counter() - start
+print(json.dumps({"seconds": seconds, "loaded": [m for m in %r if m in sys.modules]}))
+""" % (LAZY_MODULES,)
+
+
+def measure_once() -> Dict:
+    """Import the package in a fresh interpreter and report the time and lazy modules loaded."""
+    output = subprocess.run(
+        [sys.executable, "-c", _MEASURE], capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def run_benchmark(repeat: int = 10) -> Dict:
+    """
+    Measure the package import time in ``repeat`` fresh interpreters.
+
+    Returns:
+        The median and minimum seconds, and the lazy modules that were loaded.
+    """
+    runs = [measure_once() for _ in range(repeat)]
+    times = [run["seconds"] for run in runs]
+    return {
+        "median": statistics.median(times),
+        "min": min(times),
+        "eagerly_loaded": sorted({m for run in runs for m in run["loaded"]}),
+    }
+
+
+def slowest_modules(limit: int = 15) -> List[Tuple[str, float]]:
+    """The package's modules with the largest self import time, from ``-X importtime``."""
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import polars; import polars_expr_transformer"],
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stderr
+    seen_polars = set()
+    timings = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        self_us, _, name = (part.strip() for part in line.split(":", 1)[1].split("|"))
+        if not self_us.isdigit():
+            continue
+        timings.append((name, int(self_us) / 1e6))
+        if name == "polars":
+            seen_polars = {n for n, _ in timings}
+    package = [(name, seconds) for name, seconds in timings if name not in seen_polars]
+    return sorted(package, key=lambda item: item[1], reverse=True)[:limit]
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--budget", type=float, default=IMPORT_BUDGET)
+    parser.add_argument("--detail", action="store_true")
+    args = parser.parse_args(argv)
+
+    results = run_benchmark(args.repeat)
+    print(
+        f"import polars_expr_transformer (after polars): median {results['median'] * 1e3:.1f}ms, "
+        f"min {results['min'] * 1e3:.1f}ms, budget {args.budget * 1e3:.0f}ms"
+    )
+    if args.detail:
+        for name, seconds in slowest_modules():
+            print(f"{seconds * 1e3:>8.2f}ms  {name}")
+
+    failed = False
+    if results["eagerly_loaded"]:
+        print(f"Loaded at import, but should load on first use: {', '.join(results['eagerly_loaded'])}")
+        failed = True
+    if results["median"] > args.budget:
+        print("Import time is over budget.")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,320 @@
+"""
+Runtime benchmark: generated expressions vs. hand-written Polars.
+
+Pairs every formula function with the expression a Polars user would write by
+hand for the same result, runs both on a large synthetic frame and flags the
+functions whose generated expression is more than the threshold slower.
+
+Usage:
+    python -m benchmarks.runtime_benchmark [--rows 10000000] [--repeat 3]
+        [--threshold 0.2] [--only repeat,to_boolean] [--output results.json]
+"""
+
+import argparse
+import datetime
+import json
+import statistics
+import sys
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import polars as pl
+import polars_ds as pds
+
+from polars_expr_transformer import simple_function_to_expr
+from polars_expr_transformer.lookup_tables import register_lookup_table, unregister_lookup_table
+
+_WORDS = [" Alpha", "banana ", "Cherry", "data-lake", "eagle", "  fox", "grape", "ha"]
+
+# Every word of the txt column mapped to its length, for the lookup case.
+_WORD_LENGTHS = pl.DataFrame({"word": _WORDS, "length": [len(word) for word in _WORDS]})
+
+# Name -> (formula, hand-written reference expression).
+CASES: Dict[str, Tuple[str, pl.Expr]] = {
+    "abs": ("abs([num])", pl.col("num").abs()),
+    "acos": ("acos([ratio])", pl.col("ratio").arccos()),
+    "add_days": ("add_days([ts], 5)", pl.col("ts") + pl.duration(days=5)),
+    "add_hours": ("add_hours([ts], 3)", pl.col("ts") + pl.duration(hours=3)),
+    "add_minutes": ("add_minutes([ts], 15)", pl.col("ts") + pl.duration(minutes=15)),
+    "add_months": ("add_months([ts], 2)", pl.col("ts").dt.offset_by("2mo")),
+    "add_seconds": ("add_seconds([ts], 30)", pl.col("ts") + pl.duration(seconds=30)),
+    "add_weeks": ("add_weeks([ts], 2)", pl.col("ts") + pl.duration(weeks=2)),
+    "add_years": ("add_years([ts], 1)", pl.col("ts") + pl.duration(days=365)),
+    "asin": ("asin([ratio])", pl.col("ratio").arcsin()),
+    "atan": ("atan([ratio])", pl.col("ratio").arctan()),
+    "avg": ("avg([num]) over([txt])", pl.col("num").mean().over("txt")),
+    "avgif": ("avgif([num], [int] > 0) over([txt])", pl.col("num").filter(pl.col("int") > 0).mean().over("txt")),
+    "between": ("between([num], 1, 2)", pl.col("num").is_between(1, 2)),
+    "ceil": ("ceil([num])", pl.col("num").ceil()),
+    "coalesce": ("coalesce([num_null], 0)", pl.col("num_null").fill_null(0)),
+    "concat": (
+        'concat([txt], " ", [txt2])',
+        pl.concat_str([pl.col("txt"), pl.lit(" "), pl.col("txt2")]),
+    ),
+    "contains": ('contains([txt], "a")', pl.col("txt").str.contains("a", literal=True)),
+    "cos": ("cos([num])", pl.col("num").cos()),
+    "count": ("count([num_null]) over([txt])", pl.col("num_null").count().over("txt")),
+    "count_match": (
+        'count_match([txt], "a")',
+        pl.col("txt").str.count_matches("a", literal=True),
+    ),
+    "countif": ("countif([int] > 0) over([txt])", (pl.col("int") > 0).sum().over("txt")),
+    "cumsum": ("cumsum([int]) over([txt])", pl.col("int").cum_sum().over("txt")),
+    "date_diff_days": (
+        "date_diff_days([ts], [ts2])",
+        (pl.col("ts") - pl.col("ts2")).dt.total_days(),
+    ),
+    "date_trim": ('date_trim([ts], "day")', pl.col("ts").dt.truncate("1d")),
+    "date_truncate": ('date_truncate([ts], "1d")', pl.col("ts").dt.truncate("1d")),
+    "datetime_diff_nanoseconds": (
+        "datetime_diff_nanoseconds([ts], [ts2])",
+        (pl.col("ts") - pl.col("ts2")).dt.total_nanoseconds(),
+    ),
+    "datetime_diff_seconds": (
+        "datetime_diff_seconds([ts], [ts2])",
+        (pl.col("ts") - pl.col("ts2")).dt.total_seconds(),
+    ),
+    "day": ("day([ts])", pl.col("ts").dt.day()),
+    "dayofweek": ("dayofweek([ts])", pl.col("ts").dt.weekday()),
+    "dayofyear": ("dayofyear([ts])", pl.col("ts").dt.ordinal_day()),
+    "does_not_equal": ('does_not_equal([txt], "a")', pl.col("txt") != "a"),
+    "end_of_month": ("end_of_month([ts])", pl.col("ts").dt.month_end()),
+    "ends_with": ('ends_with([txt], "a")', pl.col("txt").str.ends_with("a")),
+    "equals": ('equals([txt], "a")', pl.col("txt") == "a"),
+    "exp": ("exp([num])", pl.col("num").exp()),
+    "find_position": (
+        'find_position([txt], "a")',
+        pl.col("txt").str.find("a", literal=True),
+    ),
+    "floor": ("floor([num])", pl.col("num").floor()),
+    "format_date": ('format_date([ts], "%Y")', pl.col("ts").dt.strftime("%Y")),
+    "greatest": ("greatest([num], 1)", pl.col("num").clip(lower_bound=1)),
+    "hour": ("hour([ts])", pl.col("ts").dt.hour()),
+    "ifnull": ("ifnull([num_null], 0)", pl.col("num_null").fill_null(0)),
+    "is_empty": ("is_empty([num_null])", pl.col("num_null").is_null()),
+    "is_not_empty": ("is_not_empty([num_null])", pl.col("num_null").is_not_null()),
+    "is_string": ('is_string("a")', pl.lit(True)),
+    "lag": ("lag([num], 2) over([txt])", pl.col("num").shift(2).over("txt")),
+    "lead": ("lead([num])", pl.col("num").shift(-1)),
+    "least": ("least([num], 1)", pl.col("num").clip(upper_bound=1)),
+    "left": ("left([txt], 2)", pl.col("txt").str.head(2)),
+    "left_trim": ("left_trim([txt])", pl.col("txt").str.strip_chars_start()),
+    "length": ("length([txt])", pl.col("txt").str.len_chars()),
+    "log": ("log([pos])", pl.col("pos").log()),
+    "log10": ("log10([pos])", pl.col("pos").log10()),
+    "log2": ("log2([pos])", pl.col("pos").log(2)),
+    "lookup": (
+        'lookup([txt], "word_lengths", "length")',
+        pl.col("txt").replace_strict(_WORD_LENGTHS["word"], _WORD_LENGTHS["length"], default=None),
+    ),
+    "lowercase": ("lowercase([txt])", pl.col("txt").str.to_lowercase()),
+    "max": ("max([num]) over([txt])", pl.col("num").max().over("txt")),
+    "mid": ("mid([txt], 1, 2)", pl.col("txt").str.slice(1, 2)),
+    "min": ("min([num]) over([txt])", pl.col("num").min().over("txt")),
+    "minute": ("minute([ts])", pl.col("ts").dt.minute()),
+    "mod": ("mod([int], 7)", pl.col("int") % 7),
+    "month": ("month([ts])", pl.col("ts").dt.month()),
+    "negation": ("-[num]", -pl.col("num")),
+    "negative": ("negative()", pl.lit(-1)),
+    "now": ("now()", pl.lit(datetime.datetime.now())),
+    "nullif": ('nullif([txt], "a")', pl.when(pl.col("txt") != "a").then(pl.col("txt"))),
+    "nvl": ("nvl([num_null], 0)", pl.col("num_null").fill_null(0)),
+    "order_by": ("cumsum([int]) over([txt]) order_by([ts2])", pl.col("int").cum_sum().over("txt", order_by="ts2")),
+    "over": ("[num] / sum([num]) over([txt])", pl.col("num") / pl.col("num").sum().over("txt")),
+    "pad_left": ('pad_left([txt], 8, "0")', pl.col("txt").str.pad_start(8, "0")),
+    "pad_right": ('pad_right([txt], 8, "0")', pl.col("txt").str.pad_end(8, "0")),
+    "pct_change": ("pct_change([pos]) order_by([ts2])", pl.col("pos").pct_change().over(order_by="ts2")),
+    "pow": ("pow([num], 2)", pl.col("num").pow(2)),
+    "power": ("power([num], 2)", pl.col("num").pow(2)),
+    "quarter": ("quarter([ts])", pl.col("ts").dt.quarter()),
+    "random_int": (
+        "random_int(1, 100)",
+        pl.int_range(1, 100).sample(n=pl.len(), with_replacement=True),
+    ),
+    "rank": ("rank([num], true) over([txt])", pl.col("num").rank("min", descending=True).over("txt")),
+    "repeat": ("repeat([txt], 3)", pl.concat_str([pl.col("txt")] * 3)),
+    "replace": (
+        'replace([txt], "a", "b")',
+        pl.col("txt").str.replace_all("a", "b", literal=True),
+    ),
+    "reverse": ("reverse([txt])", pl.col("txt").str.reverse()),
+    "right": ("right([txt], 2)", pl.col("txt").str.tail(2)),
+    "right_trim": ("right_trim([txt])", pl.col("txt").str.strip_chars_end()),
+    "rolling_max": ("rolling_max([num], 5)", pl.col("num").rolling_max(5)),
+    "rolling_mean": ("rolling_mean([num], 7) over([txt])", pl.col("num").rolling_mean(7).over("txt")),
+    "rolling_min": ("rolling_min([num], 5)", pl.col("num").rolling_min(5)),
+    "rolling_sum": ("rolling_sum([num], 5)", pl.col("num").rolling_sum(5)),
+    "round": ("round([num], 1)", pl.col("num").round(1)),
+    "row_number": ("row_number() over([txt])", (pl.int_range(pl.len(), dtype=pl.UInt32) + 1).over("txt")),
+    "second": ("second([ts])", pl.col("ts").dt.second()),
+    "sign": ("sign([num])", pl.col("num").sign()),
+    "sin": ("sin([num])", pl.col("num").sin()),
+    "split": ('split([txt], "a")', pl.col("txt").str.split("a")),
+    "sqrt": ("sqrt([pos])", pl.col("pos").sqrt()),
+    "start_of_month": ("start_of_month([ts])", pl.col("ts").dt.month_start()),
+    "starts_with": ('starts_with([txt], "a")', pl.col("txt").str.starts_with("a")),
+    "string_similarity": (
+        'string_similarity([txt], [txt2], "levenshtein")',
+        pds.str_leven(pl.col("txt"), pl.col("txt2"), return_sim=True),
+    ),
+    "substring": ("substring([txt], 1, 2)", pl.col("txt").str.slice(1, 2)),
+    "sum": ("sum([num]) over([txt])", pl.col("num").sum().over("txt")),
+    "sumif": ("sumif([num], [int] > 0) over([txt])", pl.col("num").filter(pl.col("int") > 0).sum().over("txt")),
+    "tan": ("tan([num])", pl.col("num").tan()),
+    "tanh": ("tanh([num])", pl.col("num").tanh()),
+    "titlecase": ("titlecase([txt])", pl.col("txt").str.to_titlecase()),
+    "to_boolean": ("to_boolean([num])", pl.col("num") != 0),
+    "to_date": (
+        "to_date([date_txt])",
+        pl.col("date_txt").str.to_date("%Y-%m-%d", strict=False),
+    ),
+    "to_datetime": (
+        'to_datetime([date_txt], "%Y-%m-%d")',
+        pl.col("date_txt").str.to_datetime("%Y-%m-%d", strict=False),
+    ),
+    "to_decimal": ("to_decimal([num], 2)", pl.col("num").round(2)),
+    "to_float": ("to_float([int])", pl.col("int").cast(pl.Float64)),
+    "to_integer": ("to_integer([num])", pl.col("num").cast(pl.Int64)),
+    "to_number": ("to_number([int])", pl.col("int").cast(pl.Float64)),
+    "to_string": ("to_string([int])", pl.col("int").cast(pl.String)),
+    "today": ("today()", pl.lit(datetime.datetime.today())),
+    "trim": ("trim([txt])", pl.col("txt").str.strip_chars()),
+    "uppercase": ("uppercase([txt])", pl.col("txt").str.to_uppercase()),
+    "week": ("week([ts])", pl.col("ts").dt.week()),
+    "weekday": ("weekday([ts])", pl.col("ts").dt.weekday()),
+    "year": ("year([ts])", pl.col("ts").dt.year()),
+}
+
+# Functions whose results differ between two evaluations by design.
+NONDETERMINISTIC = {"now", "today", "random_int"}
+
+# Differences below this many seconds are timer noise, whatever the ratio.
+MIN_DELTA = 1e-3
+
+
+def make_frame(rows: int) -> pl.DataFrame:
+    """Build a deterministic synthetic frame with every column the cases use."""
+    i = pl.int_range(rows, dtype=pl.Int64)
+    words = pl.Series(_WORDS)
+    return pl.select(
+        ((i * 7919) % 2000 - 1000).alias("int"),
+        (((i * 7919) % 2000 - 1000) / 7).alias("num"),
+        (((i * 104729) % 1000 + 1) / 10).alias("pos"),
+        ((i % 1000) / 1000).alias("ratio"),
+        pl.when(i % 10 == 0).then(None).otherwise(i / 3).alias("num_null"),
+        words.gather(i % len(_WORDS)).alias("txt"),
+        words.gather((i * 3 + 1) % len(_WORDS)).alias("txt2"),
+        (pl.date(2020, 1, 1) + pl.duration(days=i % 2000)).dt.strftime("%Y-%m-%d").alias("date_txt"),
+        (pl.datetime(2020, 1, 1) + pl.duration(minutes=i * 37)).alias("ts"),
+        (pl.datetime(2019, 6, 1) + pl.duration(minutes=i * 11)).alias("ts2"),
+    )
+
+
+def _time(df: pl.DataFrame, expr: pl.Expr, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        df.lazy().select(expr.alias("out")).collect()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+@contextmanager
+def lookup_tables() -> Iterator[None]:
+    """Register the lookup tables the cases use, for the duration of the block."""
+    register_lookup_table("word_lengths", _WORD_LENGTHS)
+    try:
+        yield
+    finally:
+        unregister_lookup_table("word_lengths")
+
+
+def results_match(df: pl.DataFrame, name: str) -> bool:
+    """Whether the generated and the reference expression agree on ``df``."""
+    formula, reference = CASES[name]
+    # Selecting both at once broadcasts literal results to the frame's height.
+    with lookup_tables():
+        out = df.select(
+            simple_function_to_expr(formula).alias("generated"),
+            reference.alias("reference"),
+        )
+    generated, expected = out["generated"], out["reference"]
+    if generated.dtype.is_numeric() and expected.dtype.is_numeric():
+        generated, expected = generated.cast(pl.Float64), expected.cast(pl.Float64)
+    return generated.equals(expected, check_names=False, check_dtypes=False)
+
+
+def run_benchmark(
+    rows: int = 10_000_000, repeat: int = 3, only: Optional[List[str]] = None
+) -> dict:
+    """
+    Time every case on a synthetic frame.
+
+    Args:
+        rows: Number of rows of the synthetic frame.
+        repeat: Timed runs per expression; the median is reported.
+        only: Restrict the run to these function names.
+
+    Returns:
+        Per function: the generated and reference time in seconds and their ratio.
+    """
+    df = make_frame(rows)
+    results = {}
+    for name in only or CASES:
+        formula, reference = CASES[name]
+        with lookup_tables():
+            expr = simple_function_to_expr(formula)
+        generated = _time(df, expr, repeat)
+        hand_written = _time(df, reference, repeat)
+        results[name] = {
+            "formula": formula,
+            "generated": generated,
+            "reference": hand_written,
+            "ratio": generated / hand_written if hand_written else float("inf"),
+        }
+    return {"rows": rows, "repeat": repeat, "results": results}
+
+
+def find_slowdowns(results: dict, threshold: float = 0.2) -> List[str]:
+    """Names of the functions whose generated expression is too slow."""
+    return [
+        name
+        for name, timing in results["results"].items()
+        if timing["ratio"] > 1 + threshold
+        and timing["generated"] - timing["reference"] > MIN_DELTA
+    ]
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--threshold", type=float, default=0.2)
+    parser.add_argument("--only", help="Comma-separated function names to run.")
+    parser.add_argument("--output", type=Path, help="Write the results to this JSON file.")
+    args = parser.parse_args(argv)
+
+    only = args.only.split(",") if args.only else None
+    results = run_benchmark(rows=args.rows, repeat=args.repeat, only=only)
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2) + "\n")
+
+    slow = set(find_slowdowns(results, args.threshold))
+    print(f"{'function':<28}{'generated':>12}{'reference':>12}{'ratio':>8}")
+    for name, timing in results["results"].items():
+        print(
+            f"{name:<28}{timing['generated'] * 1e3:>10.1f}ms"
+            f"{timing['reference'] * 1e3:>10.1f}ms{timing['ratio']:>8.2f}"
+            + ("  SLOW" if name in slow else "")
+        )
+    if slow:
+        print(f"{len(slow)} function(s) more than {args.threshold:.0%} slower "
+              f"than hand-written Polars: {', '.join(sorted(slow))}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
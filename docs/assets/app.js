@@ -418,7 +418,7 @@ async function bootRuntime(wheelPath) {
     state.pyodide = pyodide;
 
     setRuntimeStatus("Loading Polars (about 15 MB on first visit, cached afterwards)…");
-    await pyodide.loadPackage(["micropip", "polars", "pydantic"]);
+    await pyodide.loadPackage(["micropip", "polars"]);
 
     setRuntimeStatus("Installing <code>polars-expr-transformer</code>…");
     const wheelUrl = new URL(`assets/${wheelPath}`, window.location.href).href;
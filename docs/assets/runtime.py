@@ -44,15 +44,16 @@ if "polars_ds" not in sys.modules:
     sys.modules["polars_ds"] = _pds
 
 import polars as pl  # noqa: E402
-from polars_expr_transformer import simple_function_to_expr  # noqa: E402
-from polars_expr_transformer.process.polars_expr_transformer import (  # noqa: E402
-    to_flowframe_code,
-    to_polars_code,
-)
+from polars_expr_transformer.incremental import IncrementalParser  # noqa: E402
 
 RESULT_COLUMN = "result"
 MAX_ERROR_LENGTH = 600
 
+# The playground re-runs on every pause in typing; the parser keeps the
+# subtrees of the previous expression, so only the edited call or if block
+# is parsed again.
+_parser = IncrementalParser()
+
 
 def _build_df(spec):
     """Build a DataFrame from a {"columns": [{name, dtype, values}]} spec."""
@@ -132,7 +133,8 @@ def run_expression(payload_json: str) -> str:
     out = {"ok": False, "error": None, "stage": None}
 
     try:
-        expr = simple_function_to_expr(expr_str)
+        func = _parser.update(expr_str)
+        expr = func.get_pl_func()
     except Exception as exc:  # parse failure
         out["error"] = _clean_error(exc)
         out["stage"] = "parse"
@@ -141,8 +143,8 @@ def run_expression(payload_json: str) -> str:
     # Code generation is independent of execution: the generated source is
     # shown even when the expression cannot run on the chosen dataset.
     try:
-        out["polars_code"] = to_polars_code(expr_str, validate=False)
-        out["flowframe_code"] = to_flowframe_code(expr_str, validate=False)
+        out["polars_code"] = func.to_polars_code()
+        out["flowframe_code"] = func.to_polars_code(prefix="ff")
     except Exception as exc:
         out["codegen_error"] = _clean_error(exc)
 
@@ -0,0 +1,74 @@
+"""Generate the static function registry.
+
+Introspects every function defined in the function modules and writes their
+names, categories and arities to
+``polars_expr_transformer/funcs/registry_data.py``. The package reads that
+module at import time instead of importing and merging the function modules,
+which keeps startup cheap, notably in Pyodide and serverless handlers.
+
+Run it after adding, removing or changing the signature of a function;
+``tests/test_registry.py`` fails while the generated module is out of date.
+
+Usage:
+    python generate_registry.py [output_path]
+"""
+
+import importlib
+import inspect
+import sys
+from pathlib import Path
+
+from polars_expr_transformer.funcs.registry import CATEGORY_MODULES
+
+DEFAULT_OUTPUT = Path(__file__).parent / "polars_expr_transformer" / "funcs" / "registry_data.py"
+
+HEADER = '''"""
+Static function registry: name -> (category, min_args, max_args).
+
+Generated by generate_registry.py from the function modules; do not edit.
+max_args is None for functions that take ``*args``.
+"""
+
+FUNCTIONS = {
+'''
+
+_POSITIONAL = (inspect.Parameter.POSITIONAL_ONLY, inspect.Parameter.POSITIONAL_OR_KEYWORD)
+
+
+def arity(func) -> tuple:
+    """The (minimum, maximum) number of positional arguments, maximum None for *args."""
+    parameters = inspect.signature(func).parameters.values()
+    if any(p.kind == inspect.Parameter.VAR_POSITIONAL for p in parameters):
+        max_args = None
+    else:
+        max_args = sum(p.kind in _POSITIONAL for p in parameters)
+    min_args = sum(p.kind in _POSITIONAL and p.default is p.empty for p in parameters)
+    return min_args, max_args
+
+
+def build_registry() -> dict:
+    """Every function defined in the function modules, in definition order."""
+    registry = {}
+    for category, module_path in CATEGORY_MODULES.items():
+        module = importlib.import_module(module_path)
+        for name, func in module.__dict__.items():
+            if callable(func) and inspect.getmodule(func) is module:
+                registry[name] = (category, *arity(func))
+    return registry
+
+
+def render(registry: dict) -> str:
+    """The source of the registry_data module."""
+    lines = [f"    {name!r}: {info!r}," for name, info in registry.items()]
+    return HEADER + "\n".join(lines) + "\n}\n"
+
+
+def main() -> None:
+    output = Path(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_OUTPUT
+    registry = build_registry()
+    output.write_text(render(registry))
+    print(f"Wrote {len(registry)} functions to {output}")
+
+
+if __name__ == "__main__":
+    main()
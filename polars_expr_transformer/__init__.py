@@ -24,6 +24,13 @@ Example:
 Functions:
     simple_function_to_expr: Convert a string expression to a Polars expression.
     build_func: Build a Func object for inspection/debugging.
+    template_function_to_expr: Apply one [$col] formula to many columns.
+    prepare: Parse a formula with :name parameters once, bind values later.
+    compile_filter: Compile a filter formula into pushdown-friendly predicates.
+    compile_aggregate: Compile an aggregate formula into a group_by().agg() plan.
+    estimate_cost: Estimate the size and evaluation cost of a parsed formula.
+    check: Report every problem of a formula without compiling it.
+    apply_formula_column: Evaluate a column that stores one formula per row.
     get_all_expressions: Get a list of all available function names.
     get_expression_overview: Get functions grouped by category with descriptions.
 """
@@ -33,20 +40,51 @@ from polars_expr_transformer.main_module import (
     simple_function_to_expr,
     to_polars_code,
     to_flowframe_code,
+    template_function_to_expr,
+    prepare,
+    PreparedFormula,
+    compile_filter,
+    FilterPlan,
+    compile_aggregate,
+    AggregatePlan,
+    CostLimits,
+    estimate_cost,
+    check,
+    Diagnostic,
+    apply_formula_column,
 )
 from polars_expr_transformer.function_overview import (
     get_all_expressions,
     get_expression_overview,
 )
-from polars_expr_transformer.exceptions import ExpressionSyntaxError, PolarsCodeGenError
+from polars_expr_transformer.exceptions import (
+    ExpressionSyntaxError,
+    ParameterBindingError,
+    PolarsCodeGenError,
+    FormulaTooComplexError,
+)
 
 __all__ = [
     "simple_function_to_expr",
     "build_func",
     "to_polars_code",
     "to_flowframe_code",
+    "template_function_to_expr",
+    "prepare",
+    "PreparedFormula",
+    "compile_filter",
+    "FilterPlan",
+    "compile_aggregate",
+    "AggregatePlan",
+    "CostLimits",
+    "estimate_cost",
+    "check",
+    "Diagnostic",
+    "apply_formula_column",
     "get_all_expressions",
     "get_expression_overview",
     "ExpressionSyntaxError",
     "PolarsCodeGenError",
+    "ParameterBindingError",
+    "FormulaTooComplexError",
 ]
@@ -0,0 +1,155 @@
+"""
+Asyncio-friendly compilation.
+
+Compiling a formula is CPU-bound, so calling ``simple_function_to_expr`` from a
+coroutine blocks the event loop for as long as the compile takes.
+:func:`compile_async` runs the compile on an executor instead and:
+
+- coalesces identical in-flight requests, so many concurrent requests for the
+  same formula compile it once and all receive the result,
+- bounds the number of compiles running at once per event loop, so a burst of
+  requests queues instead of saturating the executor.
+
+The executor and the concurrency bound are set with :func:`configure`. By
+default compiles run on the event loop's default thread pool. A
+``ProcessPoolExecutor`` also works, since Polars expressions can be pickled.
+
+Example:
+    >>> from polars_expr_transformer.async_compile import compile_async, compile_many_async
+    >>> expr = await compile_async('[price] * [qty]')
+    >>> exprs = await compile_many_async(['[a] + 1', 'uppercase([b])'])
+"""
+
+import asyncio
+import os
+import weakref
+from concurrent.futures import Executor
+from typing import Dict, Hashable, Iterable, List, Optional, Tuple
+
+import polars as pl
+
+from polars_expr_transformer.process.cost_model import CostLimits
+from polars_expr_transformer.process.polars_expr_transformer import (
+    simple_function_to_expr,
+)
+
+DEFAULT_MAX_CONCURRENCY = os.cpu_count() or 4
+
+_executor: Optional[Executor] = None
+_max_concurrency: int = DEFAULT_MAX_CONCURRENCY
+
+
+class _LoopState:
+    """Semaphore and in-flight compiles of one event loop."""
+
+    def __init__(self, max_concurrency: int):
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        self.in_flight: Dict[Hashable, asyncio.Task] = {}
+
+
+# Futures and semaphores belong to one event loop, so each loop gets its own.
+_loop_states: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _LoopState]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def configure(
+    executor: Optional[Executor] = None,
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+) -> None:
+    """
+    Set where and how many compiles run at once.
+
+    Args:
+        executor: The thread or process pool to compile on. None uses the
+            event loop's default executor.
+        max_concurrency: Maximum number of compiles running at once per event
+            loop; further requests wait for a free slot.
+
+    Raises:
+        ValueError: If max_concurrency is smaller than 1.
+    """
+    global _executor, _max_concurrency
+    if max_concurrency < 1:
+        raise ValueError(f"max_concurrency must be at least 1, got {max_concurrency}.")
+    _executor = executor
+    _max_concurrency = max_concurrency
+    _loop_states.clear()
+
+
+def _get_loop_state(loop: asyncio.AbstractEventLoop) -> _LoopState:
+    state = _loop_states.get(loop)
+    if state is None:
+        state = _loop_states[loop] = _LoopState(_max_concurrency)
+    return state
+
+
+def _compile(func_str: str, limits: Optional[CostLimits]) -> pl.Expr:
+    # Module level so it can be sent to a process pool.
+    return simple_function_to_expr(func_str, limits)
+
+
+async def _run_compile(
+    state: _LoopState, key: Tuple[str, Optional[CostLimits]]
+) -> pl.Expr:
+    try:
+        async with state.semaphore:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(_executor, _compile, *key)
+    finally:
+        state.in_flight.pop(key, None)
+
+
+async def compile_async(func_str: str, limits: Optional[CostLimits] = None) -> pl.Expr:
+    """
+    Convert a string expression to a Polars expression without blocking the loop.
+
+    Args:
+        func_str: The string expression to convert.
+        limits: Optional complexity budget, see ``CostLimits``.
+
+    Returns:
+        The Polars expression, as ``simple_function_to_expr`` would return it.
+
+    Raises:
+        ExpressionSyntaxError: If the expression syntax is invalid.
+        FormulaTooComplexError: If the formula exceeds ``limits``.
+    """
+    state = _get_loop_state(asyncio.get_running_loop())
+    key = (func_str, limits)
+    task = state.in_flight.get(key)
+    if task is None:
+        task = state.in_flight[key] = asyncio.ensure_future(_run_compile(state, key))
+    # Shielded, so one cancelled caller does not cancel the compile for the others.
+    return await asyncio.shield(task)
+
+
+async def compile_many_async(
+    func_strs: Iterable[str],
+    limits: Optional[CostLimits] = None,
+    return_exceptions: bool = False,
+) -> List[pl.Expr]:
+    """
+    Compile several formulas concurrently, within the configured bound.
+
+    Duplicate formulas are compiled once.
+
+    Args:
+        func_strs: The string expressions to convert.
+        limits: Optional complexity budget applied to every formula.
+        return_exceptions: Return the exception of a failed formula in its
+            place instead of raising it.
+
+    Returns:
+        The Polars expressions, in the order of ``func_strs``.
+
+    Raises:
+        ExpressionSyntaxError: If a formula is invalid and return_exceptions
+            is False.
+    """
+    return list(
+        await asyncio.gather(
+            *(compile_async(func_str, limits) for func_str in func_strs),
+            return_exceptions=return_exceptions,
+        )
+    )
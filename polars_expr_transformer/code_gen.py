@@ -8,6 +8,11 @@ The ``prefix`` parameter (default ``"pl"``) controls the library qualifier used
 in the generated code.  Pass ``"ff"`` to emit FlowFrame code instead.
 """
 
+from ast import literal_eval
+
+from polars_expr_transformer.exceptions import ParameterBindingError
+from polars_expr_transformer.funcs.special_funcs import bound_parameters
+
 # Reverse mapping from internal operator names to Python operator symbols
 OPERATOR_SYMBOLS = {
     "pl.Expr.add": "+",
@@ -84,13 +89,38 @@ def _strip_pl_lit(code_str: str, prefix: str = "pl") -> str:
         'pl.lit(2)' -> '2'
         'pl.lit("x")' -> '"x"'
         '42' -> '42'  (no-op if not wrapped)
+        'pl.lit(1).neg()' -> 'pl.lit(1).neg()'  (no-op unless one literal is wrapped)
     """
     wrapper = f"{prefix}.lit("
     if code_str.startswith(wrapper) and code_str.endswith(")"):
-        return code_str[len(wrapper) : -1]
+        inner = code_str[len(wrapper) : -1]
+        try:
+            literal_eval(inner)
+        except (ValueError, SyntaxError):
+            return code_str
+        return inner
+    return code_str
+
+
+def _negatable(code_str: str) -> str:
+    """The code, parenthesised unless it is a literal, so a leading '-' negates all of it."""
+    try:
+        literal_eval(code_str)
+    except (ValueError, SyntaxError):
+        return f"({code_str})"
     return code_str
 
 
+def _over(args, prefix="pl"):
+    """Code for a window; the order keys arrive rendered as ``order_by=[...]``."""
+    keys = [a for a in args[1:] if not a.startswith("order_by=")]
+    order = [a for a in args[1:] if a.startswith("order_by=")]
+    params = [f"[{', '.join(keys)}]"] if keys else []
+    if not params and not order:
+        return args[0]
+    return f"{args[0]}.over({', '.join(params + order[-1:])})"
+
+
 # Maps function names to code generation functions.
 # Each function takes a list of argument code strings and an optional prefix,
 # and returns the generated code string.
@@ -191,7 +221,11 @@ FUNCTION_CODE_GEN = {
     "least": _top_level_list("min_horizontal"),
     "_not": _method_chain("not_()"),
     "not": _method_chain("not_()"),
-    "_in": _template("{1}.str.contains({0})"),
+    "_in": lambda args, prefix="pl": (
+        f"{args[0]}.is_in({prefix}.lit({args[1]}).implode())"
+        if args[1].startswith(f"{prefix}.Series(")
+        else f"{args[1]}.str.contains({args[0]})"
+    ),
     "is_string": lambda args, prefix="pl": (
         f"{prefix}.lit({args[0]}.dtype == {prefix}.Utf8)"
     ),
@@ -208,6 +242,41 @@ FUNCTION_CODE_GEN = {
         if len(args) > 1
         else f"{args[0]}.cast({prefix}.Float64)"
     ),
+    # Aggregates and windows
+    "sum": _method_chain("sum()"),
+    "avg": _method_chain("mean()"),
+    "count": lambda args, prefix="pl": f"{args[0]}.count()" if args else f"{prefix}.len()",
+    "min": _method_chain("min()"),
+    "max": _method_chain("max()"),
+    "sumif": _template("{0}.filter({1}).sum()"),
+    "countif": _method_chain("sum()"),
+    "avgif": _template("{0}.filter({1}).mean()"),
+    "rank": lambda args, prefix="pl": (
+        f'{args[0]}.rank(method="min", descending={_strip_pl_lit(args[1], prefix)})'
+        if len(args) > 1
+        else f'{args[0]}.rank(method="min")'
+    ),
+    "row_number": lambda args, prefix="pl": f"({prefix}.int_range({prefix}.len(), dtype={prefix}.UInt32) + 1)",
+    "lag": lambda args, prefix="pl": (
+        f"{args[0]}.shift({_strip_pl_lit(args[1], prefix) if len(args) > 1 else 1})"
+    ),
+    "lead": lambda args, prefix="pl": (
+        f"{args[0]}.shift(-{_negatable(_strip_pl_lit(args[1], prefix)) if len(args) > 1 else 1})"
+    ),
+    "cumsum": _method_chain("cum_sum()"),
+    "rolling_sum": lambda args, prefix="pl": f"{args[0]}.rolling_sum({_strip_pl_lit(args[1], prefix)})",
+    "rolling_mean": lambda args, prefix="pl": f"{args[0]}.rolling_mean({_strip_pl_lit(args[1], prefix)})",
+    "rolling_min": lambda args, prefix="pl": f"{args[0]}.rolling_min({_strip_pl_lit(args[1], prefix)})",
+    "rolling_max": lambda args, prefix="pl": f"{args[0]}.rolling_max({_strip_pl_lit(args[1], prefix)})",
+    "pct_change": lambda args, prefix="pl": (
+        f"{args[0]}.pct_change({_strip_pl_lit(args[1], prefix) if len(args) > 1 else 1})"
+    ),
+    "over": _over,
+    "order_by": lambda args, prefix="pl": f"order_by=[{', '.join(args)}]",
+    # Lookup tables, resolved by name from polars_expr_transformer.lookup_tables
+    "lookup": lambda args, prefix="pl": (
+        f"lookup_table({_strip_pl_lit(args[1], prefix)}).map({args[0]}, {_strip_pl_lit(args[2], prefix)})"
+    ),
     # Special
     "random_int": _template(
         "pl.int_range({0}, {1}).sample(n=pl.len(), with_replacement=True)"
@@ -235,3 +304,22 @@ def format_pl_literal(val_str, val_type, prefix="pl"):
         return f"{prefix}.lit({val_str})"
     else:
         return f"{prefix}.lit({val_str})"
+
+
+def format_bound_parameter(name, prefix="pl"):
+    """Format the value bound to a :name parameter as a literal code string.
+
+    Args:
+        name: The parameter name, without the leading colon.
+        prefix: The library prefix to use (default 'pl')
+
+    Returns:
+        A string like 'pl.lit(1000)' or "pl.lit('EU')"
+
+    Raises:
+        ParameterBindingError: If no value is bound to the parameter.
+    """
+    params = bound_parameters.get()
+    if params is None or name not in params:
+        raise ParameterBindingError(f"Parameter ':{name}' has no bound value.", missing=[name])
+    return f"{prefix}.lit({params[name]!r})"
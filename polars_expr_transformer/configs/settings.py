@@ -1,7 +1,8 @@
+from functools import reduce
+from types import MappingProxyType
+
 import polars as pl
 from polars_expr_transformer.funcs import all_functions
-from polars_expr_transformer.funcs.logic_functions import does_not_equal
-from polars_expr_transformer.funcs.logic_functions import _in
 operators = {  # get your data out of your code...
     "+": "pl.Expr.add",
     "-": "pl.Expr.sub",
@@ -27,16 +28,161 @@ aliases = {
     'not': '_not',
 }
 
+# Column reference that stands in for "every column" in a column template,
+# e.g. trim(lowercase([$col])). It is bound to concrete columns at lowering time.
+COLUMN_PLACEHOLDER = '$col'
+
+# Internal function that :name parameters are rewritten to during preprocessing.
+PARAMETER_FUNC = '__param'
+
+# Relative evaluation cost of functions for the static cost model; anything not
+# listed costs 1. repeat is multiplied by its count.
+FUNCTION_COSTS = MappingProxyType({
+    'string_similarity': 50,
+    'to_boolean': 20,
+    'contains': 10,
+    'count_match': 10,
+    'repeat': 5,
+    'split': 5,
+    'reverse': 5,
+    'replace': 5,
+    'to_date': 5,
+    'to_datetime': 5,
+    'format_date': 5,
+    'titlecase': 3,
+    'concat': 2,
+    'rank': 10,
+    'over': 5,
+})
+
+# Functions that evaluate a regular expression per row.
+REGEX_FUNCTIONS = frozenset({'contains', 'count_match', 'to_boolean'})
+
+# Argument and result types of the functions, for type checking with ``check``:
+# name -> (argument types, result type). Types are 'string', 'number',
+# 'boolean', 'date' or 'any'; a 'same' result has the type of the arguments,
+# a 'first' result that of the first argument.
+# An argument is only typed where Polars rejects the other types, rather than
+# casting them. Arguments beyond the listed ones and unlisted functions are 'any'.
+_S, _N, _B, _D, _A = 'string', 'number', 'boolean', 'date', 'any'
+FUNCTION_TYPES = MappingProxyType({
+    # logic
+    'equals': ((_A, _A), _B),
+    'does_not_equal': ((_A, _A), _B),
+    'is_empty': ((_A,), _B),
+    'is_not_empty': ((_A,), _B),
+    'is_string': ((_A,), _B),
+    '_not': ((_A,), _B),
+    'contains': ((_S, _A), _B),
+    '_in': ((_A, _A), _B),
+    'between': ((_A, _A, _A), _B),
+    'coalesce': ((), 'same'),
+    'ifnull': ((), 'same'),
+    'nvl': ((), 'same'),
+    'nullif': ((), 'same'),
+    'greatest': ((), 'same'),
+    'least': ((), 'same'),
+    # string
+    'concat': ((), _S),
+    'count_match': ((_S, _S), _N),
+    'length': ((_S,), _N),
+    'uppercase': ((_S,), _S),
+    'lowercase': ((_S,), _S),
+    'titlecase': ((_S,), _S),
+    'left': ((_S, _A), _S),
+    'right': ((_S, _A), _S),
+    'mid': ((_S, _A, _A), _S),
+    'substring': ((_S, _A, _A), _S),
+    'replace': ((_S, _S, _S), _S),
+    'find_position': ((_S, _A), _N),
+    'pad_left': ((_S, _N, _S), _S),
+    'pad_right': ((_S, _N, _S), _S),
+    'trim': ((_S,), _S),
+    'left_trim': ((_S,), _S),
+    'right_trim': ((_S,), _S),
+    'string_similarity': ((_S, _S, _S), _N),
+    'starts_with': ((_S, _A), _B),
+    'ends_with': ((_S, _A), _B),
+    'reverse': ((_S,), _S),
+    'repeat': ((_S, _N), _S),
+    'split': ((_S, _S), _A),
+    # math
+    **{name: ((_N,), _N) for name in (
+        'negation', 'abs', 'sign', 'ceil', 'floor', 'sin', 'cos', 'tan', 'asin', 'acos', 'atan', 'tanh',
+    )},
+    **{name: ((_A,), _N) for name in ('log', 'log10', 'log2', 'exp', 'sqrt')},
+    'round': ((_N, _N), _N),
+    'power': ((_N, _N), _N),
+    'pow': ((_N, _N), _N),
+    'mod': ((_N, _N), _N),
+    'random_int': ((_N, _N), _N),
+    # date
+    'now': ((), _D),
+    'today': ((), _D),
+    **{name: ((_D,), _N) for name in (
+        'year', 'month', 'day', 'hour', 'minute', 'second',
+        'week', 'weekday', 'dayofweek', 'quarter', 'dayofyear',
+    )},
+    **{name: ((_D, _N), _D) for name in (
+        'add_days', 'add_weeks', 'add_months', 'add_years', 'add_hours', 'add_minutes', 'add_seconds',
+    )},
+    'datetime_diff_seconds': ((_D, _D), _N),
+    'datetime_diff_nanoseconds': ((_D, _D), _N),
+    'date_diff_days': ((_D, _D), _N),
+    'date_trim': ((_D, _S), _D),
+    'date_truncate': ((_D, _S), _D),
+    'format_date': ((_D, _S), _S),
+    'end_of_month': ((_D,), _D),
+    'start_of_month': ((_D,), _D),
+    # type conversions
+    'to_string': ((_A,), _S),
+    'to_date': ((_A, _S), _D),
+    'to_datetime': ((_A, _S), _D),
+    'to_integer': ((_A,), _N),
+    'to_float': ((_A,), _N),
+    'to_number': ((_A,), _N),
+    'to_decimal': ((_A, _N), _N),
+    'to_boolean': ((_A,), _B),
+    # aggregates
+    'sum': ((_N,), _N),
+    'avg': ((_N,), _N),
+    'count': ((_A,), _N),
+    'min': ((_A,), 'same'),
+    'max': ((_A,), 'same'),
+    'sumif': ((_N, _B), _N),
+    'countif': ((_B,), _N),
+    'avgif': ((_N, _B), _N),
+    'rank': ((_A, _B), _N),
+    'row_number': ((), _N),
+    'lag': ((_A, _N), 'first'),
+    'lead': ((_A, _N), 'first'),
+    'cumsum': ((_N,), _N),
+    'rolling_sum': ((_N, _N), _N),
+    'rolling_mean': ((_N, _N), _N),
+    'rolling_min': ((_N, _N), _N),
+    'rolling_max': ((_N, _N), _N),
+    'pct_change': ((_N, _N), _N),
+    'over': ((_A,), 'first'),
+    # lookup tables
+    'lookup': ((_A, _S, _S), _A),
+})
+del _S, _N, _B, _D, _A
 
-operators_mappings = {v: eval(v) for v in operators.values()}
-all_split_vals = set(['(', ')', '$if$', '$endif$', '$else$', '$then$','$elseif$', ',', ''] + list(operators)+list(operators))
+
+def _resolve_polars(name: str):
+    """Look up a Polars function by its dotted name, e.g. 'pl.Expr.add'."""
+    return reduce(getattr, name.split('.')[1:], pl)
+
+
+# Operators implemented by the function modules ('does_not_equal', '_in') are
+# already registered and resolve on first use.
+operators_mappings = {v: _resolve_polars(v) for v in operators.values() if v.startswith('pl.')}
+all_split_vals = frozenset(['(', ')', '$if$', '$endif$', '$else$', '$then$','$elseif$', ',', ''] + list(operators)+list(operators))
 all_split_vals_reversed = [v[::-1] for v in all_split_vals]
-funcs = {f'{k}': v for k,v in all_functions.items()}
-funcs['pl.col'] = pl.col
-funcs['pl.lit'] = pl.lit
-funcs.update(operators_mappings)
-for alias, ref in aliases.items():
-    funcs[alias] = funcs[ref]
+funcs = all_functions.extended(
+    {'pl.col': pl.col, 'pl.lit': pl.lit, **operators_mappings},
+    aliases,
+)
 
 PRECEDENCE = {
     'or': 1,
@@ -45,3 +191,9 @@ PRECEDENCE = {
     '+': 4, '-': 4,
     '*': 5, '/': 5
 }
+
+# Every compile reads these registries, possibly from many threads at once, so
+# they are frozen once built; funcs is a read-only FunctionRegistry.
+operators = MappingProxyType(operators)
+aliases = MappingProxyType(aliases)
+PRECEDENCE = MappingProxyType(PRECEDENCE)
@@ -28,21 +28,26 @@ class ExpressionSyntaxError(ValueError):
         super().__init__(self._format())
 
     def _format(self) -> str:
-        parts = [self.bare_message]
-        if self.expression is not None and self.position is not None:
-            line_start = self.expression.rfind("\n", 0, self.position) + 1
-            line_end = self.expression.find("\n", self.position)
-            if line_end == -1:
-                line_end = len(self.expression)
-            snippet = self.expression[line_start:line_end]
-            # Expand tabs in both the snippet and the caret offset so the
-            # caret stays aligned regardless of the display's tab width.
-            caret_col = len(snippet[: self.position - line_start].expandtabs())
-            parts.append(snippet.expandtabs())
-            parts.append(" " * caret_col + "^")
-        if self.hint:
-            parts.append(f"Hint: {self.hint}")
-        return "\n".join(parts)
+        return _format_message(self.bare_message, self.expression, self.position, self.hint)
+
+
+def _format_message(message: str, expression: str = None, position: int = None, hint: str = None) -> str:
+    """The message, the line of the expression with a caret under the position, and the hint."""
+    parts = [message]
+    if expression is not None and position is not None:
+        line_start = expression.rfind("\n", 0, position) + 1
+        line_end = expression.find("\n", position)
+        if line_end == -1:
+            line_end = len(expression)
+        snippet = expression[line_start:line_end]
+        # Expand tabs in both the snippet and the caret offset so the
+        # caret stays aligned regardless of the display's tab width.
+        caret_col = len(snippet[: position - line_start].expandtabs())
+        parts.append(snippet.expandtabs())
+        parts.append(" " * caret_col + "^")
+    if hint:
+        parts.append(f"Hint: {hint}")
+    return "\n".join(parts)
 
 
 class PolarsCodeGenError(Exception):
@@ -63,3 +68,33 @@ class PolarsCodeGenError(Exception):
             f"Generated code: {generated_code}\n"
             f"Eval error: {eval_error}"
         )
+
+
+class ParameterBindingError(ValueError):
+    """Raised when a parameterized formula is lowered with missing or unknown parameters.
+
+    Attributes:
+        missing: Names of parameters the formula uses but that were not bound.
+        unknown: Names that were bound but do not appear in the formula.
+    """
+
+    def __init__(self, message: str, missing=(), unknown=()):
+        self.missing = tuple(missing)
+        self.unknown = tuple(unknown)
+        super().__init__(message)
+
+
+class FormulaTooComplexError(ValueError):
+    """Raised when a formula exceeds a configured complexity or time budget.
+
+    Attributes:
+        limit: Name of the CostLimits field that was exceeded.
+        value: The measured value.
+        maximum: The configured maximum.
+    """
+
+    def __init__(self, message: str, limit: str, value, maximum):
+        self.limit = limit
+        self.value = value
+        self.maximum = maximum
+        super().__init__(message)
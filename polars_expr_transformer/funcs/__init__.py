@@ -1,16 +1,5 @@
-import os
+from polars_expr_transformer.funcs.registry import default_registry
 
-from polars_expr_transformer.funcs import (logic_functions,
-                                           string_functions,
-                                           math_functions,
-                                           special_funcs,
-                                           date_functions,
-                                           type_conversions)
-
-all_functions = {}
-all_functions.update(logic_functions.__dict__)
-all_functions.update(string_functions.__dict__)
-all_functions.update(math_functions.__dict__)
-all_functions.update(special_funcs.__dict__)
-all_functions.update(date_functions.__dict__)
-all_functions.update(type_conversions.__dict__)
+# Every expression function by name. Function modules are imported on the first
+# lookup of one of their functions, see registry.py.
+all_functions = default_registry()
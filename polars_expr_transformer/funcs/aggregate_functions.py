@@ -0,0 +1,366 @@
+import polars as pl
+from typing import Any
+from polars_expr_transformer.funcs.utils import is_polars_expr
+
+# The order keys of a window travel to over() as one struct under this name.
+_ORDER_BY = "__order_by__"
+
+
+def sum(value: Any) -> pl.Expr:
+    """
+    Adds up all values of a column, or of each group with over().
+
+    For example, [amount] / sum([amount]) over([region]) would return 0.25 for an
+    [amount] of 50 in a region whose amounts add up to 200.
+
+    Parameters:
+    - value: The column or expression to add up
+
+    Returns:
+    - The sum of the values
+    """
+    expr = value if is_polars_expr(value) else pl.lit(value)
+    return expr.sum()
+
+
+def avg(value: Any) -> pl.Expr:
+    """
+    Calculates the average of all values of a column, or of each group with over().
+
+    For example, avg([price]) over([category]) would return 15.0 for every row of
+    a category with prices 10.0 and 20.0.
+
+    Parameters:
+    - value: The column or expression to average
+
+    Returns:
+    - The average of the non-empty values
+    """
+    expr = value if is_polars_expr(value) else pl.lit(value)
+    return expr.mean()
+
+
+def count(value: Any = None) -> pl.Expr:
+    """
+    Counts the non-empty values of a column, or all rows when no column is given.
+
+    For example, count() over([customer]) would return 3 for every row of a
+    customer with three orders.
+
+    Parameters:
+    - value: Optional column or expression whose non-empty values are counted
+
+    Returns:
+    - The number of values, or of rows
+    """
+    if value is None:
+        return pl.len()
+    expr = value if is_polars_expr(value) else pl.lit(value)
+    return expr.count()
+
+
+def min(value: Any) -> pl.Expr:
+    """
+    Returns the smallest value of a column, or of each group with over().
+
+    For example, min([order_date]) over([customer]) would return the date of each
+    customer's first order.
+
+    Parameters:
+    - value: The column or expression to search
+
+    Returns:
+    - The smallest value
+    """
+    expr = value if is_polars_expr(value) else pl.lit(value)
+    return expr.min()
+
+
+def max(value: Any) -> pl.Expr:
+    """
+    Returns the largest value of a column, or of each group with over().
+
+    For example, [score] = max([score]) over([team]) would return true for the
+    best scores of each team.
+
+    Parameters:
+    - value: The column or expression to search
+
+    Returns:
+    - The largest value
+    """
+    expr = value if is_polars_expr(value) else pl.lit(value)
+    return expr.max()
+
+
+def sumif(value: Any, condition: Any) -> pl.Expr:
+    """
+    Adds up the values of the rows where a condition is true.
+
+    For example, sumif([amount], [status] = "paid") over([customer]) would return
+    the paid total of the customer of each row.
+
+    Parameters:
+    - value: The column or expression to add up
+    - condition: The condition a row must meet to be included
+
+    Returns:
+    - The sum of the values of the matching rows
+    """
+    expr = value if is_polars_expr(value) else pl.lit(value)
+    mask = condition if is_polars_expr(condition) else pl.lit(condition)
+    return expr.filter(mask).sum()
+
+
+def countif(condition: Any) -> pl.Expr:
+    """
+    Counts the rows where a condition is true.
+
+    For example, countif([status] = "open") over([team]) would return 2 for every
+    row of a team with two open tickets.
+
+    Parameters:
+    - condition: The condition to count
+
+    Returns:
+    - The number of rows meeting the condition
+    """
+    mask = condition if is_polars_expr(condition) else pl.lit(condition)
+    return mask.sum()
+
+
+def avgif(value: Any, condition: Any) -> pl.Expr:
+    """
+    Calculates the average of the values of the rows where a condition is true.
+
+    For example, avgif([score], [attempt] > 1) would return the average score of
+    all retries.
+
+    Parameters:
+    - value: The column or expression to average
+    - condition: The condition a row must meet to be included
+
+    Returns:
+    - The average of the non-empty values of the matching rows
+    """
+    expr = value if is_polars_expr(value) else pl.lit(value)
+    mask = condition if is_polars_expr(condition) else pl.lit(condition)
+    return expr.filter(mask).mean()
+
+
+def rank(value: Any, descending: bool = False) -> pl.Expr:
+    """
+    Ranks the values of a column, or of each group with over(), starting at 1.
+
+    Equal values get the same rank, and the ranks after them are skipped. For
+    example, rank([sales], true) over([region]) would return 1 for the best
+    selling row of each region.
+
+    Parameters:
+    - value: The column or expression to rank
+    - descending: true to give the largest value rank 1 (default false)
+
+    Returns:
+    - The rank of each value
+    """
+    expr = value if is_polars_expr(value) else pl.lit(value)
+    return expr.rank(method="min", descending=descending)
+
+
+def row_number() -> pl.Expr:
+    """
+    Numbers the rows, or the rows of each group with over(), starting at 1.
+
+    For example, row_number() over([customer]) would return 1, 2 and 3 for the
+    three rows of a customer, in the order of the data.
+
+    Returns:
+    - The number of each row
+    """
+    return pl.int_range(pl.len(), dtype=pl.UInt32) + 1
+
+
+def lag(value: Any, n: int = 1) -> pl.Expr:
+    """
+    Returns the value of the row n rows before, or empty for the first rows.
+
+    For example, [price] - lag([price]) over([ticker]) order_by([date]) would return
+    the change of each ticker's price since the previous date.
+
+    Parameters:
+    - value: The column or expression to look back in
+    - n: The number of rows to look back (default 1)
+
+    Returns:
+    - The value n rows before
+    """
+    expr = value if is_polars_expr(value) else pl.lit(value)
+    return expr.shift(n)
+
+
+def lead(value: Any, n: int = 1) -> pl.Expr:
+    """
+    Returns the value of the row n rows after, or empty for the last rows.
+
+    For example, lead([status]) over([order_id]) order_by([updated]) would return
+    the status each order moved to next.
+
+    Parameters:
+    - value: The column or expression to look ahead in
+    - n: The number of rows to look ahead (default 1)
+
+    Returns:
+    - The value n rows after
+    """
+    expr = value if is_polars_expr(value) else pl.lit(value)
+    return expr.shift(-n)
+
+
+def cumsum(value: Any) -> pl.Expr:
+    """
+    Returns the running total of the values up to and including each row.
+
+    For example, cumsum([qty]) over([product]) order_by([date]) would return the
+    stock moved so far for each product.
+
+    Parameters:
+    - value: The column or expression to add up
+
+    Returns:
+    - The running total
+    """
+    expr = value if is_polars_expr(value) else pl.lit(value)
+    return expr.cum_sum()
+
+
+def rolling_sum(value: Any, window: int) -> pl.Expr:
+    """
+    Adds up the values of each row and the rows before it, window rows in total.
+
+    For example, rolling_sum([sales], 7) order_by([date]) would return the sales
+    of the last seven days. The first window - 1 rows are empty.
+
+    Parameters:
+    - value: The column or expression to add up
+    - window: The number of rows in the window
+
+    Returns:
+    - The sum over the window
+    """
+    expr = value if is_polars_expr(value) else pl.lit(value)
+    return expr.rolling_sum(window)
+
+
+def rolling_mean(value: Any, window: int) -> pl.Expr:
+    """
+    Averages the values of each row and the rows before it, window rows in total.
+
+    For example, rolling_mean([temp], 7) over([station]) order_by([date]) would
+    return the average temperature of the last seven days at each station.
+
+    Parameters:
+    - value: The column or expression to average
+    - window: The number of rows in the window
+
+    Returns:
+    - The average over the window
+    """
+    expr = value if is_polars_expr(value) else pl.lit(value)
+    return expr.rolling_mean(window)
+
+
+def rolling_min(value: Any, window: int) -> pl.Expr:
+    """
+    Returns the smallest value of each row and the rows before it, window rows in total.
+
+    For example, rolling_min([price], 3) would return the lowest of the last three
+    prices.
+
+    Parameters:
+    - value: The column or expression to search
+    - window: The number of rows in the window
+
+    Returns:
+    - The smallest value in the window
+    """
+    expr = value if is_polars_expr(value) else pl.lit(value)
+    return expr.rolling_min(window)
+
+
+def rolling_max(value: Any, window: int) -> pl.Expr:
+    """
+    Returns the largest value of each row and the rows before it, window rows in total.
+
+    For example, rolling_max([price], 3) would return the highest of the last three
+    prices.
+
+    Parameters:
+    - value: The column or expression to search
+    - window: The number of rows in the window
+
+    Returns:
+    - The largest value in the window
+    """
+    expr = value if is_polars_expr(value) else pl.lit(value)
+    return expr.rolling_max(window)
+
+
+def pct_change(value: Any, n: int = 1) -> pl.Expr:
+    """
+    Returns the relative change from the value n rows before.
+
+    For example, pct_change([revenue]) order_by([month]) would return 0.1 for a
+    month with 10% more revenue than the month before.
+
+    Parameters:
+    - value: The column or expression to compare
+    - n: The number of rows to look back (default 1)
+
+    Returns:
+    - The change as a fraction of the earlier value
+    """
+    expr = value if is_polars_expr(value) else pl.lit(value)
+    return expr.pct_change(n)
+
+
+def over(value: Any, *partition_by) -> pl.Expr:
+    """
+    Evaluates an aggregate for the group of each row instead of the whole column.
+
+    Written after the aggregate, for example sum([amount]) over([region]) returns
+    the total of the region of each row. Without columns, over() aggregates the
+    whole column.
+
+    Parameters:
+    - value: The aggregate or expression to evaluate per group
+    - partition_by: The columns or expressions that define the groups
+
+    Returns:
+    - The value of the group of each row
+    """
+    expr = value if is_polars_expr(value) else pl.lit(value)
+    keys = [p if is_polars_expr(p) else pl.lit(p) for p in partition_by]
+    order = [k for k in keys if k.meta.output_name(raise_if_undetermined=False) == _ORDER_BY]
+    keys = [k for k in keys if not any(k is o for o in order)]
+    if order:
+        return expr.over(keys or None, order_by=order[-1])
+    if not keys:
+        return expr
+    return expr.over(keys)
+
+
+def order_by(*keys) -> pl.Expr:
+    """
+    Evaluates a window function, like lag or cumsum, in the order of the given columns.
+
+    Written after the function, and after over() if there is one, for example
+    cumsum([qty]) over([product]) order_by([date]). Without order_by, windows use
+    the order of the data.
+
+    Parameters:
+    - keys: The columns or expressions to order the rows by
+
+    Returns:
+    - The value of each row, computed in the given order
+    """
+    return pl.struct([k if is_polars_expr(k) else pl.lit(k) for k in keys]).alias(_ORDER_BY)
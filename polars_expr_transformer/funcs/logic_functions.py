@@ -133,17 +133,21 @@ def contains(text: PlStringType, search_for: Any) -> pl.Expr:
 
 def _in(value: Any, collection: PlStringType) -> pl.Expr:
     """
-    Checks if a value exists within a larger text.
+    Checks if a value is one of a list of values, or exists within a larger text.
 
-    For example, _in("world", "hello world") would return True.
+    For example, [status] in ("open", "paid") would return True when [status] is
+    "paid", and _in("world", "hello world") would return True.
 
     Parameters:
     - value: The value to search for
-    - collection: The text to search in
+    - collection: The list of values, or the text to search in
 
     Returns:
     - True if the value is found in the collection, False otherwise
     """
+    if isinstance(collection, pl.Series):
+        expr = value if isinstance(value, pl.Expr) else pl.lit(value)
+        return expr.is_in(pl.lit(collection).implode())
     return contains(collection, value)
 
 
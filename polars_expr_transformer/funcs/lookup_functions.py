@@ -0,0 +1,24 @@
+import polars as pl
+from typing import Any
+from polars_expr_transformer.funcs.utils import is_polars_expr
+from polars_expr_transformer.lookup_tables import lookup_table
+
+
+def lookup(key: Any, table: str, column: str) -> pl.Expr:
+    """
+    Looks up a value in a registered lookup table.
+
+    For example, lookup([country_code], "countries", "name") would return "France"
+    for a code of "FR" when the table registered as "countries" maps that code to
+    that name. Tables are registered with register_lookup_table().
+
+    Parameters:
+    - key: The column or expression to look up in the key column of the table
+    - table: The name the table was registered under
+    - column: The column of the table to return
+
+    Returns:
+    - The value of the column for the key, or null when the key is not in the table
+    """
+    expr = key if is_polars_expr(key) else pl.lit(key)
+    return lookup_table(table).map(expr, column)
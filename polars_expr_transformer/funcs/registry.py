@@ -0,0 +1,117 @@
+"""
+Registry of the expression functions, resolved on demand.
+
+The names, categories and arities of all functions are read from
+``registry_data``, a static module generated by ``generate_registry.py``. A
+function module is only imported when one of its functions is looked up, so
+importing the package does not load every function module, and parsing needs
+no function objects at all.
+"""
+
+import importlib
+from typing import Callable, Dict, Iterator, Mapping, NamedTuple, Optional, Tuple
+
+from polars_expr_transformer.funcs.registry_data import FUNCTIONS
+
+CATEGORY_MODULES = {
+    'logic': 'polars_expr_transformer.funcs.logic_functions',
+    'string': 'polars_expr_transformer.funcs.string_functions',
+    'math': 'polars_expr_transformer.funcs.math_functions',
+    'special': 'polars_expr_transformer.funcs.special_funcs',
+    'date': 'polars_expr_transformer.funcs.date_functions',
+    'type_conversions': 'polars_expr_transformer.funcs.type_conversions',
+    'aggregate': 'polars_expr_transformer.funcs.aggregate_functions',
+    'lookup': 'polars_expr_transformer.funcs.lookup_functions',
+}
+
+
+class FunctionInfo(NamedTuple):
+    """
+    Static description of an expression function.
+
+    Attributes:
+        category: The category key, e.g. 'string'.
+        min_args: Number of required arguments.
+        max_args: Maximum number of arguments, None if it takes ``*args``.
+    """
+
+    category: str
+    min_args: int
+    max_args: Optional[int]
+
+
+FUNCTION_INFO: Mapping[str, FunctionInfo] = {
+    name: FunctionInfo(*info) for name, info in FUNCTIONS.items()
+}
+
+
+class FunctionRegistry(Mapping):
+    """
+    Read-only mapping of function names to functions, imported on first lookup.
+
+    Args:
+        entries: Function name to (module path, attribute name).
+        resolved: Functions that are already available, by name.
+    """
+
+    def __init__(
+        self,
+        entries: Mapping[str, Tuple[str, str]],
+        resolved: Optional[Mapping[str, Callable]] = None,
+    ):
+        self._entries = dict(entries)
+        self._resolved: Dict[str, Callable] = dict(resolved or {})
+        for name in self._resolved:
+            self._entries.setdefault(name, None)
+
+    def __getitem__(self, name: str) -> Callable:
+        try:
+            return self._resolved[name]
+        except KeyError:
+            module, attribute = self._entries[name]
+        # Resolving is idempotent, so concurrent first lookups are harmless.
+        func = self._resolved[name] = getattr(importlib.import_module(module), attribute)
+        return func
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._entries)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, name) -> bool:
+        return name in self._entries
+
+    def __repr__(self) -> str:
+        return f"FunctionRegistry({len(self)} functions)"
+
+    def extended(
+        self,
+        resolved: Mapping[str, Callable],
+        aliases: Mapping[str, str] = None,
+    ) -> "FunctionRegistry":
+        """
+        Return a registry with additional functions and aliases.
+
+        Args:
+            resolved: Extra functions by name, e.g. the Polars operators.
+            aliases: Extra names for registered functions, alias to name.
+
+        Returns:
+            A new FunctionRegistry; this one is left unchanged.
+        """
+        entries = dict(self._entries)
+        merged = {**self._resolved, **resolved}
+        for alias, name in (aliases or {}).items():
+            if name in merged:
+                merged[alias] = merged[name]
+            else:
+                entries[alias] = entries[name]
+        return FunctionRegistry(entries, merged)
+
+
+def default_registry() -> FunctionRegistry:
+    """The registry of every function in the function modules."""
+    return FunctionRegistry(
+        {name: (CATEGORY_MODULES[info[0]], name) for name, info in FUNCTIONS.items()}
+    )
@@ -0,0 +1,132 @@
+"""
+Static function registry: name -> (category, min_args, max_args).
+
+Generated by generate_registry.py from the function modules; do not edit.
+max_args is None for functions that take ``*args``.
+"""
+
+FUNCTIONS = {
+    'equals': ('logic', 2, 2),
+    'is_empty': ('logic', 1, 1),
+    'is_not_empty': ('logic', 1, 1),
+    'does_not_equal': ('logic', 2, 2),
+    '_not': ('logic', 1, 1),
+    'is_string': ('logic', 1, 1),
+    'contains': ('logic', 2, 2),
+    '_in': ('logic', 2, 2),
+    'coalesce': ('logic', 0, None),
+    'ifnull': ('logic', 2, 2),
+    'nvl': ('logic', 2, 2),
+    'nullif': ('logic', 2, 2),
+    'between': ('logic', 3, 3),
+    'greatest': ('logic', 0, None),
+    'least': ('logic', 0, None),
+    'concat': ('string', 0, None),
+    'count_match': ('string', 2, 2),
+    'length': ('string', 1, 1),
+    'uppercase': ('string', 1, 1),
+    'titlecase': ('string', 1, 1),
+    'lowercase': ('string', 1, 1),
+    'left': ('string', 2, 2),
+    'right': ('string', 2, 2),
+    '__apply_replace': ('string', 1, 2),
+    'replace': ('string', 3, 3),
+    'find_position': ('string', 2, 2),
+    'pad_left': ('string', 2, 3),
+    'pad_right': ('string', 2, 3),
+    'trim': ('string', 1, 1),
+    'left_trim': ('string', 1, 1),
+    'right_trim': ('string', 1, 1),
+    '__get_similarity_method': ('string', 1, 1),
+    'string_similarity': ('string', 2, 3),
+    'mid': ('string', 3, 3),
+    'substring': ('string', 3, 3),
+    'starts_with': ('string', 2, 2),
+    'ends_with': ('string', 2, 2),
+    'reverse': ('string', 1, 1),
+    'repeat': ('string', 2, 2),
+    'split': ('string', 2, 2),
+    'negation': ('math', 1, 1),
+    'log': ('math', 1, 1),
+    'exp': ('math', 1, 1),
+    'sqrt': ('math', 1, 1),
+    'abs': ('math', 1, 1),
+    'sin': ('math', 1, 1),
+    'cos': ('math', 1, 1),
+    'tan': ('math', 1, 1),
+    'asin': ('math', 1, 1),
+    'acos': ('math', 1, 1),
+    'atan': ('math', 1, 1),
+    'power': ('math', 2, 2),
+    'pow': ('math', 2, 2),
+    'mod': ('math', 2, 2),
+    'sign': ('math', 1, 1),
+    'log10': ('math', 1, 1),
+    'log2': ('math', 1, 1),
+    'ceil': ('math', 1, 1),
+    'round': ('math', 1, 2),
+    'floor': ('math', 1, 1),
+    'tanh': ('math', 1, 1),
+    'negative': ('math', 0, 0),
+    'random_int': ('math', 0, 2),
+    '__negative': ('special', 0, 0),
+    '__make_negative': ('special', 0, 0),
+    '__param': ('special', 1, 1),
+    'now': ('date', 0, 0),
+    'today': ('date', 0, 0),
+    'year': ('date', 1, 1),
+    'month': ('date', 1, 1),
+    'day': ('date', 1, 1),
+    'hour': ('date', 1, 1),
+    'minute': ('date', 1, 1),
+    'second': ('date', 1, 1),
+    'add_days': ('date', 2, 2),
+    'add_years': ('date', 2, 2),
+    'add_hours': ('date', 2, 2),
+    'add_minutes': ('date', 2, 2),
+    'add_seconds': ('date', 2, 2),
+    'datetime_diff_seconds': ('date', 2, 2),
+    'datetime_diff_nanoseconds': ('date', 2, 2),
+    'date_diff_days': ('date', 2, 2),
+    'date_trim': ('date', 2, 2),
+    'date_truncate': ('date', 2, 2),
+    'add_months': ('date', 2, 2),
+    'add_weeks': ('date', 2, 2),
+    'week': ('date', 1, 1),
+    'weekday': ('date', 1, 1),
+    'dayofweek': ('date', 1, 1),
+    'quarter': ('date', 1, 1),
+    'dayofyear': ('date', 1, 1),
+    'format_date': ('date', 1, 2),
+    'end_of_month': ('date', 1, 1),
+    'start_of_month': ('date', 1, 1),
+    'to_string': ('type_conversions', 1, 1),
+    'to_date': ('type_conversions', 1, 2),
+    'to_datetime': ('type_conversions', 1, 2),
+    'to_integer': ('type_conversions', 1, 1),
+    'to_float': ('type_conversions', 1, 1),
+    'to_number': ('type_conversions', 1, 1),
+    'to_boolean': ('type_conversions', 1, 1),
+    'to_decimal': ('type_conversions', 1, 2),
+    'sum': ('aggregate', 1, 1),
+    'avg': ('aggregate', 1, 1),
+    'count': ('aggregate', 0, 1),
+    'min': ('aggregate', 1, 1),
+    'max': ('aggregate', 1, 1),
+    'sumif': ('aggregate', 2, 2),
+    'countif': ('aggregate', 1, 1),
+    'avgif': ('aggregate', 2, 2),
+    'rank': ('aggregate', 1, 2),
+    'row_number': ('aggregate', 0, 0),
+    'lag': ('aggregate', 1, 2),
+    'lead': ('aggregate', 1, 2),
+    'cumsum': ('aggregate', 1, 1),
+    'rolling_sum': ('aggregate', 2, 2),
+    'rolling_mean': ('aggregate', 2, 2),
+    'rolling_min': ('aggregate', 2, 2),
+    'rolling_max': ('aggregate', 2, 2),
+    'pct_change': ('aggregate', 1, 2),
+    'over': ('aggregate', 1, None),
+    'order_by': ('aggregate', 0, None),
+    'lookup': ('lookup', 3, 3),
+}
@@ -1,4 +1,14 @@
 import polars as pl
+from contextvars import ContextVar
+from typing import Any, Dict, Optional
+
+from polars_expr_transformer.exceptions import ParameterBindingError
+
+# Values bound to the :name parameters of the formula currently being lowered.
+# A context variable keeps concurrent binds (threads, asyncio tasks) isolated.
+bound_parameters: ContextVar[Optional[Dict[str, Any]]] = ContextVar(
+    "bound_parameters", default=None
+)
 
 
 def __negative() -> pl.Expr:
@@ -8,3 +18,13 @@ def __negative() -> pl.Expr:
 def __make_negative() -> pl.Expr:
     return pl.lit(-1)
 
+
+def __param(name: str) -> Any:
+    params = bound_parameters.get()
+    if params is None or name not in params:
+        raise ParameterBindingError(
+            f"Parameter ':{name}' has no bound value. Use prepare(formula).bind({name}=...) "
+            "to supply it.",
+            missing=[name],
+        )
+    return params[name]
@@ -1,5 +1,4 @@
 import polars as pl
-import polars_ds as pds
 from polars_expr_transformer.funcs.utils import is_polars_expr, create_fix_col
 from polars_expr_transformer.funcs.utils import PlStringType, PlIntType
 from functools import partial
@@ -286,6 +285,9 @@ def right_trim(text: PlStringType) -> pl.Expr:
 
 
 def __get_similarity_method(how: str) -> callable:
+    # polars_ds is only needed here, so it is not imported with the package.
+    import polars_ds as pds
+
     match how:
         case 'levenshtein':
             return partial(pds.str_leven, return_sim=True)
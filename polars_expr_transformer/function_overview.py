@@ -1,59 +1,65 @@
-from typing import List, Optional
-from polars_expr_transformer.schemas import ExpressionRef, ExpressionsOverview
-from polars_expr_transformer.funcs import (
-    logic_functions,
-    string_functions,
-    math_functions,
-    special_funcs,
-    date_functions,
-    type_conversions
-)
-import inspect
-
-MODULE_CATEGORIES = {
-    'logic': logic_functions,
-    'string': string_functions,
-    'math': math_functions,
-    'special': special_funcs,
-    'date': date_functions,
-    'type_conversions': type_conversions
-}
-
-_available_expressions: Optional[List[ExpressionsOverview]] = None
-
-
-def get_expression_overview() -> List[ExpressionsOverview]:
+from typing import TYPE_CHECKING, List, Optional
+from polars_expr_transformer.funcs import all_functions
+from polars_expr_transformer.funcs.registry import CATEGORY_MODULES, FUNCTION_INFO
+import importlib
+import threading
+
+if TYPE_CHECKING:
+    from polars_expr_transformer.schemas import ExpressionsOverview
+
+_available_expressions: Optional[List["ExpressionsOverview"]] = None
+_available_expressions_lock = threading.Lock()
+
+
+def __getattr__(name: str):
+    # The function modules by category, imported only when asked for.
+    if name == 'MODULE_CATEGORIES':
+        return {
+            category: importlib.import_module(module)
+            for category, module in CATEGORY_MODULES.items()
+        }
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def _public_functions(category: str) -> List[str]:
+    return [
+        name
+        for name, info in FUNCTION_INFO.items()
+        if info.category == category and not name.startswith('_')
+    ]
+
+
+def _build_expression_overview() -> List["ExpressionsOverview"]:
+    # pydantic is only needed for the overview, so it is imported on first use.
+    from polars_expr_transformer.schemas import ExpressionRef, ExpressionsOverview
+
+    return [
+        ExpressionsOverview(
+            expression_type=category,
+            expressions=[
+                ExpressionRef(
+                    name=name,
+                    doc=all_functions[name].__doc__
+                )
+                for name in _public_functions(category)
+            ]
+        )
+        for category in CATEGORY_MODULES
+    ]
+
+
+def get_expression_overview() -> List["ExpressionsOverview"]:
     """Get overview of all expressions organized by category."""
     global _available_expressions
 
     if _available_expressions is None:
-        _available_expressions = [
-            ExpressionsOverview(
-                expression_type=category,
-                expressions=[
-                    ExpressionRef(
-                        name=name,
-                        doc=func.__doc__
-                    )
-                    for name, func in module.__dict__.items()
-                    if callable(func)
-                    and not name.startswith('_')
-                    and inspect.getmodule(func) == module
-                ]
-            )
-            for category, module in MODULE_CATEGORIES.items()
-        ]
+        with _available_expressions_lock:
+            if _available_expressions is None:
+                _available_expressions = _build_expression_overview()
 
     return _available_expressions
 
 
 def get_all_expressions() -> List[str]:
     """Get list of all available expression names."""
-    return [
-        name
-        for module in MODULE_CATEGORIES.values()
-        for name, func in module.__dict__.items()
-        if callable(func)
-        and not name.startswith('_')
-        and inspect.getmodule(func) == module
-    ]
+    return [name for category in CATEGORY_MODULES for name in _public_functions(category)]
@@ -0,0 +1,312 @@
+"""
+Incremental parsing for formula editors.
+
+An editor that recompiles the whole formula on every keystroke spends most of
+its time re-parsing text that did not change. :class:`IncrementalParser` keeps
+the previous formula and splits it into regions: the function calls and
+``if ... endif`` blocks, each with its character span. A region is parsed on
+its own, as a skeleton in which its nested regions are replaced by placeholder
+columns, and their subtrees are spliced in for the placeholders.
+
+Subtrees are cached by region text and parsed skeletons by skeleton text. After
+an edit only the innermost call or ``if`` block containing it is parsed again;
+the skeletons of the regions around it are unchanged and are only copied, and
+every other subtree is reused as is.
+
+Example:
+    >>> from polars_expr_transformer.incremental import IncrementalParser
+    >>> parser = IncrementalParser('if [a] > 1 then uppercase([b]) else [c] endif')
+    >>> tree = parser.edit(offset=27, removed=1, inserted="c")
+    >>> parser.last_parsed
+    ['uppercase([c])']
+    >>> parser.region_at(20).kind
+    'call'
+"""
+
+from dataclasses import dataclass, field, replace
+from typing import Dict, List, Optional
+
+from polars_expr_transformer.configs.settings import funcs
+from polars_expr_transformer.process.expression_validator import _is_word_char, _scan_events
+from polars_expr_transformer.process.models import Classifier, Func, IfFunc
+from polars_expr_transformer.process.polars_expr_transformer import parse_func
+
+# Column name prefix of the placeholders that stand in for nested regions.
+PLACEHOLDER_PREFIX = "__region_"
+
+_KEYWORDS = frozenset({"if", "then", "else", "elseif", "endif", "and", "or"})
+
+
+@dataclass
+class FormulaRegion:
+    """
+    A span of the formula text and the subtree parsed from it.
+
+    Attributes:
+        kind: "formula" for the whole text, "call" for a function call
+            including its name, or "if" for an ``if ... endif`` block.
+        start: Offset of the first character of the region.
+        end: Offset just past the last character of the region.
+        children: The regions directly nested in this one, in text order.
+        node: The parsed subtree of the region.
+    """
+
+    kind: str
+    start: int
+    end: int
+    children: List["FormulaRegion"] = field(default_factory=list)
+    node: object = field(default=None, repr=False)
+
+
+def _stands_alone(text: str, start: int, end: int) -> bool:
+    """
+    Whether ``text[start:end]`` can be replaced by a placeholder column.
+
+    Whitespace is removed while preprocessing, so an operand that touches a
+    word, literal or bracket other than a keyword would merge with it, and
+    would not parse the same as a column in its place.
+    """
+    i = start - 1
+    while i >= 0 and text[i].isspace():
+        i -= 1
+    if i >= 0 and (_is_word_char(text[i]) or text[i] in "\"').]"):
+        j = i
+        while j >= 0 and _is_word_char(text[j]):
+            j -= 1
+        if text[j + 1 : i + 1] not in _KEYWORDS:
+            return False
+    i = end
+    while i < len(text) and text[i].isspace():
+        i += 1
+    if i < len(text) and (_is_word_char(text[i]) or text[i] in "\"'.[("):
+        j = i
+        while j < len(text) and _is_word_char(text[j]):
+            j += 1
+        if text[i:j] not in _KEYWORDS:
+            return False
+    return True
+
+
+def find_regions(text: str) -> Optional[FormulaRegion]:
+    """
+    Split a formula into nested function call and ``if`` block regions.
+
+    Comments, string literals and column references are skipped, as in
+    syntax validation. Calls and blocks that do not stand alone as an operand
+    are left to the enclosing region.
+
+    Args:
+        text: The formula.
+
+    Returns:
+        The region of the whole formula, or None when its brackets or
+        conditionals do not nest, in which case it cannot be split.
+    """
+    root = FormulaRegion("formula", 0, len(text))
+    # Open brackets and if blocks; brackets that are not calls hold None.
+    frames = []
+    previous_word = None
+
+    def close(region: FormulaRegion, end: int) -> None:
+        region.end = end
+        parent = next((r for _, r in reversed(frames) if r is not None), root)
+        if _stands_alone(text, region.start, end):
+            parent.children.append(region)
+        else:
+            parent.children.extend(region.children)
+
+    for kind, idx, val in _scan_events(text):
+        if kind == "word":
+            if val == "if":
+                frames.append(("if", FormulaRegion("if", idx, -1)))
+            elif val == "endif":
+                if not frames or frames[-1][0] != "if":
+                    return None
+                close(frames.pop()[1], idx + len(val))
+            previous_word = (idx, val)
+            continue
+        if val == "(":
+            region = None
+            if previous_word is not None:
+                word_start, word = previous_word
+                if (
+                    word in funcs
+                    and not text[word_start + len(word) : idx].strip()
+                    and not text[:word_start].endswith(".")
+                ):
+                    region = FormulaRegion("call", word_start, -1)
+            frames.append(("paren", region))
+        else:
+            if not frames or frames[-1][0] != "paren":
+                return None
+            region = frames.pop()[1]
+            if region is not None:
+                close(region, idx + 1)
+        previous_word = None
+    return None if frames else root
+
+
+def _instantiate(template, subtrees: Dict[str, object]):
+    """
+    Copy a parsed skeleton, replacing its placeholder columns by their subtrees.
+
+    The template is left untouched, so a skeleton is parsed once and
+    instantiated again whenever only its nested regions change. The subtrees
+    are shared, not copied.
+    """
+    copies = {}
+
+    def copy(node):
+        if isinstance(node, Func):
+            if (
+                node.func_ref == "pl.col"
+                and len(node.args) == 1
+                and isinstance(node.args[0], Classifier)
+            ):
+                return subtrees.get(node.args[0].val.strip("\"'"), node)
+            if id(node) not in copies:
+                copies[id(node)] = replace(node, args=[copy(arg) for arg in node.args])
+            return copies[id(node)]
+        if isinstance(node, IfFunc):
+            if id(node) not in copies:
+                copies[id(node)] = replace(
+                    node,
+                    conditions=[
+                        replace(c, condition=copy(c.condition), val=copy(c.val))
+                        for c in node.conditions
+                    ],
+                    else_val=copy(node.else_val),
+                )
+            return copies[id(node)]
+        return node
+
+    return copy(template)
+
+
+class IncrementalParser:
+    """
+    Parse a formula that is edited, reusing the subtrees of unchanged regions.
+
+    Args:
+        text: The initial formula.
+
+    Attributes:
+        text: The current formula.
+        tree: The parsed tree of the current formula, None after a failed update.
+        regions: The region tree of the current formula, with spans and
+            subtrees, None after a failed update.
+        last_parsed: The texts of the regions that the last update had to parse.
+    """
+
+    def __init__(self, text: str = ""):
+        self.text = ""
+        self.tree = None
+        self.regions: Optional[FormulaRegion] = None
+        self.last_parsed: List[str] = []
+        # Subtrees by region text, and parsed skeletons by skeleton text, of
+        # the current formula.
+        self._cache: Dict[str, object] = {}
+        self._skeletons: Dict[str, object] = {}
+        if text:
+            self.update(text)
+
+    def edit(self, offset: int, removed: int, inserted: str):
+        """
+        Apply a text edit and re-parse what it touched.
+
+        Args:
+            offset: Where the edit starts.
+            removed: The number of characters removed at ``offset``.
+            inserted: The text inserted at ``offset``.
+
+        Returns:
+            The parsed tree of the edited formula.
+
+        Raises:
+            ExpressionSyntaxError: If the edited formula is invalid. The edit
+                is kept, so the next edit can fix it.
+        """
+        if not 0 <= offset <= offset + removed <= len(self.text):
+            raise ValueError(
+                f"Edit at {offset}, removing {removed}, is outside the formula "
+                f"of length {len(self.text)}."
+            )
+        return self.update(self.text[:offset] + inserted + self.text[offset + removed :])
+
+    def update(self, text: str):
+        """
+        Replace the formula and re-parse the regions that changed.
+
+        Returns:
+            The parsed tree of the new formula.
+
+        Raises:
+            ExpressionSyntaxError: If the formula is invalid.
+        """
+        self.text = text
+        self.tree = self.regions = None
+        self.last_parsed = []
+        regions = find_regions(text) if PLACEHOLDER_PREFIX not in text else None
+        if regions is None:
+            self.tree = self._parse(text, text)
+            return self.tree
+        cache: Dict[str, object] = {}
+        skeletons: Dict[str, object] = {}
+        try:
+            self._parse_region(regions, cache, skeletons)
+            parsed = True
+        except Exception:
+            parsed = False
+        if not parsed:
+            # The formula is invalid: parse the whole text, so the error is the
+            # one parse_func raises and points into the formula. Subtrees that
+            # did parse are kept for the edit that fixes it.
+            self._cache.update(cache)
+            self._skeletons.update(skeletons)
+            self.tree = self._parse(text, text)
+            return self.tree
+        self._cache = cache
+        self._skeletons = skeletons
+        self.regions = regions
+        self.tree = regions.node
+        return self.tree
+
+    def region_at(self, offset: int) -> Optional[FormulaRegion]:
+        """The innermost region containing ``offset``, None without regions."""
+        region = self.regions
+        if region is None:
+            return None
+        while True:
+            child = next((c for c in region.children if c.start <= offset < c.end), None)
+            if child is None:
+                return region
+            region = child
+
+    def _parse(self, key: str, skeleton: str):
+        self.last_parsed.append(key)
+        return parse_func(skeleton)
+
+    def _parse_region(self, region: FormulaRegion, cache: Dict[str, object], skeletons: Dict[str, object]) -> None:
+        for child in region.children:
+            self._parse_region(child, cache, skeletons)
+        region_text = self.text[region.start : region.end]
+        node = cache.get(region_text) or self._cache.get(region_text)
+        if node is None:
+            parts = []
+            subtrees = {}
+            position = region.start
+            for i, child in enumerate(region.children):
+                name = f"{PLACEHOLDER_PREFIX}{i}"
+                parts.append(self.text[position : child.start])
+                parts.append(f"[{name}]")
+                subtrees[name] = child.node
+                position = child.end
+            parts.append(self.text[position : region.end])
+            skeleton = "".join(parts)
+            template = skeletons.get(skeleton) or self._skeletons.get(skeleton)
+            if template is None:
+                template = self._parse(region_text, skeleton)
+            skeletons[skeleton] = template
+            node = _instantiate(template, subtrees)
+        cache[region_text] = node
+        region.node = node
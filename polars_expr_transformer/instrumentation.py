@@ -0,0 +1,182 @@
+"""
+Opt-in compile instrumentation.
+
+Registered observers receive a :class:`CompileStats` record for every formula
+compiled by ``build_func``, ``parse_func`` or ``prepare``: wall time per
+pipeline stage, the number of tokens, the size and depth of the parsed tree,
+and whether ``prepare`` was served from its cache. The records are plain data,
+so they can be forwarded to any metrics system without this library depending
+on one.
+
+While no observer is registered the compile path only checks an empty list,
+so instrumentation costs nothing when it is not used.
+
+Example:
+    >>> from polars_expr_transformer import simple_function_to_expr
+    >>> from polars_expr_transformer.instrumentation import add_observer
+    >>> add_observer(lambda stats: print(stats.expression, stats.total_time))
+    >>> simple_function_to_expr('[price] * [qty]')
+"""
+
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from polars_expr_transformer.process.models import ConditionVal, Func, IfFunc, TempFunc
+
+
+@dataclass
+class CompileStats:
+    """
+    Measurements of a single formula compile.
+
+    Attributes:
+        expression: The formula string.
+        stage_times: Wall time in seconds per pipeline stage, in run order.
+        total_time: Wall time in seconds of the whole compile.
+        token_count: Number of tokens the formula was split into.
+        node_count: Number of nodes in the parsed tree.
+        depth: Depth of the parsed tree.
+        cache_hit: For ``prepare``, whether the parsed formula came from its
+            cache; None for compiles that do not use a cache.
+        error: The error message if the compile failed, otherwise None.
+    """
+
+    expression: str
+    stage_times: Dict[str, float] = field(default_factory=dict)
+    total_time: float = 0.0
+    token_count: int = 0
+    node_count: int = 0
+    depth: int = 0
+    cache_hit: Optional[bool] = None
+    error: Optional[str] = None
+
+
+Observer = Callable[[CompileStats], None]
+
+# Replaced, never mutated, so compiles can read it without taking the lock.
+_observers: Tuple[Observer, ...] = ()
+_observers_lock = threading.Lock()
+
+# The compile currently being measured, so nested calls (build_func calling
+# parse_func, prepare calling parse_func) add to one record.
+_active: ContextVar[Optional[CompileStats]] = ContextVar("_active", default=None)
+
+
+def add_observer(observer: Observer) -> Observer:
+    """
+    Register a callback that receives a CompileStats per compile.
+
+    Args:
+        observer: Called with the CompileStats after each compile. Exceptions
+            raised by it are logged and do not affect the compile.
+
+    Returns:
+        The observer, so this can be used as a decorator.
+    """
+    global _observers
+    with _observers_lock:
+        _observers = _observers + (observer,)
+    return observer
+
+
+def remove_observer(observer: Observer) -> None:
+    """Unregister a callback registered with :func:`add_observer`."""
+    global _observers
+    with _observers_lock:
+        observers = list(_observers)
+        observers.remove(observer)
+        _observers = tuple(observers)
+
+
+def is_enabled() -> bool:
+    """Whether any observer is registered."""
+    return bool(_observers)
+
+
+@contextmanager
+def collect_stats() -> Iterator[List[CompileStats]]:
+    """
+    Collect the CompileStats of every compile inside the block.
+
+    Example:
+        >>> with collect_stats() as stats:
+        ...     simple_function_to_expr('[a] + 1')
+        >>> stats[0].stage_times
+    """
+    collected: List[CompileStats] = []
+    add_observer(collected.append)
+    try:
+        yield collected
+    finally:
+        remove_observer(collected.append)
+
+
+def _notify(stats: CompileStats) -> None:
+    for observer in _observers:
+        try:
+            observer(stats)
+        except Exception:
+            logging.exception("Compile observer %r failed", observer)
+
+
+@contextmanager
+def compile_span(expression: str) -> Iterator[CompileStats]:
+    """
+    Measure one compile and report it to the observers when it ends.
+
+    A span opened while another one is active reuses the outer record, so a
+    compile is reported once however many entry points it passes through.
+    """
+    active = _active.get()
+    if active is not None:
+        yield active
+        return
+    stats = CompileStats(expression)
+    token = _active.set(stats)
+    start = time.perf_counter()
+    try:
+        yield stats
+    except Exception as e:
+        stats.error = str(e)
+        raise
+    finally:
+        stats.total_time = time.perf_counter() - start
+        _active.reset(token)
+        _notify(stats)
+
+
+def timed(stats: CompileStats, stage: str, func: Callable, *args):
+    """Run ``func(*args)`` and record its wall time as ``stage``."""
+    start = time.perf_counter()
+    result = func(*args)
+    stats.stage_times[stage] = time.perf_counter() - start
+    return result
+
+
+def measure_tree(stats: CompileStats, tree) -> None:
+    """Record the node count and depth of a parsed tree."""
+    node_count = 0
+    depth = 0
+    to_visit = [(tree, 1)]
+    while to_visit:
+        node, level = to_visit.pop()
+        if node is None:
+            continue
+        node_count += 1
+        depth = max(depth, level)
+        if isinstance(node, (Func, TempFunc)):
+            to_visit.extend((arg, level + 1) for arg in node.args)
+            if isinstance(getattr(node, "func_ref", None), IfFunc):
+                to_visit.append((node.func_ref, level + 1))
+        elif isinstance(node, IfFunc):
+            to_visit.extend((condition, level + 1) for condition in node.conditions)
+            to_visit.append((node.else_val, level + 1))
+        elif isinstance(node, ConditionVal):
+            to_visit.extend([(node.condition, level + 1), (node.val, level + 1)])
+    stats.node_count = node_count
+    stats.depth = depth
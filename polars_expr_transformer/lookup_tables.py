@@ -0,0 +1,239 @@
+"""
+Registered lookup tables for the ``lookup`` formula function.
+
+Mapping codes to labels with long ``if`` chains, or with a mapping written out
+in every formula, is slow to compile and copies the mapping into every plan.
+Instead, register the table once by name:
+
+* a DataFrame, or
+* the path of a Parquet or IPC file, read on the first lookup. Parquet files
+  are decoded into memory; only IPC files are memory-mapped, so processes that
+  share an IPC file share its pages. Convert a large Parquet table to IPC once
+  to get the same.
+
+``lookup([key], "table", "value_column")`` then maps the key to the value
+column of the table. The table and its key and value columns are loaded once
+and shared by every formula and thread that uses them.
+
+A formula expression lowers the lookup to ``replace_strict`` with the shared
+Series. ``streaming.build_formula_plan`` lowers it to a left join instead,
+which the streaming engine runs without collecting the source.
+
+Example:
+    >>> import polars as pl
+    >>> from polars_expr_transformer import simple_function_to_expr
+    >>> from polars_expr_transformer.lookup_tables import register_lookup_table
+    >>> register_lookup_table('countries', 'countries.parquet', key='code')
+    >>> df.select(simple_function_to_expr('lookup([country], "countries", "name")'))
+"""
+
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+
+import polars as pl
+
+_READERS = {
+    ".parquet": pl.read_parquet,
+    ".ipc": lambda path: pl.read_ipc(path, memory_map=True),
+    ".arrow": lambda path: pl.read_ipc(path, memory_map=True),
+    ".feather": lambda path: pl.read_ipc(path, memory_map=True),
+}
+
+TableSource = Union[pl.DataFrame, str, Path]
+
+
+class LookupTable:
+    """
+    A registered lookup table, loaded on first use.
+
+    Args:
+        name: The name formulas refer to the table by.
+        source: A DataFrame, or the path of a Parquet or IPC file.
+        key: The key column; the first column when omitted. Its values must
+            be unique.
+    """
+
+    def __init__(self, name: str, source: TableSource, key: Optional[str] = None):
+        if not isinstance(source, pl.DataFrame):
+            suffix = Path(str(source)).suffix.lower()
+            if suffix not in _READERS:
+                raise ValueError(
+                    f"Cannot read lookup table {name!r} from {str(source)!r}: unknown file type "
+                    f"{suffix!r}. Supported: {', '.join(sorted(_READERS))}."
+                )
+        self.name = name
+        self.source = source
+        self._key = key
+        self._frame: Optional[pl.DataFrame] = None
+        self._columns: Dict[str, pl.Series] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def frame(self) -> pl.DataFrame:
+        """The table, read and validated on first access."""
+        if self._frame is None:
+            with self._lock:
+                if self._frame is None:
+                    self._frame = self._load()
+        return self._frame
+
+    @property
+    def key(self) -> str:
+        """The name of the key column."""
+        return self._key if self._key is not None else self.frame.columns[0]
+
+    def _load(self) -> pl.DataFrame:
+        if isinstance(self.source, pl.DataFrame):
+            frame = self.source
+        else:
+            frame = _READERS[Path(str(self.source)).suffix.lower()](self.source)
+        key = self._key if self._key is not None else frame.columns[0]
+        if key not in frame.columns:
+            raise ValueError(f"Lookup table {self.name!r} has no key column {key!r}.")
+        if frame[key].is_duplicated().any():
+            raise ValueError(f"The key column {key!r} of lookup table {self.name!r} has duplicate values.")
+        return frame
+
+    def column(self, name: str) -> pl.Series:
+        """A column of the table; the same Series for every call."""
+        series = self._columns.get(name)
+        if series is None:
+            frame = self.frame
+            if name not in frame.columns:
+                raise ValueError(
+                    f"Lookup table {self.name!r} has no column {name!r}. "
+                    f"Columns: {', '.join(frame.columns)}."
+                )
+            series = self._columns.setdefault(name, frame[name])
+        return series
+
+    def map(self, key: pl.Expr, column: str) -> pl.Expr:
+        """
+        Map the key to a column of the table; keys that are not found map to null.
+
+        Inside :func:`collect_lookup_joins` the lookup becomes a join of the
+        query; otherwise it is a ``replace_strict`` with the shared Series.
+        """
+        values = self.column(column)
+        joins = _active_joins.get()
+        if joins is not None:
+            return joins.add(self, key, column)
+        return key.replace_strict(self.column(self.key), values, default=None, return_dtype=values.dtype)
+
+    def __repr__(self) -> str:
+        source = "DataFrame" if isinstance(self.source, pl.DataFrame) else repr(str(self.source))
+        return f"LookupTable({self.name!r}, {source})"
+
+
+# Replaced, never mutated, so compiles can read it without taking the lock.
+_tables: Dict[str, LookupTable] = {}
+_tables_lock = threading.Lock()
+
+
+def register_lookup_table(name: str, source: TableSource, key: Optional[str] = None) -> LookupTable:
+    """
+    Register a table for the ``lookup`` function, replacing any table of that name.
+
+    Args:
+        name: The name formulas refer to the table by.
+        source: A DataFrame, or the path of a Parquet or IPC file. Files are
+            read on the first lookup.
+        key: The key column; the first column when omitted. Its values must
+            be unique.
+
+    Returns:
+        The registered LookupTable.
+    """
+    global _tables
+    table = LookupTable(name, source, key)
+    with _tables_lock:
+        _tables = {**_tables, name: table}
+    return table
+
+
+def unregister_lookup_table(name: str) -> None:
+    """Remove a table registered with :func:`register_lookup_table`."""
+    global _tables
+    with _tables_lock:
+        tables = dict(_tables)
+        tables.pop(name, None)
+        _tables = tables
+
+
+def lookup_table(name: str) -> LookupTable:
+    """
+    The registered table of a name.
+
+    Raises:
+        ValueError: If no table of that name is registered.
+    """
+    try:
+        return _tables[name]
+    except KeyError:
+        raise ValueError(
+            f"Unknown lookup table {name!r}. Register it with register_lookup_table() first."
+        ) from None
+
+
+class LookupJoins:
+    """The lookups of the formulas lowered in :func:`collect_lookup_joins`, as joins."""
+
+    def __init__(self):
+        # (table, key expression, key column name, {table column: output column name})
+        self._joins: List[Tuple[LookupTable, pl.Expr, str, Dict[str, str]]] = []
+
+    def add(self, table: LookupTable, key: pl.Expr, column: str) -> pl.Expr:
+        """Record a lookup and return the column its values are joined into."""
+        for joined, joined_key, key_name, columns in self._joins:
+            if joined is table and joined_key.meta.eq(key):
+                break
+        else:
+            key_name = f"__lookup_{len(self._joins)}__"
+            columns = {}
+            self._joins.append((table, key, key_name, columns))
+        output = columns.setdefault(column, f"{key_name}{column}")
+        return pl.col(output)
+
+    @property
+    def temporary_columns(self) -> List[str]:
+        """The key and value columns the joins add to the query."""
+        return [
+            name for _, _, key_name, columns in self._joins for name in (key_name, *columns.values())
+        ]
+
+    def apply(self, lf: pl.LazyFrame) -> pl.LazyFrame:
+        """Join the looked up columns to the query, keeping its row order."""
+        for table, key, key_name, columns in self._joins:
+            key_dtype = table.frame.schema[table.key]
+            right = table.frame.lazy().select(
+                pl.col(table.key).alias(key_name),
+                *(pl.col(column).alias(output) for column, output in columns.items()),
+            )
+            lf = lf.with_columns(key.cast(key_dtype).alias(key_name)).join(
+                right, on=key_name, how="left", maintain_order="left"
+            )
+        return lf
+
+
+_active_joins: ContextVar[Optional[LookupJoins]] = ContextVar("_active_joins", default=None)
+
+
+@contextmanager
+def collect_lookup_joins() -> Iterator[LookupJoins]:
+    """
+    Lower the lookups of the formulas compiled inside the block to joins.
+
+    Example:
+        >>> with collect_lookup_joins() as joins:
+        ...     expr = simple_function_to_expr('lookup([code], "countries", "name")')
+        >>> joins.apply(lf).with_columns(expr.alias('country')).drop(joins.temporary_columns)
+    """
+    joins = LookupJoins()
+    token = _active_joins.set(joins)
+    try:
+        yield joins
+    finally:
+        _active_joins.reset(token)
@@ -3,5 +3,17 @@ from polars_expr_transformer.process.polars_expr_transformer import (
     build_func,
     to_polars_code,
     to_flowframe_code,
+    template_function_to_expr,
 )
-from polars_expr_transformer.exceptions import ExpressionSyntaxError, PolarsCodeGenError
+from polars_expr_transformer.exceptions import (
+    ExpressionSyntaxError,
+    ParameterBindingError,
+    PolarsCodeGenError,
+    FormulaTooComplexError,
+)
+from polars_expr_transformer.process.parameters import prepare, PreparedFormula
+from polars_expr_transformer.process.filter_compiler import compile_filter, FilterPlan
+from polars_expr_transformer.process.aggregate_compiler import compile_aggregate, AggregatePlan
+from polars_expr_transformer.process.cost_model import CostLimits, estimate_cost
+from polars_expr_transformer.process.checker import check, Diagnostic
+from polars_expr_transformer.row_formulas import apply_formula_column
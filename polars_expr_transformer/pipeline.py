@@ -0,0 +1,324 @@
+"""
+Generate one Python module that applies a whole set of formulas.
+
+:func:`to_polars_code` emits one snippet per formula. For deployments that
+apply the same configured formulas on every run, :func:`generate_pipeline_source`
+emits a complete module instead, defining ``transform(lf)`` that derives every
+formula from a LazyFrame:
+
+* subexpressions that occur more than once are built once and bound to a
+  local variable;
+* formulas that do not read each other's output are grouped into one
+  ``with_columns`` call, and formulas that do are placed in a later one. New
+  columns are therefore added in stage order rather than in formula order.
+
+:func:`compile_pipeline` writes that module to a cache directory, named after a
+hash of the formulas, byte-compiles it and imports it. Later calls, in this or
+any other process, import the cached module (from its ``.pyc``) without parsing
+a single formula.
+
+Example:
+    >>> from polars_expr_transformer.pipeline import compile_pipeline
+    >>> pipeline = compile_pipeline(
+    ...     {'net': '[price] * [qty]', 'gross': '[net] * 1.21'},
+    ...     cache_dir='/var/cache/formulas',
+    ... )
+    >>> pipeline.transform(lf).collect()
+"""
+
+import ast
+import hashlib
+import importlib.util
+import json
+import os
+import pprint
+import py_compile
+import sys
+import tempfile
+from collections import Counter
+from importlib.metadata import PackageNotFoundError, version
+from pathlib import Path
+from types import ModuleType
+from typing import Dict, List, Mapping, Optional, Union
+
+import polars as pl
+
+from polars_expr_transformer.process.polars_expr_transformer import to_polars_code
+
+MODULE_PREFIX = "formula_pipeline_"
+
+# Bumped when the layout of the generated modules changes.
+PIPELINE_FORMAT = 1
+
+_SHARED_PREFIX = "_shared_"
+
+_HEADER = '''"""
+Formula pipeline generated by polars_expr_transformer; do not edit.
+"""
+
+import datetime
+
+import polars as pl
+{imports}
+FORMULAS = {formulas}
+
+FILTER = {filter!r}
+
+
+def transform(lf: pl.LazyFrame) -> pl.LazyFrame:
+'''
+
+
+def _package_version() -> str:
+    try:
+        return version("polars_expr_transformer")
+    except PackageNotFoundError:
+        return "unknown"
+
+
+def _is_pl_call(node: ast.AST, name: str) -> bool:
+    return (
+        isinstance(node, ast.Call)
+        and isinstance(node.func, ast.Attribute)
+        and node.func.attr == name
+        and isinstance(node.func.value, ast.Name)
+        and node.func.value.id == "pl"
+    )
+
+
+def _column_reads(tree: ast.AST) -> set:
+    """The names of the columns a generated expression reads."""
+    return {
+        node.args[0].value
+        for node in ast.walk(tree)
+        if _is_pl_call(node, "col")
+        and node.args
+        and isinstance(node.args[0], ast.Constant)
+        and isinstance(node.args[0].value, str)
+    }
+
+
+def _is_shareable(node: ast.AST) -> bool:
+    """Whether a generated node is an expression worth binding to a variable.
+
+    Column references and literals are cheap to repeat, ``when``/``then`` build
+    intermediate objects rather than expressions, and anything that reads no
+    column is a constant.
+    """
+    if isinstance(node, ast.Call):
+        if not isinstance(node.func, ast.Attribute) or node.func.attr in ("when", "then"):
+            return False
+        if _is_pl_call(node, "col") or _is_pl_call(node, "lit"):
+            return False
+    elif not isinstance(node, (ast.BinOp, ast.UnaryOp, ast.Compare, ast.BoolOp)):
+        return False
+    return any(_is_pl_call(child, "col") for child in ast.walk(node))
+
+
+class _Hoister(ast.NodeTransformer):
+    """Replace every repeated subexpression with a variable, bottom-up."""
+
+    def __init__(self, counts: Counter):
+        self.counts = counts
+        self.bindings: Dict[str, tuple] = {}
+
+    def visit(self, node):
+        key = ast.dump(node) if _is_shareable(node) else None
+        node = self.generic_visit(node)
+        if key is None or self.counts[key] < 2:
+            return node
+        if key not in self.bindings:
+            self.bindings[key] = (f"{_SHARED_PREFIX}{len(self.bindings)}", node)
+        return ast.Name(self.bindings[key][0], ast.Load())
+
+
+class _Inliner(ast.NodeTransformer):
+    """Substitute variables by the expressions or new names they map to."""
+
+    def __init__(self):
+        self.replacements: Dict[str, ast.expr] = {}
+
+    def visit_Name(self, node):
+        return self.replacements.get(node.id, node)
+
+
+def _share_subexpressions(trees: List[ast.expr]):
+    """
+    Bind the subexpressions that occur more than once to variables.
+
+    A subexpression of a repeated expression is counted once per occurrence of
+    its parent, so after hoisting, variables that are used only once are
+    inlined again and the rest are renumbered.
+
+    Returns:
+        The (name, expression) bindings in definition order and the rewritten trees.
+    """
+    counts = Counter(
+        ast.dump(node) for tree in trees for node in ast.walk(tree) if _is_shareable(node)
+    )
+    hoister = _Hoister(counts)
+    trees = [hoister.visit(tree) for tree in trees]
+    bindings = list(hoister.bindings.values())
+
+    uses = Counter(
+        node.id
+        for tree in [*trees, *(expr for _, expr in bindings)]
+        for node in ast.walk(tree)
+        if isinstance(node, ast.Name) and node.id.startswith(_SHARED_PREFIX)
+    )
+    inliner = _Inliner()
+    kept = []
+    for name, expr in bindings:
+        expr = inliner.visit(expr)
+        if uses[name] < 2:
+            inliner.replacements[name] = expr
+        else:
+            new_name = f"{_SHARED_PREFIX}{len(kept)}"
+            inliner.replacements[name] = ast.Name(new_name, ast.Load())
+            kept.append((new_name, expr))
+    return kept, [inliner.visit(tree) for tree in trees]
+
+
+def _stages(names: List[str], reads: List[set]) -> List[int]:
+    """
+    Assign every formula to a ``with_columns`` stage.
+
+    The formulas behave as if applied one after the other: a formula is placed
+    after every earlier formula whose output it reads, and never before an
+    earlier formula that reads the column it overwrites.
+    """
+    stages = []
+    for i, name in enumerate(names):
+        stage = 0
+        for j in range(i):
+            if names[j] in reads[i]:
+                stage = max(stage, stages[j] + 1)
+            if name in reads[j]:
+                stage = max(stage, stages[j])
+        stages.append(stage)
+    return stages
+
+
+def generate_pipeline_source(
+    formulas: Mapping[str, str],
+    filter: Optional[str] = None,
+    validate: Union[bool, str] = True,
+) -> str:
+    """
+    Generate the source of a module that applies every formula to a LazyFrame.
+
+    Args:
+        formulas: Output column name mapped to formula string. A formula may
+            read the output of the formulas before it.
+        filter: Optional formula used as a row filter, applied first.
+        validate: The validation mode for the generated code, as for
+            ``to_polars_code``: True or "eval" (default), "fast", or False.
+
+    Returns:
+        Python source defining ``transform(lf: pl.LazyFrame) -> pl.LazyFrame``.
+
+    Raises:
+        ExpressionSyntaxError: If any of the formulas is invalid.
+        PolarsCodeGenError: If the code generated for a formula is not valid.
+    """
+    names = list(formulas)
+    sources = [*formulas.values(), *([filter] if filter is not None else [])]
+    trees = [
+        ast.parse(to_polars_code(source, validate=validate), mode="eval").body
+        for source in sources
+    ]
+    stages = _stages(names, [_column_reads(tree) for tree in trees[: len(names)]])
+    bindings, trees = _share_subexpressions(trees)
+
+    lines = [f"    {name} = {ast.unparse(expr)}" for name, expr in bindings]
+    if filter is not None:
+        lines.append(f"    lf = lf.filter({ast.unparse(trees[-1])})")
+    for stage in range(max(stages, default=-1) + 1):
+        lines.append("    lf = lf.with_columns(")
+        for name, tree, formula_stage in zip(names, trees, stages):
+            if formula_stage == stage:
+                aliased = ast.Call(ast.Attribute(tree, "alias", ast.Load()), [ast.Constant(name)], [])
+                lines.append(f"        {ast.unparse(aliased)},")
+        lines.append("    )")
+    lines.append("    return lf")
+
+    # Lookups resolve their tables by name in the process running the pipeline.
+    uses_lookups = any("lookup_table(" in line for line in lines)
+    header = _HEADER.format(
+        imports="from polars_expr_transformer.lookup_tables import lookup_table\n" if uses_lookups else "",
+        formulas=pprint.pformat(dict(formulas), sort_dicts=False),
+        filter=filter,
+    )
+    return header + "\n".join(lines) + "\n"
+
+
+def pipeline_module_name(formulas: Mapping[str, str], filter: Optional[str] = None) -> str:
+    """
+    The module name a pipeline is cached under.
+
+    It is derived from the formulas, their order and the filter, and from the
+    versions of this package and Polars, so an upgrade regenerates the module.
+    """
+    key = json.dumps(
+        [list(formulas.items()), filter, PIPELINE_FORMAT, _package_version(), pl.__version__]
+    )
+    return MODULE_PREFIX + hashlib.sha256(key.encode()).hexdigest()[:20]
+
+
+def _write_module(path: Path, source: str) -> None:
+    # Write to a temporary file first, so concurrent workers never import a
+    # partially written module.
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as f:
+            f.write(source)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    py_compile.compile(str(path), doraise=True)
+
+
+def compile_pipeline(
+    formulas: Mapping[str, str],
+    cache_dir: Union[str, Path],
+    filter: Optional[str] = None,
+    validate: Union[bool, str] = True,
+) -> ModuleType:
+    """
+    Generate, cache and import the pipeline module for a set of formulas.
+
+    The module is written to ``cache_dir`` and byte-compiled the first time a
+    set of formulas is seen. After that it is imported from the cache, so no
+    formula is parsed. Workers can also put ``cache_dir`` on ``sys.path`` and
+    import it by :func:`pipeline_module_name`.
+
+    Args:
+        formulas: Output column name mapped to formula string. A formula may
+            read the output of the formulas before it.
+        cache_dir: Directory for the generated modules; created if missing.
+        filter: Optional formula used as a row filter, applied first.
+        validate: The validation mode used when the module is generated, as
+            for ``to_polars_code``.
+
+    Returns:
+        The imported module; call its ``transform(lf)``.
+
+    Raises:
+        ExpressionSyntaxError: If any of the formulas is invalid.
+        PolarsCodeGenError: If the code generated for a formula is not valid.
+    """
+    name = pipeline_module_name(formulas, filter)
+    path = Path(cache_dir) / f"{name}.py"
+    module = sys.modules.get(name)
+    if module is not None and Path(module.__file__) == path:
+        return module
+    if not path.exists():
+        path.parent.mkdir(parents=True, exist_ok=True)
+        _write_module(path, generate_pipeline_source(formulas, filter=filter, validate=validate))
+
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    sys.modules[name] = module
+    return module
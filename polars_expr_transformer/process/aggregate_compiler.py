@@ -0,0 +1,183 @@
+"""Compile aggregate formulas into a ``group_by().agg()`` plan.
+
+A formula such as ``sum([amount]) over([region])`` lowers to a window
+expression, which computes the total of each region and repeats it on every
+row. When one row per group is wanted instead, ``compile_aggregate`` turns the
+``over`` clauses into the keys of a ``group_by`` and lowers the rest of the
+formula as its aggregation:
+
+* every ``over`` clause of the formula must partition by the same keys,
+* the clauses are removed, so the aggregates reduce each group,
+* a formula without ``over`` aggregates the whole frame to a single row.
+
+Example:
+    >>> plan = compile_aggregate('sum([amount]) over([region]) / count() over([region])')
+    >>> plan.to_polars_code()
+    'df.group_by([pl.col("region")], maintain_order=True).agg((pl.col("amount").sum() / pl.len()).alias("result"))'
+    >>> plan.apply(df)
+"""
+
+from dataclasses import dataclass, field, replace
+from typing import List, Optional, Union
+
+import polars as pl
+
+from polars_expr_transformer.exceptions import ExpressionSyntaxError
+from polars_expr_transformer.process.models import Classifier, Func, IfFunc
+from polars_expr_transformer.process.polars_expr_transformer import parse_func
+
+_OVER = "over"
+_ORDER_BY = "order_by"
+
+
+@dataclass
+class AggregatePlan:
+    """
+    An aggregate formula compiled to group keys and an aggregation.
+
+    Attributes:
+        expression: The original formula string.
+        keys: The parsed group keys, the arguments of the ``over`` clauses;
+            empty when the formula aggregates the whole frame.
+        func: The formula with its ``over`` clauses removed.
+    """
+
+    expression: str
+    keys: List[Union[Func, IfFunc, Classifier]] = field(repr=False)
+    func: Union[Func, IfFunc, Classifier] = field(repr=False)
+
+    @property
+    def by(self) -> List[pl.Expr]:
+        """The group keys, for use with ``group_by``."""
+        return [_lower(key) for key in self.keys]
+
+    @property
+    def expr(self) -> pl.Expr:
+        """The aggregation, for use with ``group_by(...).agg``."""
+        return _lower(self.func)
+
+    def apply(self, frame: Union[pl.DataFrame, pl.LazyFrame], name: str = "result"):
+        """
+        Aggregate a frame: one row per group with its keys and the result.
+
+        Args:
+            frame: The DataFrame or LazyFrame to aggregate.
+            name: The name of the result column.
+
+        Returns:
+            A frame of the same kind, with the groups in order of appearance.
+        """
+        if not self.keys:
+            return frame.select(self.expr.alias(name))
+        return frame.group_by(self.by, maintain_order=True).agg(self.expr.alias(name))
+
+    def to_polars_code(self, frame: str = "df", name: str = "result", prefix: str = "pl") -> str:
+        """Generate native Polars Python code that aggregates ``frame``."""
+        expr = self.func.to_polars_code(prefix=prefix)
+        if " " in expr:
+            # An operator chain: .alias must apply to all of it.
+            expr = f"({expr})"
+        aggregation = f'{expr}.alias("{name}")'
+        if not self.keys:
+            return f"{frame}.select({aggregation})"
+        keys = ", ".join(key.to_polars_code(prefix=prefix) for key in self.keys)
+        return f"{frame}.group_by([{keys}], maintain_order=True).agg({aggregation})"
+
+
+def _lower(node) -> pl.Expr:
+    result = node.get_pl_func()
+    return result if isinstance(result, pl.Expr) else pl.lit(result)
+
+
+def _leaf_position(node) -> Optional[int]:
+    # Shared tokens keep the position of their first occurrence, so the
+    # leaves, e.g. column names, point into the text more reliably.
+    if isinstance(node, Classifier):
+        return node.position
+    if isinstance(node, Func):
+        for arg in node.args:
+            position = _leaf_position(arg)
+            if position is not None:
+                return position
+        if isinstance(node.func_ref, Classifier):
+            return node.func_ref.position
+    return None
+
+
+def _is_call(node, name: str) -> bool:
+    return isinstance(node, Func) and isinstance(node.func_ref, Classifier) and node.func_ref.val == name
+
+
+def _strip_over(root, func_str: str):
+    """
+    Copy a parsed formula without its ``over`` clauses, collecting their keys.
+
+    Interned subtrees are equal exactly when they are the same objects, so the
+    keys of two clauses match when their argument nodes are identical.
+    """
+    keys: Optional[list] = None
+    copies = {}
+
+    def strip(node):
+        nonlocal keys
+        if id(node) in copies:
+            return copies[id(node)]
+        if _is_call(node, _OVER):
+            clause_keys = node.args[1:]
+            for key in clause_keys:
+                if _is_call(key, _ORDER_BY):
+                    raise ExpressionSyntaxError(
+                        "order_by() cannot be used in an aggregate formula, which reduces each group.",
+                        func_str,
+                        key.func_ref.position,
+                        hint="Remove the order_by clause, or evaluate the formula as a window.",
+                    )
+            if keys is None:
+                keys = clause_keys
+            elif list(map(id, clause_keys)) != list(map(id, keys)):
+                differing = [k for i, k in enumerate(clause_keys) if i >= len(keys) or k is not keys[i]]
+                raise ExpressionSyntaxError(
+                    "Every over() clause of an aggregate formula must use the same keys.",
+                    func_str,
+                    _leaf_position((differing or clause_keys or [node])[0]),
+                    hint="Compile formulas with different keys separately.",
+                )
+            result = strip(node.args[0])
+        elif isinstance(node, Func):
+            result = replace(node, args=[strip(arg) for arg in node.args])
+        elif isinstance(node, IfFunc):
+            result = replace(
+                node,
+                conditions=[
+                    replace(c, condition=strip(c.condition), val=strip(c.val))
+                    for c in node.conditions
+                ],
+                else_val=strip(node.else_val),
+            )
+        else:
+            result = node
+        copies[id(node)] = result
+        return result
+
+    stripped = strip(root)
+    return stripped, list(keys or [])
+
+
+def compile_aggregate(func_str: str) -> AggregatePlan:
+    """
+    Compile an aggregate formula into a ``group_by().agg()`` plan.
+
+    Args:
+        func_str: The formula, e.g. ``sum([amount]) over([region])``. Its
+            ``over`` clauses give the group keys.
+
+    Returns:
+        An AggregatePlan; ``plan.by`` are the group keys, ``plan.expr`` is the
+        aggregation and ``plan.apply(df)`` runs both.
+
+    Raises:
+        ExpressionSyntaxError: If the expression syntax is invalid, or its
+            ``over`` clauses partition by different keys.
+    """
+    func, keys = _strip_over(parse_func(func_str), func_str)
+    return AggregatePlan(func_str, keys, func)
@@ -0,0 +1,356 @@
+"""
+Validate-only compilation: every problem of a formula, without lowering it.
+
+``build_func`` lowers the parsed tree to a Polars expression, which is most of
+the work of a compile and stops at the first problem. ``check`` parses the
+formula the same way and then only walks the tree, reporting:
+
+* syntax errors, with their position,
+* missing values, unknown functions and names, and calls with the wrong number
+  of arguments (see ``FUNCTION_INFO``),
+* with a schema: columns that do not exist,
+* type errors that Polars would raise when evaluating the expression, such as
+  comparing text with a number, a number as an ``if`` condition or
+  ``uppercase`` of a number column. Types come from the schema and the
+  literals, and flow through the functions as described by ``FUNCTION_TYPES``
+  in the settings.
+
+A formula without errors compiles; type checks only report what is certain
+to fail, so a value of unknown type is never an error.
+
+Example:
+    >>> import polars as pl
+    >>> from polars_expr_transformer import check
+    >>> for diagnostic in check('if [age] then left([name]) else "-" endif',
+    ...                         schema={'age': pl.Int64, 'name': pl.String}):
+    ...     print(diagnostic.message)
+    The condition of 'if' should be a boolean, but is a number.
+    Function 'left' takes 2 arguments, but 1 were given.
+"""
+
+from dataclasses import dataclass, field
+from difflib import get_close_matches
+from typing import Dict, List, Mapping, Optional
+
+import polars as pl
+
+from polars_expr_transformer.code_gen import OPERATOR_SYMBOLS
+from polars_expr_transformer.configs.settings import (
+    COLUMN_PLACEHOLDER,
+    FUNCTION_TYPES,
+    PARAMETER_FUNC,
+    aliases,
+)
+from polars_expr_transformer.exceptions import ExpressionSyntaxError, _format_message
+from polars_expr_transformer.funcs.registry import FUNCTION_INFO
+from polars_expr_transformer.process.models import Classifier, Func, IfFunc, ListLiteral
+from polars_expr_transformer.process.polars_expr_transformer import parse_func
+
+_ARITHMETIC = frozenset({"pl.Expr.add", "pl.Expr.sub", "pl.Expr.mul", "pl.Expr.truediv", "pl.Expr.mod"})
+_COMPARISONS = frozenset({"pl.Expr.lt", "pl.Expr.le", "pl.Expr.gt", "pl.Expr.ge", "pl.Expr.eq", "does_not_equal"})
+_LOGICAL = {"pl.Expr.and_": "and", "pl.Expr.or_": "or"}
+_NUMERIC = frozenset({"number", "boolean"})
+# Pairs of types that Polars refuses to compare; others are cast to a common type.
+_INCOMPARABLE = frozenset(
+    {
+        frozenset({"number", "string"}),
+        frozenset({"string", "date"}),
+        frozenset({"boolean", "date"}),
+    }
+)
+
+
+@dataclass(frozen=True)
+class Diagnostic:
+    """
+    A problem found by ``check``.
+
+    Attributes:
+        severity: "error" for a formula that fails to compile or to evaluate,
+            "warning" for one that works, but likely not as intended.
+        message: Description of the problem.
+        position: 0-based offset into the formula, if known.
+        hint: Optional suggestion for fixing the problem.
+        expression: The formula that was checked.
+    """
+
+    severity: str
+    message: str
+    position: Optional[int] = None
+    hint: Optional[str] = None
+    expression: Optional[str] = field(default=None, repr=False)
+
+    def __str__(self) -> str:
+        return f"{self.severity}: " + _format_message(self.message, self.expression, self.position, self.hint)
+
+
+def _dtype_type(dtype) -> str:
+    """The ``FUNCTION_TYPES`` type of the values of a Polars data type."""
+    if dtype == pl.String:
+        return "string"
+    if dtype == pl.Boolean:
+        return "boolean"
+    if dtype.is_numeric():
+        return "number"
+    if dtype == pl.Date or dtype == pl.Datetime:
+        return "date"
+    return "any"
+
+
+def _position(node) -> Optional[int]:
+    """The position of a node's own token, else of the first token below it."""
+    if isinstance(node, Classifier):
+        return node.position
+    ref = getattr(node, "func_ref", None)
+    if isinstance(ref, Classifier) and ref.position is not None:
+        return ref.position
+    if isinstance(node, Func):
+        for arg in node.args:
+            position = _position(arg)
+            if position is not None:
+                return position
+    return None
+
+
+def _is_bare_word(node) -> bool:
+    return isinstance(node, Classifier) and node.val_type == "string" and node.val[:1] not in ("'", '"')
+
+
+def _a(type_name: str) -> str:
+    return f"an {type_name}" if type_name[0] in "aeiou" else f"a {type_name}"
+
+
+class _Checker:
+    """Infers the type of every node of a parsed formula, collecting diagnostics."""
+
+    def __init__(self, expression: str, schema: Optional[Mapping[str, pl.DataType]]):
+        self.expression = expression
+        self.schema = schema
+        self.diagnostics: List[Diagnostic] = []
+        # Types by node id; interned subtrees are checked, and reported, once.
+        self._types: Dict[int, str] = {}
+
+    def report(self, message: str, node, hint: str = None, severity: str = "error") -> None:
+        self.diagnostics.append(Diagnostic(severity, message, _position(node), hint, self.expression))
+
+    def type_of(self, node) -> str:
+        key = id(node)
+        if key not in self._types:
+            self._types[key] = self._infer(node)
+        return self._types[key]
+
+    def _infer(self, node) -> str:
+        if isinstance(node, Classifier):
+            return self._literal(node)
+        if isinstance(node, IfFunc):
+            return self._conditional(node)
+        if not isinstance(node, Func):
+            return "any"
+        if not isinstance(node.func_ref, Classifier):
+            self.type_of(node.func_ref)
+            for arg in node.args:
+                self.type_of(arg)
+            return "any"
+        name = node.func_ref.val
+        if name == "pl.lit":
+            return self._value(node)
+        if name == "pl.col":
+            return self._column(node)
+        if name == PARAMETER_FUNC:
+            return "any"
+        types = [self.type_of(arg) for arg in node.args]
+        if name in OPERATOR_SYMBOLS and name != "pl.Expr.is_null" and len(types) != 2:
+            symbol = _LOGICAL.get(name, OPERATOR_SYMBOLS[name])
+            self.report(f"Operator '{symbol}' needs a value on both sides.", node)
+            return "boolean" if name in _COMPARISONS else "any"
+        if name in _ARITHMETIC:
+            return self._arithmetic(node, *types)
+        if name in _COMPARISONS:
+            left, right = types
+            if frozenset(types) in _INCOMPARABLE:
+                self.report(f"Cannot compare {_a(left)} with {_a(right)} using '{OPERATOR_SYMBOLS[name]}'.", node)
+            return "boolean"
+        if name in _LOGICAL:
+            for value_type in types:
+                if value_type in ("string", "date"):
+                    self.report(f"'{_LOGICAL[name]}' needs booleans, but got {_a(value_type)}.", node)
+            return "boolean" if set(types) == {"boolean"} else "any"
+        if name == "pl.Expr.is_null":
+            return "boolean"
+        if name == "_in" and len(node.args) == 2 and isinstance(node.args[1], ListLiteral):
+            return self._membership(node, types[0], node.args[1])
+        return self._call(node, name, types)
+
+    def _literal(self, node: Classifier) -> str:
+        if node.val_type == "number":
+            return "number"
+        if node.val_type == "boolean":
+            return "boolean"
+        if _is_bare_word(node):
+            self.report(
+                f"Unknown name '{node.val}'.",
+                node,
+                hint="Put text in quotes and column names in square brackets, e.g. \"text\" or [column].",
+            )
+            return "any"
+        return "string" if node.val_type == "string" else "any"
+
+    def _value(self, node: Func) -> str:
+        if len(node.args) == 1:
+            return self.type_of(node.args[0])
+        if not node.args:
+            self.report(
+                "Expected a value, but found nothing. A value is missing — "
+                "for example an empty branch between 'then' and 'else'/'endif', "
+                "or empty parentheses '()'.",
+                node,
+            )
+            return "any"
+        args = node.args
+        if _is_bare_word(args[0]):
+            self.report(
+                f"Unknown function '{args[0].val}'.",
+                args[0],
+                hint="get_all_expressions() lists the available functions.",
+            )
+            args = args[1:]
+        else:
+            self.report(
+                f"Expected a single value, but found {len(args)}. "
+                "An operator is probably missing between two values.",
+                node,
+            )
+        for arg in args:
+            self.type_of(arg)
+        return "any"
+
+    def _column(self, node: Func) -> str:
+        name = node.args[0].val.strip("\"'")
+        if self.schema is None or name == COLUMN_PLACEHOLDER:
+            return "any"
+        if name not in self.schema:
+            matches = get_close_matches(name, list(self.schema), n=1)
+            self.report(
+                f"Unknown column '{name}'.",
+                node.args[0],
+                hint=f"Did you mean [{matches[0]}]?" if matches else None,
+            )
+            return "any"
+        return _dtype_type(self.schema[name])
+
+    def _arithmetic(self, node: Func, left: str, right: str) -> str:
+        symbol = OPERATOR_SYMBOLS[node.func_ref.val]
+        types = {left, right}
+        if "string" in types and symbol != "+":
+            self.report(f"Cannot apply '{symbol}' to a string.", node)
+            return "any"
+        if "any" in types:
+            return "any"
+        if types <= {"string", "boolean"} and "string" in types:
+            return "string"
+        if types <= _NUMERIC and not (types == {"boolean"} and symbol in "-*%"):
+            return "number"
+        if symbol == "-" and types == {"date"}:
+            return "any"
+        self.report(f"Cannot apply '{symbol}' to {_a(left)} and {_a(right)}.", node)
+        return "any"
+
+    def _membership(self, node: Func, value_type: str, values: ListLiteral) -> str:
+        # is_in does not cast: the value and the list must be of one type.
+        first = values.values[0]
+        item_type = "boolean" if isinstance(first, bool) else "string" if isinstance(first, str) else "number"
+        if value_type not in (item_type, "any"):
+            self.report(f"Cannot look up {_a(value_type)} in a list of {item_type}s.", node)
+        return "boolean"
+
+    def _conditional(self, node: IfFunc) -> str:
+        for condition in node.conditions:
+            condition_type = self.type_of(condition.condition)
+            if condition_type not in ("boolean", "any"):
+                self.report(
+                    f"The condition of 'if' should be a boolean, but is {_a(condition_type)}.",
+                    condition.condition,
+                    hint="Compare the value, e.g. [amount] > 0.",
+                )
+        types = {self.type_of(c.val) for c in node.conditions} | {self.type_of(node.else_val)}
+        known = sorted(types - {"any"})
+        if len(known) > 1:
+            self.report(
+                f"The branches of 'if' have different types: {', '.join(known)}. "
+                "Polars converts them to one type.",
+                node,
+                severity="warning",
+            )
+        return known[0] if len(known) == 1 and "any" not in types else "any"
+
+    def _call(self, node: Func, name: str, types: List[str]) -> str:
+        name = aliases.get(name, name)
+        info = FUNCTION_INFO.get(name)
+        given = len(node.args)
+        if info is not None and (given < info.min_args or (info.max_args is not None and given > info.max_args)):
+            if info.max_args is None:
+                expected = f"at least {info.min_args}"
+            elif info.min_args == info.max_args:
+                expected = str(info.min_args)
+            else:
+                expected = f"{info.min_args} to {info.max_args}"
+            self.report(
+                f"Function '{node.func_ref.val}' takes {expected} arguments, but {given} were given.",
+                node,
+            )
+        signature = FUNCTION_TYPES.get(name)
+        if signature is None:
+            return "any"
+        arg_types, result = signature
+        for i, (arg, expected, actual) in enumerate(zip(node.args, arg_types, types), 1):
+            if expected == "any" or actual in (expected, "any"):
+                continue
+            if expected == "number" and actual == "boolean":
+                continue
+            self.report(
+                f"Argument {i} of '{node.func_ref.val}' should be {_a(expected)}, but is {_a(actual)}.",
+                arg,
+            )
+        if result == "first":
+            return types[0] if types else "any"
+        if result == "same":
+            known = set(types) - {"any"}
+            return known.pop() if len(known) == 1 and "any" not in types else "any"
+        return result
+
+
+def check(formula: str, schema: Optional[Mapping[str, pl.DataType]] = None) -> List[Diagnostic]:
+    """
+    Check a formula without building its Polars expression.
+
+    Parses the formula as ``build_func`` does, then reports every problem the
+    parsed tree shows instead of stopping at the first one. Much faster than
+    a full compile, for validating large catalogs of formulas.
+
+    Args:
+        formula: The formula to check.
+        schema: Optional column names mapped to Polars data types, e.g.
+            ``df.schema``. Columns are then checked to exist, and their types
+            are used for type checking.
+
+    Returns:
+        The diagnostics, ordered by position; an empty list when the formula is
+        valid. A syntax error is reported alone, as the rest of the formula
+        cannot be checked.
+
+    Example:
+        >>> check('uppercase([name]) + 1', schema={'name': pl.String})
+        [Diagnostic(severity='error', message="Cannot apply '+' to a string and a number.", position=18, hint=None)]
+    """
+    try:
+        func = parse_func(formula)
+    except ExpressionSyntaxError as error:
+        return [Diagnostic("error", error.bare_message, error.position, error.hint, formula)]
+    except Exception as error:
+        return [Diagnostic("error", str(error), expression=formula)]
+    checker = _Checker(formula, schema)
+    checker.type_of(func)
+    return sorted(
+        checker.diagnostics,
+        key=lambda d: (d.position is None, d.position or 0),
+    )
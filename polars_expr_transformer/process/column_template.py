@@ -0,0 +1,111 @@
+"""Column templates: one formula applied to many columns.
+
+A column template is a formula that references the placeholder column
+``[$col]`` instead of a concrete column, e.g. ``trim(lowercase([$col]))``.
+The formula is parsed once; binding replaces every placeholder reference with
+a :class:`ColumnSelection`, which lowers to ``pl.col([...])`` or a Polars
+selector. Polars then expands the single expression over all selected
+columns in one projection.
+"""
+
+from typing import List, Union
+
+import polars as pl
+
+from polars_expr_transformer.configs.settings import COLUMN_PLACEHOLDER
+from polars_expr_transformer.exceptions import ExpressionSyntaxError
+from polars_expr_transformer.process.models import (
+    Classifier,
+    ColumnSelection,
+    Func,
+    IfFunc,
+    TempFunc,
+)
+
+
+def is_column_placeholder(obj) -> bool:
+    """Check whether a node is the ``pl.col("$col")`` placeholder reference."""
+    return (
+        isinstance(obj, Func)
+        and isinstance(obj.func_ref, Classifier)
+        and obj.func_ref.val == "pl.col"
+        and len(obj.args) == 1
+        and isinstance(obj.args[0], Classifier)
+        and obj.args[0].val.strip("\"'") == COLUMN_PLACEHOLDER
+    )
+
+
+def bind_column_placeholder(
+    func: Union[Func, IfFunc], columns: Union[List[str], pl.Expr]
+) -> int:
+    """
+    Replace every [$col] reference in the hierarchy with a ColumnSelection.
+
+    Args:
+        func: The finalized hierarchical formula, modified in place.
+        columns: The column names or Polars selector to bind the placeholder to.
+
+    Returns:
+        The number of placeholder references that were bound.
+    """
+    bound = 0
+
+    def bind(obj):
+        nonlocal bound
+        if not is_column_placeholder(obj):
+            return obj
+        bound += 1
+        selection = ColumnSelection(columns)
+        selection.parent = obj.parent
+        return selection
+
+    to_visit = [func]
+    while to_visit:
+        node = to_visit.pop()
+        if isinstance(node, (Func, TempFunc)):
+            node.args = [bind(arg) for arg in node.args]
+            to_visit.extend(node.args)
+        elif isinstance(node, IfFunc):
+            for condition in node.conditions:
+                condition.condition = bind(condition.condition)
+                condition.val = bind(condition.val)
+                to_visit.extend([condition.condition, condition.val])
+            node.else_val = bind(node.else_val)
+            to_visit.append(node.else_val)
+    return bound
+
+
+def name_template_columns(expr: pl.Expr, name_template: str = None) -> pl.Expr:
+    """
+    Apply the output naming rules of a column template.
+
+    Every output column keeps the name of the column it was computed from. With
+    ``name_template``, that name is formatted into the template, e.g.
+    ``"{col}_clean"``.
+    """
+    expr = expr.name.keep()
+    if name_template is not None:
+        expr = expr.name.map(lambda name: name_template.format(col=name))
+    return expr
+
+
+def check_columns(columns: Union[List[str], pl.Expr]) -> None:
+    """Raise a clear error when the columns to bind are unusable."""
+    if isinstance(columns, pl.Expr):
+        return
+    if isinstance(columns, str):
+        raise TypeError(
+            "columns must be a list of column names or a Polars selector, "
+            f"not a single string ({columns!r})."
+        )
+    if len(columns) == 0:
+        raise ValueError("columns must contain at least one column name.")
+
+
+def missing_placeholder_error(func_str: str) -> ExpressionSyntaxError:
+    return ExpressionSyntaxError(
+        f"Column template does not reference the placeholder [{COLUMN_PLACEHOLDER}].",
+        expression=func_str,
+        hint=f"Use [{COLUMN_PLACEHOLDER}] where the column should go, "
+        f"e.g. trim(lowercase([{COLUMN_PLACEHOLDER}])).",
+    )
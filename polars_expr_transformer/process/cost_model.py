@@ -0,0 +1,293 @@
+"""Static cost model and complexity budgets for untrusted formulas.
+
+Formulas typed by end users can be pathological: thousands of nested calls, a
+megabyte string literal, or ``repeat`` with a huge count. ``CostLimits``
+describes what a service is willing to compile; passing it as ``limits`` to
+``simple_function_to_expr``/``build_func`` rejects a formula with a
+``FormulaTooComplexError`` before it is lowered:
+
+1. the raw text is checked for length, string-literal size, nesting depth
+   (of brackets, ``if`` blocks and runs of unary minus) and number of
+   operators, so deep trees are rejected before the recursive parser sees
+   them; a list of literals after ``in`` is one node, so its values count
+   toward their own limit instead of the length,
+2. preprocessing and tokenizing run under a wall-clock deadline,
+3. the parsed tree's node count, depth, regex use and estimated evaluation
+   cost (weighted with ``FUNCTION_COSTS`` from the settings) are checked.
+"""
+
+import re
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Iterator, Optional
+
+from polars_expr_transformer.configs.settings import FUNCTION_COSTS, REGEX_FUNCTIONS
+from polars_expr_transformer.exceptions import FormulaTooComplexError
+from polars_expr_transformer.process.models import (
+    Classifier,
+    ConditionVal,
+    Func,
+    IfFunc,
+    TempFunc,
+)
+
+# String literals (possibly unterminated) and column names.
+_QUOTED = re.compile(r"\"[^\"]*\"?|'[^']*'?|\[[^\]]*\]?")
+_BRACKETS = re.compile(r"[()]")
+# A list of literals after 'in', once the text of its strings is blanked out:
+# the parentheses hold only the characters of numbers, booleans, quotes and
+# commas. Lists that match but do not parse are syntax errors of the lexer.
+_PARENTHESES_AFTER_IN = re.compile(r"\bin\s*\(([^()]*)\)", re.IGNORECASE)
+_LIST_TEXT = re.compile(r"[-\s\d.,eE\"'truefalsTRUEFALS]*")
+_IF_KEYWORDS = re.compile(r"\b(?:if|endif)\b", re.IGNORECASE)
+_MINUS_RUNS = re.compile(r"-(?:\s*-)*")
+# A run of symbol characters is one operator, e.g. '<='; and/or/in are words.
+_OPERATORS = re.compile(r"[-+*/%<>=!&|]+|\b(?:and|or|in)\b", re.IGNORECASE)
+
+# The repeat implementation concatenates this many copies for a dynamic count.
+_DYNAMIC_REPEAT_COUNT = 100
+
+
+@dataclass(frozen=True)
+class CostLimits:
+    """
+    Budgets a formula must stay within to be compiled. None disables a check.
+
+    Attributes:
+        max_length: Maximum number of characters of the formula.
+        max_string_literal: Maximum number of characters of one string literal.
+        max_depth: Maximum nesting depth, of brackets in the text and of the tree.
+        max_nodes: Maximum number of nodes in the parsed tree.
+        max_list_values: Maximum number of values in the lists after ``in``,
+            together. A list is one node of the tree.
+        max_regex: Maximum number of regex-based function calls.
+        max_cost: Maximum estimated evaluation cost (see ``estimate_cost``).
+        max_parse_seconds: Wall-clock budget for preprocessing and tokenizing.
+    """
+
+    max_length: Optional[int] = 20_000
+    max_string_literal: Optional[int] = 10_000
+    max_depth: Optional[int] = 100
+    max_nodes: Optional[int] = 5_000
+    max_list_values: Optional[int] = 100_000
+    max_regex: Optional[int] = 20
+    max_cost: Optional[float] = 10_000
+    max_parse_seconds: Optional[float] = 1.0
+
+
+@dataclass
+class CostEstimate:
+    """
+    Static measurements of a parsed formula.
+
+    Attributes:
+        nodes: Number of nodes in the tree.
+        depth: Depth of the tree.
+        regex_count: Number of regex-based function calls.
+        cost: Estimated relative evaluation cost per row.
+    """
+
+    nodes: int = 0
+    depth: int = 0
+    regex_count: int = 0
+    cost: float = 0.0
+
+
+def _exceeds(limit: str, value, maximum, what: str) -> FormulaTooComplexError:
+    return FormulaTooComplexError(
+        f"Formula is too complex: {what} is {value}, the maximum is {maximum}.",
+        limit=limit,
+        value=value,
+        maximum=maximum,
+    )
+
+
+def check_source(func_str: str, limits: CostLimits) -> None:
+    """
+    Check the raw formula text against the size and nesting limits.
+
+    A list of literals after ``in`` becomes one node, however long, so its
+    text does not count toward ``max_length``; its values count toward
+    ``max_list_values`` instead.
+
+    Raises:
+        FormulaTooComplexError: If a limit is exceeded.
+    """
+    # The formula with the text of string literals and column names blanked out.
+    pieces = []
+    last = 0
+    longest_literal = 0
+    for match in _QUOTED.finditer(func_str):
+        text = match.group()
+        if text[0] != "[":
+            closed = len(text) > 1 and text[-1] == text[0]
+            longest_literal = max(longest_literal, len(text) - 1 - closed)
+        pieces += [func_str[last:match.start()], text[0], " " * (len(text) - 2), text[-1] if len(text) > 1 else ""]
+        last = match.end()
+    pieces.append(func_str[last:])
+    code = "".join(pieces)
+
+    list_length = list_values = 0
+    lists = []
+    for match in _PARENTHESES_AFTER_IN.finditer(code):
+        values = match.group(1)
+        if "," in values and _LIST_TEXT.fullmatch(values):
+            lists.append(match.span())
+            list_length += len(match.group())
+            list_values += values.count(",") + (not values.rstrip().endswith(","))
+    if lists:
+        code = "".join(
+            code[end:start] + "in ( )"
+            for end, start in zip([0] + [end for _, end in lists], [start for start, _ in lists])
+        ) + code[lists[-1][1]:]
+
+    length = len(func_str) - list_length
+    if limits.max_length is not None and length > limits.max_length:
+        raise _exceeds("max_length", length, limits.max_length, "the length")
+    if limits.max_list_values is not None and list_values > limits.max_list_values:
+        raise _exceeds("max_list_values", list_values, limits.max_list_values, "the number of list values")
+    if limits.max_string_literal is not None and longest_literal > limits.max_string_literal:
+        raise _exceeds(
+            "max_string_literal",
+            longest_literal,
+            limits.max_string_literal,
+            "the longest string literal",
+        )
+
+    depth = max_depth = 0
+    for bracket in _BRACKETS.finditer(code):
+        depth += 1 if bracket.group() == "(" else -1
+        max_depth = max(max_depth, depth)
+    # Every if block and every unary minus nests the tree one level deeper.
+    if_depth = max_if_depth = 0
+    for keyword in _IF_KEYWORDS.finditer(code):
+        if_depth += 1 if keyword.group().lower() == "if" else -1
+        max_if_depth = max(max_if_depth, if_depth)
+    longest_minus_run = max((run.group().count("-") for run in _MINUS_RUNS.finditer(code)), default=0)
+    max_depth = max(max_depth, max_if_depth, longest_minus_run)
+    if limits.max_depth is not None and max_depth > limits.max_depth:
+        raise _exceeds("max_depth", max_depth, limits.max_depth, "the nesting depth")
+    # An operator and its operands are at least two nodes of the tree.
+    if limits.max_nodes is not None:
+        operators = len(_OPERATORS.findall(code))
+        if 2 * operators > limits.max_nodes:
+            raise _exceeds("max_nodes", operators, limits.max_nodes // 2, "the number of operators")
+
+
+_deadline: ContextVar[Optional[float]] = ContextVar("_deadline", default=None)
+_deadline_budget: ContextVar[Optional[float]] = ContextVar("_deadline_budget", default=None)
+
+
+@contextmanager
+def parse_deadline(seconds: Optional[float]) -> Iterator[None]:
+    """Enforce a wall-clock budget on the preprocess and tokenize stages."""
+    if seconds is None:
+        yield
+        return
+    token = _deadline.set(time.perf_counter() + seconds)
+    budget_token = _deadline_budget.set(seconds)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+        _deadline_budget.reset(budget_token)
+
+
+def current_deadline() -> Optional[float]:
+    """The perf_counter time the current parse must finish by, if any."""
+    return _deadline.get()
+
+
+def check_deadline(stage: str) -> None:
+    """
+    Raise if the current parse has run past its deadline.
+
+    Raises:
+        FormulaTooComplexError: If the deadline has passed.
+    """
+    deadline = _deadline.get()
+    if deadline is not None and time.perf_counter() > deadline:
+        budget = _deadline_budget.get()
+        raise FormulaTooComplexError(
+            f"Formula is too complex: {stage} exceeded the time budget of {budget}s.",
+            limit="max_parse_seconds",
+            value=stage,
+            maximum=budget,
+        )
+
+
+def _repeat_count(func: Func) -> int:
+    if len(func.args) == 2:
+        count = func.args[1]
+        while isinstance(count, Func) and count.func_ref == "pl.lit" and len(count.args) == 1:
+            count = count.args[0]
+        if isinstance(count, Classifier) and count.val_type == "number":
+            return max(int(float(count.val)), 1)
+    return _DYNAMIC_REPEAT_COUNT
+
+
+def estimate_cost(func) -> CostEstimate:
+    """
+    Estimate the size and evaluation cost of a parsed formula.
+
+    Every function call costs its weight from ``FUNCTION_COSTS`` (1 if not
+    listed); ``repeat`` is multiplied by its count.
+
+    Args:
+        func: A parsed Func hierarchy, e.g. from ``parse_func``.
+
+    Returns:
+        The CostEstimate.
+    """
+    estimate = CostEstimate()
+    to_visit = [(func, 1)]
+    while to_visit:
+        node, level = to_visit.pop()
+        if node is None:
+            continue
+        estimate.nodes += 1
+        estimate.depth = max(estimate.depth, level)
+        if isinstance(node, (Func, TempFunc)):
+            name = getattr(getattr(node, "func_ref", None), "val", None)
+            if name not in (None, "pl.lit", "pl.col"):
+                weight = FUNCTION_COSTS.get(name, 1)
+                if name == "repeat":
+                    weight *= _repeat_count(node)
+                estimate.cost += weight
+            if name in REGEX_FUNCTIONS:
+                estimate.regex_count += 1
+            if isinstance(getattr(node, "func_ref", None), IfFunc):
+                to_visit.append((node.func_ref, level + 1))
+            to_visit.extend((arg, level + 1) for arg in node.args)
+        elif isinstance(node, IfFunc):
+            estimate.cost += len(node.conditions)
+            to_visit.extend((condition, level + 1) for condition in node.conditions)
+            to_visit.append((node.else_val, level + 1))
+        elif isinstance(node, ConditionVal):
+            to_visit.extend([(node.condition, level + 1), (node.val, level + 1)])
+    return estimate
+
+
+def check_cost(func, limits: CostLimits) -> CostEstimate:
+    """
+    Check a parsed formula against the tree limits.
+
+    Returns:
+        The CostEstimate, if every limit holds.
+
+    Raises:
+        FormulaTooComplexError: If a limit is exceeded.
+    """
+    estimate = estimate_cost(func)
+    checks = (
+        ("max_nodes", estimate.nodes, limits.max_nodes, "the number of nodes"),
+        ("max_depth", estimate.depth, limits.max_depth, "the tree depth"),
+        ("max_regex", estimate.regex_count, limits.max_regex, "the number of regex calls"),
+        ("max_cost", estimate.cost, limits.max_cost, "the estimated cost"),
+    )
+    for limit, value, maximum, what in checks:
+        if maximum is not None and value > maximum:
+            raise _exceeds(limit, value, maximum, what)
+    return estimate
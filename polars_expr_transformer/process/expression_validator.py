@@ -24,13 +24,17 @@ stricter than the old pipeline, which never recognized mixed-case keywords and
 in some positions silently dropped them from the parsed expression. A clear
 error is preferable to silently ignoring part of the user's input.
 
+The scan is also the pipeline's lexer: :func:`scan_expression` returns the
+lexemes it validated, and ``tokenize.lex`` maps them to positioned tokens
+instead of rewriting and scanning the text again.
+
 Known pre-existing quirk, intentionally untouched here: keyword rewriting in
 ``preprocess.py`` does not protect ``[column]`` references, so a column literally
 named e.g. ``[then]`` is mangled by ``mark_special_tokens``. This scanner skips
 ``[...]``, so it neither masks nor worsens that.
 """
 
-from typing import List, Tuple
+from typing import List, NamedTuple, Tuple
 
 from polars_expr_transformer.exceptions import ExpressionSyntaxError
 
@@ -83,15 +87,23 @@ def find_comment_spans(expression: str) -> List[Tuple[int, int]]:
     return spans
 
 
-def _scan_events(expression: str) -> List[Tuple[str, int, str]]:
-    """Scan the raw expression into ordered ('paren'|'word', index, value) events.
+class Lexeme(NamedTuple):
+    """A span of the raw expression found by :func:`scan_expression`.
 
-    Content inside // comments, string literals and [column] references is
-    skipped entirely. Comments are masked first (using the same per-line
-    algorithm as preprocess.remove_comments), matching the pipeline, where
-    comment removal runs before everything else.
+    ``kind`` is "comment", "string", "column" (a ``[...]`` reference, brackets
+    included), "word" (a run of word characters), "paren" or "char" (any other
+    character that is not whitespace). Strings and columns that are not closed
+    run to the end of the expression.
     """
-    events = []
+
+    kind: str
+    start: int
+    end: int
+
+
+def _scan(expression: str) -> List[Lexeme]:
+    """Split the raw expression into lexemes; whitespace is skipped."""
+    lexemes = []
     word_start = None
     i = 0
     n = len(expression)
@@ -104,13 +116,17 @@ def _scan_events(expression: str) -> List[Tuple[str, int, str]]:
     def flush_word(end: int):
         nonlocal word_start
         if word_start is not None:
-            events.append(("word", word_start, expression[word_start:end]))
+            lexemes.append(Lexeme("word", word_start, end))
             word_start = None
 
     while i < n:
         if masked[i]:
             flush_word(i)
-            i += 1
+            j = i
+            while j < n and masked[j]:
+                j += 1
+            lexemes.append(Lexeme("comment", i, j))
+            i = j
             continue
         ch = expression[i]
         if ch in ('"', "'"):
@@ -118,6 +134,7 @@ def _scan_events(expression: str) -> List[Tuple[str, int, str]]:
             j = i + 1
             while j < n and (masked[j] or expression[j] != ch):
                 j += 1
+            lexemes.append(Lexeme("string", i, min(j + 1, n)))
             i = n if j >= n else j + 1
         elif ch == "[":
             flush_word(i)
@@ -137,10 +154,11 @@ def _scan_events(expression: str) -> List[Tuple[str, int, str]]:
                 elif c == "]":
                     break
                 j += 1
+            lexemes.append(Lexeme("column", i, min(j + 1, n)))
             i = n if j >= n else j + 1
         elif ch in ("(", ")"):
             flush_word(i)
-            events.append(("paren", i, ch))
+            lexemes.append(Lexeme("paren", i, i + 1))
             i += 1
         elif _is_word_char(ch):
             if word_start is None:
@@ -148,9 +166,30 @@ def _scan_events(expression: str) -> List[Tuple[str, int, str]]:
             i += 1
         else:
             flush_word(i)
+            if not ch.isspace():
+                lexemes.append(Lexeme("char", i, i + 1))
             i += 1
     flush_word(n)
-    return events
+    return lexemes
+
+
+def _events(expression: str, lexemes: List[Lexeme]) -> List[Tuple[str, int, str]]:
+    return [
+        (lexeme.kind, lexeme.start, expression[lexeme.start:lexeme.end])
+        for lexeme in lexemes
+        if lexeme.kind in ("paren", "word")
+    ]
+
+
+def _scan_events(expression: str) -> List[Tuple[str, int, str]]:
+    """Scan the raw expression into ordered ('paren'|'word', index, value) events.
+
+    Content inside // comments, string literals and [column] references is
+    skipped entirely. Comments are masked first (using the same per-line
+    algorithm as preprocess.remove_comments), matching the pipeline, where
+    comment removal runs before everything else.
+    """
+    return _events(expression, _scan(expression))
 
 
 def _validate_parentheses(expression: str, events: List[Tuple[str, int, str]]):
@@ -355,6 +394,27 @@ def validate_expression_syntax(expression: str) -> None:
         ExpressionSyntaxError: If parentheses are unbalanced or conditional
             keywords are misplaced, with the offending position and a hint.
     """
-    events = _scan_events(expression)
+    scan_expression(expression)
+
+
+def scan_expression(expression: str) -> List[Lexeme]:
+    """Validate the raw expression and return the lexemes it was scanned into.
+
+    This is the single scan of the user's text: ``tokenize.lex`` turns the
+    lexemes into positioned tokens without scanning the text again.
+
+    Args:
+        expression: The expression string to validate.
+
+    Returns:
+        The lexemes of the expression, in text order.
+
+    Raises:
+        ExpressionSyntaxError: If parentheses are unbalanced or conditional
+            keywords are misplaced, with the offending position and a hint.
+    """
+    lexemes = _scan(expression)
+    events = _events(expression, lexemes)
     _validate_parentheses(expression, events)
     _validate_conditional_structure(expression, events)
+    return lexemes
@@ -0,0 +1,223 @@
+"""Compile boolean formulas into pushdown-friendly row filters.
+
+Polars can push a predicate into ``scan_parquet`` and skip whole row groups
+using their min/max statistics, but only when the predicate is shaped as a
+plain comparison between a column and a literal. ``compile_filter`` rewrites
+a filter formula into a conjunction of such comparisons wherever possible:
+
+* nested ``and`` chains are flattened into separate conjuncts,
+* ``between([x], lo, hi)`` becomes ``pl.col("x").is_between(lo, hi)``,
+* ``!=`` becomes ``ne`` instead of a negated equality,
+* literal-on-left comparisons (``100 < [amount]``) are mirrored so the
+  column is on the left.
+
+Conjuncts that do not fit this shape are lowered as usual and reported as
+not pushdown-eligible.
+
+Example:
+    >>> plan = compile_filter('[region] = "EU" and 100 < [amount]')
+    >>> plan.to_polars_code()
+    '(pl.col("region") == pl.lit("EU")) & (pl.col("amount") > pl.lit(100))'
+    >>> plan.pushdown_count
+    2
+    >>> pl.scan_parquet('sales.parquet').filter(plan.expr)
+"""
+
+from dataclasses import dataclass, field
+from functools import reduce
+from typing import Any, List, Optional, Tuple, Union
+
+import polars as pl
+
+from polars_expr_transformer.code_gen import format_pl_literal
+from polars_expr_transformer.process.models import Classifier, Func, IfFunc
+from polars_expr_transformer.process.polars_expr_transformer import parse_func
+
+_AND_FUNCS = {"pl.Expr.and_"}
+
+# Comparison functions mapped to the Expr method they normalize to.
+_COMPARISONS = {
+    "pl.Expr.eq": "eq",
+    "equals": "eq",
+    "does_not_equal": "ne",
+    "pl.Expr.ne": "ne",
+    "pl.Expr.gt": "gt",
+    "pl.Expr.ge": "ge",
+    "pl.Expr.lt": "lt",
+    "pl.Expr.le": "le",
+}
+
+# The comparison that holds after swapping the operands.
+_MIRRORED = {"eq": "eq", "ne": "ne", "gt": "lt", "ge": "le", "lt": "gt", "le": "ge"}
+
+_SYMBOLS = {"eq": "==", "ne": "!=", "gt": ">", "ge": ">=", "lt": "<", "le": "<="}
+
+
+@dataclass
+class FilterConjunct:
+    """
+    One conjunct of a compiled filter.
+
+    Attributes:
+        column: The compared column, or None for a conjunct that is not a
+            simple column-vs-literal comparison.
+        op: The Expr method the comparison lowers to ('eq', 'ne', 'gt', 'ge',
+            'lt', 'le' or 'is_between'), or None.
+        values: The literal operands, as (value, token, value type) triples.
+        func: The original Func node, used to lower conjuncts that could not
+            be normalized.
+    """
+
+    column: Optional[str] = None
+    op: Optional[str] = None
+    values: Tuple[Tuple[Any, str, str], ...] = ()
+    func: Optional[Union[Func, IfFunc, Classifier]] = field(default=None, repr=False)
+
+    @property
+    def pushdown(self) -> bool:
+        """Whether Polars can evaluate this conjunct against scan statistics."""
+        return self.column is not None
+
+    @property
+    def expr(self) -> pl.Expr:
+        if not self.pushdown:
+            result = self.func.get_pl_func()
+            return result if isinstance(result, pl.Expr) else pl.lit(result)
+        col = pl.col(self.column)
+        # Literals, as is_between reads plain strings as column names.
+        return getattr(col, self.op)(*(pl.lit(value) for value, _, _ in self.values))
+
+    def to_polars_code(self, prefix: str = "pl") -> str:
+        """Generate native Polars Python code for this conjunct."""
+        if not self.pushdown:
+            return self.func.to_polars_code(prefix=prefix)
+        col = f'{prefix}.col("{self.column}")'
+        literals = [
+            format_pl_literal(raw, val_type, prefix=prefix)
+            for _, raw, val_type in self.values
+        ]
+        if self.op == "is_between":
+            return f"{col}.is_between({', '.join(literals)})"
+        return f"{col} {_SYMBOLS[self.op]} {literals[0]}"
+
+
+@dataclass
+class FilterPlan:
+    """
+    A filter formula compiled to a conjunction of predicates.
+
+    Attributes:
+        expression: The original formula string.
+        conjuncts: The predicates that must all hold.
+    """
+
+    expression: str
+    conjuncts: List[FilterConjunct]
+
+    @property
+    def expr(self) -> pl.Expr:
+        """The combined filter, for use with ``LazyFrame.filter``."""
+        return reduce(lambda left, right: left & right, (c.expr for c in self.conjuncts))
+
+    @property
+    def pushdown_count(self) -> int:
+        """The number of conjuncts that are pushdown-eligible."""
+        return sum(c.pushdown for c in self.conjuncts)
+
+    @property
+    def residual_count(self) -> int:
+        """The number of conjuncts that have to be evaluated row by row."""
+        return len(self.conjuncts) - self.pushdown_count
+
+    def to_polars_code(self, prefix: str = "pl") -> str:
+        """Generate native Polars Python code for the combined filter."""
+        codes = [c.to_polars_code(prefix=prefix) for c in self.conjuncts]
+        if len(codes) == 1:
+            return codes[0]
+        return " & ".join(f"({code})" for code in codes)
+
+
+def _func_name(node) -> Optional[str]:
+    if isinstance(node, Func) and isinstance(node.func_ref, Classifier):
+        return node.func_ref.val
+    return None
+
+
+def _unwrap_lit(node):
+    while _func_name(node) == "pl.lit" and len(node.args) == 1:
+        node = node.args[0]
+    return node
+
+
+def _column_name(node) -> Optional[str]:
+    node = _unwrap_lit(node)
+    if _func_name(node) == "pl.col" and isinstance(node.args[0], Classifier):
+        return node.args[0].val.strip('"').strip("'")
+    return None
+
+
+def _literal(node) -> Optional[Tuple[Any, str, str]]:
+    node = _unwrap_lit(node)
+    if not isinstance(node, Classifier):
+        return None
+    if node.val_type not in ("number", "string", "boolean"):
+        return None
+    try:
+        value = node.get_pl_func()
+    except Exception:
+        return None
+    if isinstance(value, pl.Expr):
+        return None
+    return value, node.val, node.val_type
+
+
+def _flatten_and(node) -> list:
+    """Split nested ``and`` chains into their operands, left to right."""
+    conjuncts = []
+    to_visit = [node]
+    while to_visit:
+        current = _unwrap_lit(to_visit.pop())
+        if _func_name(current) in _AND_FUNCS and len(current.args) == 2:
+            to_visit.extend(reversed(current.args))
+        else:
+            conjuncts.append(current)
+    return conjuncts
+
+
+def _normalize(node) -> FilterConjunct:
+    name = _func_name(node)
+    if name in _COMPARISONS and len(node.args) == 2:
+        op = _COMPARISONS[name]
+        left, right = node.args
+        column, literal = _column_name(left), _literal(right)
+        if column is None or literal is None:
+            column, literal = _column_name(right), _literal(left)
+            op = _MIRRORED[op]
+        if column is not None and literal is not None:
+            return FilterConjunct(column=column, op=op, values=(literal,), func=node)
+    elif name == "between" and len(node.args) == 3:
+        column = _column_name(node.args[0])
+        bounds = [_literal(arg) for arg in node.args[1:]]
+        if column is not None and None not in bounds:
+            return FilterConjunct(
+                column=column, op="is_between", values=tuple(bounds), func=node
+            )
+    return FilterConjunct(func=node)
+
+
+def compile_filter(func_str: str) -> FilterPlan:
+    """
+    Compile a boolean formula into a pushdown-friendly filter.
+
+    Args:
+        func_str: The filter formula, e.g. ``[region] = "EU" and [amount] > 100``.
+
+    Returns:
+        A FilterPlan; ``plan.expr`` is the filter expression and each entry of
+        ``plan.conjuncts`` reports whether it is pushdown-eligible.
+
+    Raises:
+        ExpressionSyntaxError: If the expression syntax is invalid.
+    """
+    func = parse_func(func_str)
+    return FilterPlan(func_str, [_normalize(node) for node in _flatten_and(func)])
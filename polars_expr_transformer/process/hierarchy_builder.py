@@ -1,7 +1,7 @@
 from typing import Optional, List, Tuple
 from polars_expr_transformer.exceptions import ExpressionSyntaxError
 from polars_expr_transformer.process.models import Classifier, Func, IfFunc, TempFunc, ConditionVal
-from copy import deepcopy
+from copy import copy
 
 
 def handle_opening_bracket(current_func: Func, previous_val: Classifier) -> Func:
@@ -43,7 +43,7 @@ def handle_if(current_func: Func, current_val: Classifier, next_val: Classifier,
     if next_val and next_val.val == '(':
         pos += 1
     else:
-        raise ExpressionSyntaxError("Expected '(' after 'if'.")
+        raise ExpressionSyntaxError("Expected '(' after 'if'.", position=current_val.position)
     condition = Func(Classifier('pl.lit'))
     val = Func(Classifier('pl.lit'))
     condition_val = ConditionVal(condition=condition, val=val)
@@ -70,7 +70,7 @@ def handle_then(current_func: Func, current_val: Classifier, next_val: Optional[
         if next_val and next_val.val == '(':
             pos += 1
         else:
-            raise ExpressionSyntaxError("Expected '(' after 'then'.")
+            raise ExpressionSyntaxError("Expected '(' after 'then'.", position=current_val.position)
     # elif isinstance(current_func.parent, ConditionVal):
     #     current_func.parent.func_ref = current_val
     #     current_func = current_func.parent.val
@@ -79,7 +79,8 @@ def handle_then(current_func: Func, current_val: Classifier, next_val: Optional[
     else:
         raise ExpressionSyntaxError(
             "Found 'then' in an unexpected position: 'then' must directly follow "
-            "an 'if' or 'elseif' condition."
+            "an 'if' or 'elseif' condition.",
+            position=current_val.position,
         )
     return current_func, pos
 
@@ -120,7 +121,7 @@ def handle_elseif(current_func: Func, current_val: Classifier, next_val: Optiona
         The updated current function as IfFunc or Func.
     """
     if not isinstance(current_func.parent, IfFunc):
-        raise ExpressionSyntaxError("Found 'elseif' outside of an if-block.")
+        raise ExpressionSyntaxError("Found 'elseif' outside of an if-block.", position=current_val.position)
     if_func = current_func.parent
     condition = Func(Classifier('pl.lit'))
     val = Func(Classifier('pl.lit'))
@@ -198,7 +199,8 @@ def handle_function(current_func: Func, current_val: Classifier, next_val: Class
         found = f"'{next_val.val}'" if next_val else 'end of expression'
         raise ExpressionSyntaxError(
             f"Function '{current_val.val}' must be called with parentheses, "
-            f"e.g. {current_val.val}(...). Found {found} instead."
+            f"e.g. {current_val.val}(...). Found {found} instead.",
+            position=current_val.position,
         )
     current_func.add_arg(new_function)
     first_arg = TempFunc()
@@ -217,13 +219,14 @@ def handle_literal(current_func: Func, current_val: Classifier):
     current_func.add_arg(current_val)
 
 
-def handle_seperator(current_func: Func) -> Func:
+def handle_seperator(current_func: Func, current_val: Optional[Classifier] = None) -> Func:
     # find opening of current function
     parent_func = current_func.parent
     if not isinstance(parent_func, Func):
         raise ExpressionSyntaxError(
             "Found ',' outside of a function call. Commas can only separate "
-            "arguments inside a function, e.g. concat(a, b)."
+            "arguments inside a function, e.g. concat(a, b).",
+            position=current_val.position if current_val is not None else None,
         )
 
     new_arg = TempFunc()
@@ -279,7 +282,8 @@ def build_hierarchy(tokens: List[Classifier]):
     validate_bracket_balance(tokens)
 
     # print_classifier(tokens)
-    new_tokens = deepcopy(tokens)
+    # The tokens are flat, unlinked classifiers, so copying each one is enough.
+    new_tokens = [copy(token) for token in tokens]
     if new_tokens[0].val_type == 'function':
         main_func = Func(Classifier('pl.lit'))
     else:
@@ -305,7 +309,7 @@ def build_hierarchy(tokens: List[Classifier]):
             elif current_val.val == '$endif$':
                 current_func = handle_endif(current_func)
             elif current_val.val_type == 'sep':
-                current_func = handle_seperator(current_func)
+                current_func = handle_seperator(current_func, current_val)
             elif current_val.val == ')':
                 if next_val is None:
                     pass
@@ -313,7 +317,7 @@ def build_hierarchy(tokens: List[Classifier]):
                 current_func, main_func = handle_closing_bracket(current_func, main_func)
             elif current_val.val_type == 'function':
                 current_func, pos = handle_function(current_func, current_val, next_val, pos)
-            elif current_val.val_type in ('string', 'number', 'boolean', 'operator'):
+            elif current_val.val_type in ('string', 'number', 'boolean', 'operator', 'list'):
                 if (current_val.val_type == 'operator' and
                         current_val.val == '-' and
                         (len(current_func.args) == 0 or previous_val.val_type == 'operator')):
@@ -0,0 +1,57 @@
+"""Hash-consing of parsed formulas.
+
+Large generated formulas repeat the same subtree many times, for example
+``to_float([price])`` in every branch of a long ``if`` chain. ``intern_tree``
+rewrites a finalized hierarchy so that structurally equal subtrees are one
+shared node. Memory then scales with the unique structure of a formula rather
+than its text, and since lowering is memoized per node within a
+``get_pl_func`` call, every unique subtree is lowered once.
+
+The result is a DAG: a shared node's ``parent`` points at one of the nodes
+using it. Nothing reads ``parent`` once the hierarchy is finalized.
+"""
+
+from typing import Dict, Hashable
+
+from polars_expr_transformer.process.models import Classifier, Func, IfFunc
+
+
+def intern_tree(func):
+    """
+    Share structurally equal subtrees of a finalized hierarchy.
+
+    Nodes are interned bottom-up, so two nodes are equal exactly when their
+    references match and their (already interned) children are the same
+    objects, and every node is keyed in constant time.
+
+    Args:
+        func: The finalized hierarchical formula. Its nodes are relinked in
+            place.
+
+    Returns:
+        The interned root; structurally equal subtrees are the same object.
+    """
+    table: Dict[Hashable, object] = {}
+
+    def intern(node):
+        if isinstance(node, Classifier):
+            key = ("classifier", node.val, node.val_type, node.precedence)
+        elif isinstance(node, Func):
+            node.func_ref = intern(node.func_ref)
+            node.args = [intern(arg) for arg in node.args]
+            key = ("func", id(node.func_ref), *map(id, node.args))
+        elif isinstance(node, IfFunc):
+            for condition in node.conditions:
+                condition.condition = intern(condition.condition)
+                condition.val = intern(condition.val)
+            node.else_val = intern(node.else_val)
+            key = (
+                "if",
+                id(node.else_val),
+                *((id(c.condition), id(c.val)) for c in node.conditions),
+            )
+        else:
+            return node
+        return table.setdefault(key, node)
+
+    return intern(func)
@@ -1,15 +1,20 @@
 from polars_expr_transformer.configs.settings import PRECEDENCE
-from polars_expr_transformer.exceptions import ExpressionSyntaxError
+from polars_expr_transformer.exceptions import ExpressionSyntaxError, PolarsCodeGenError
 from typing import TypeAlias, Literal, List, Union, Optional, Any, Callable
 from polars_expr_transformer.funcs.utils import PlStringType, PlIntType, PlNumericType
-from polars_expr_transformer.configs.settings import operators, funcs
+from polars_expr_transformer.configs.settings import operators, funcs, COLUMN_PLACEHOLDER, PARAMETER_FUNC
 from polars_expr_transformer.configs import logging
 from polars_expr_transformer.code_gen import (
     OPERATOR_SYMBOLS,
     FUNCTION_CODE_GEN,
     format_pl_literal,
+    format_bound_parameter,
 )
+from contextvars import ContextVar
+from ast import literal_eval
+from json import dumps
 from dataclasses import dataclass, field
+from functools import lru_cache
 import polars as pl
 from types import NotImplementedType
 import inspect
@@ -26,9 +31,24 @@ def get_types_from_func(func: Callable):
     Returns:
         A list of types of the function's parameters.
     """
-    if hasattr(func, "__name__") and str(func.__name__) == str(pl.col.__name__):
+    if func is pl.col or (
+        hasattr(func, "__name__") and str(func.__name__) == _PL_COL_NAME
+    ):
         return [str]
-    return [param.annotation for param in inspect.signature(func).parameters.values()]
+    return list(_get_signature_types(func))
+
+
+# pl.col resolves unknown attributes to column expressions, so look its name up once.
+_PL_COL_NAME = str(pl.col.__name__)
+
+
+@lru_cache(maxsize=None)
+def _get_signature_types(func: Callable) -> tuple:
+    # Signatures of the registered functions never change, and inspecting them
+    # dominates lowering cost when repeated for every node.
+    return tuple(
+        param.annotation for param in inspect.signature(func).parameters.values()
+    )
 
 
 def all_numeric_types(numbers: List[any]):
@@ -99,6 +119,7 @@ value_type: TypeAlias = Literal[
     "prio",
     "sep",
     "special",
+    "list",
 ]
 
 
@@ -122,6 +143,35 @@ def test_if_numeric(value: str):
         return False
 
 
+# Results of the nodes lowered so far by the get_pl_func call in progress.
+# Parsed trees are interned, so a subtree that occurs many times in a formula
+# is one node and is lowered once. The memo lives for a single top-level call,
+# as lowering depends on bound parameters and column templates.
+_lowering_memo: ContextVar[Optional[dict]] = ContextVar("lowering_memo", default=None)
+
+
+def _lower_once(node, lower: Callable[[], Any]):
+    """Lower a node, reusing its result within the current top-level lowering."""
+    memo = _lowering_memo.get()
+    if memo is None:
+        token = _lowering_memo.set({})
+        try:
+            return lower()
+        finally:
+            _lowering_memo.reset(token)
+    key = id(node)
+    if key not in memo:
+        memo[key] = lower()
+    return memo[key]
+
+
+@lru_cache(maxsize=4096)
+def _eval_literal(value: str):
+    # Literal tokens evaluate to immutable Python values, so each distinct
+    # token only needs to be evaluated once.
+    return eval(value)
+
+
 @dataclass
 class Classifier:
     """
@@ -132,12 +182,14 @@ class Classifier:
         val_type (value_type): The type of the value.
         precedence (int): The precedence of the value in expressions.
         parent (Optional[Union["Classifier", "Func"]]): The parent of this classifier.
+        position (Optional[int]): Offset of the token in the source formula, if known.
     """
 
     val: str
     val_type: value_type = None
     precedence: int = None
     parent: Optional[Union["Classifier", "Func"]] = field(repr=False, default=None)
+    position: Optional[int] = field(repr=False, default=None, compare=False)
 
     def __post_init__(self):
         self.val_type = self.get_val_type()
@@ -176,7 +228,7 @@ class Classifier:
         elif self.val_type == "function":
             return funcs[self.val]
         elif self.val_type in ("number", "string"):
-            return eval(self.val)
+            return _eval_literal(self.val)
         elif self.val == "__negative()":
             return funcs["__negative"]()
         else:
@@ -199,6 +251,71 @@ class Classifier:
         return format_pl_literal(self.val, self.val_type, prefix=prefix)
 
 
+def _literal_value(token: Classifier):
+    """The Python value of a literal token, without the cache of ``_eval_literal``."""
+    if token.val_type == "boolean":
+        return token.val.lower() == "true"
+    if token.val_type == "number":
+        try:
+            return int(token.val)
+        except ValueError:
+            return float(token.val)
+    if "\\" not in token.val:
+        return token.val[1:-1]
+    return literal_eval(token.val)
+
+
+@dataclass(eq=False)
+class ListLiteral(Classifier):
+    """
+    A parenthesized list of literals, as in ``[status] in ("open", "paid")``.
+
+    Attributes:
+        values: The values of the list; all strings, all numbers or all booleans.
+    """
+
+    values: tuple = field(repr=False, default=(), compare=False)
+
+    @classmethod
+    def from_items(cls, items: List[Classifier], position: Optional[int] = None) -> "ListLiteral":
+        """Build the list of the values of literal tokens."""
+        text = f"({', '.join(item.val for item in items)})"
+        return cls(text, position=position, values=tuple(_literal_value(item) for item in items))
+
+    def get_val_type(self) -> value_type:
+        return "list"
+
+    def _typed_values(self) -> tuple:
+        # Numbers are all floats as soon as one of them is.
+        if any(isinstance(v, float) for v in self.values):
+            return tuple(map(float, self.values))
+        return self.values
+
+    def get_pl_func(self) -> pl.Series:
+        return pl.Series(self._typed_values())
+
+    def to_polars_code(self, prefix: str = "pl") -> str:
+        # Strings in double quotes, as in the formula and the other literals.
+        values = (dumps(v, ensure_ascii=False) if isinstance(v, str) else repr(v) for v in self._typed_values())
+        return f"{prefix}.Series([{', '.join(values)}])"
+
+
+def _renders_as_operator(node) -> bool:
+    """Whether ``to_polars_code`` renders the node as an infix operator chain."""
+    while (
+        isinstance(node, Func)
+        and isinstance(node.func_ref, Classifier)
+        and node.func_ref.val == "pl.lit"
+        and len(node.args) == 1
+    ):
+        node = node.args[0]
+    return (
+        isinstance(node, Func)
+        and isinstance(node.func_ref, Classifier)
+        and node.func_ref.val in OPERATOR_SYMBOLS
+    )
+
+
 @dataclass
 class Func:
     """
@@ -268,13 +385,13 @@ class Func:
                 return self.args[0].get_readable_pl_function()
         pl_args = [arg.get_pl_func() for arg in self.args]
 
-        if self._check_if_standardization_of_args_is_needed(pl_args):
-            _ = self._standardize_args(
-                self.args, get_types_from_func(funcs[self.func_ref.val])
-            )
-            standardized_args = [arg.get_readable_pl_function() for arg in self.args]
-        else:
-            standardized_args = [arg.get_readable_pl_function() for arg in self.args]
+        # Show the pl.lit wrappers that lowering adds, without adding them to the tree.
+        args = list(self.args)
+        if self.func_ref != "pl.lit":
+            func_types = get_types_from_func(funcs[self.func_ref.val])
+            for i in self._literal_arg_indices(pl_args, func_types):
+                args[i] = Func(Classifier("pl.lit"), [args[i]])
+        standardized_args = [arg.get_readable_pl_function() for arg in args]
         return f"{self.func_ref.val}({', '.join(standardized_args)})"
 
     def to_polars_code(self, prefix: str = "pl") -> str:
@@ -331,9 +448,18 @@ class Func:
                     right = f"({right})"
                 return f"{left} {symbol} {right}"
 
+        # :name parameters render as the literal they are bound to
+        if func_name == PARAMETER_FUNC:
+            return format_bound_parameter(self.args[0].val.strip('"'), prefix=prefix)
+
         # Known functions: use the code generation mapping
         if func_name in FUNCTION_CODE_GEN:
             arg_codes = [arg.to_polars_code(prefix=prefix) for arg in self.args]
+            # Operator chains may become the receiver of a method call
+            arg_codes = [
+                f"({code})" if _renders_as_operator(arg) else code
+                for arg, code in zip(self.args, arg_codes)
+            ]
             return FUNCTION_CODE_GEN[func_name](arg_codes, prefix=prefix)
 
         # Fallback: generic function call
@@ -359,41 +485,46 @@ class Func:
         self.args.append(arg)
         arg.parent = self
 
+    @staticmethod
+    def _literal_arg_indices(pl_args: List[Any], func_types: List[Any]) -> List[int]:
+        """
+        Find the lowered arguments that have to be wrapped in ``pl.lit``.
+
+        Args:
+            pl_args: The lowered arguments.
+            func_types: The parameter types of the function they are passed to.
+
+        Returns:
+            The positions of the arguments that are plain values where the
+            function accepts an expression.
+        """
+        if len(func_types) == len(pl_args):
+            return [
+                i
+                for i, (func_type, pl_arg) in enumerate(zip(func_types, pl_args))
+                if not isinstance(pl_arg, (pl.Expr, pl.Series)) and allow_expressions(func_type)
+            ]
+        return [i for i, pl_arg in enumerate(pl_args) if not isinstance(pl_arg, (pl.Expr, pl.Series))]
+
     def _standardize_args(
         self, args: List[Union["Func", Classifier, "IfFunc"]], func_types: List[Any]
     ):
         """
         Standardize the arguments of the function.
 
-        This method ensures that the arguments of the function are standardized
-        by checking for mixed Polars expression types and applying standardization
-        when necessary. It standardizes the arguments based on their types and
-        returns the standardized arguments.
+        Lowers every argument and wraps the plain values that are passed where
+        an expression is accepted in ``pl.lit``. The tree itself is left
+        untouched, so a parsed formula can be lowered by several threads at once.
 
         Returns:
             A list of standardized arguments for the function.
         """
-        pl_args = [
-            arg.get_pl_func() if isinstance(arg, Func) else arg.get_pl_func()
-            for arg in args
-        ]
-        # if self._check_if_standardization_of_args_is_needed(pl_args):
-        if len(func_types) == len(pl_args):
-            for i, (func_type, pl_arg, arg) in enumerate(
-                zip(func_types, pl_args, args)
-            ):
-                if not isinstance(pl_arg, pl.Expr) and allow_expressions(func_type):
-                    tf = Func(Classifier("pl.lit"))
-                    tf.add_arg(arg)
-                    self.args[i] = tf
-
-        else:
-            for i, (pl_arg, arg) in enumerate(zip(pl_args, self.args)):
-                if not isinstance(pl_arg, pl.Expr):
-                    tf = Func(Classifier("pl.lit"))
-                    tf.add_arg(arg)
-                    self.args[i] = tf
-        return [a.get_pl_func() for a in self.args]
+        # Each argument is lowered exactly once; lowering it again after wrapping
+        # would make nested formulas exponential in their depth.
+        pl_args = [arg.get_pl_func() for arg in args]
+        for i in self._literal_arg_indices(pl_args, func_types):
+            pl_args[i] = funcs["pl.lit"](pl_args[i])
+        return pl_args
 
     def get_pl_func(self):
         """
@@ -414,6 +545,9 @@ class Func:
         Raises:
             Exception: If 'pl.lit' is used with an incorrect number of arguments.
         """
+        return _lower_once(self, self._lower)
+
+    def _lower(self):
         if self.func_ref == "pl.lit":
             if len(self.args) == 0:
                 raise ExpressionSyntaxError(
@@ -427,10 +561,10 @@ class Func:
                     "This usually means a function name is misspelled or unknown, "
                     "or an operator is missing between two values."
                 )
-            if isinstance(self.args[0].get_pl_func(), pl.expr.Expr):
-                return self.args[0].get_pl_func()
-            return funcs[self.func_ref.val](self.args[0].get_pl_func())
-        pl_args = [arg.get_pl_func() for arg in self.args]
+            inner = self.args[0].get_pl_func()
+            if isinstance(inner, pl.expr.Expr):
+                return inner
+            return funcs[self.func_ref.val](inner)
         func_types = get_types_from_func(funcs[self.func_ref.val])
         # if all_numeric_types(pl_args) and all(allow_expressions(func_type) for func_type in func_types):
         #     pl_args = ensure_all_numeric_types_align(pl_args)
@@ -522,6 +656,9 @@ class IfFunc:
         else_val.parent = self
 
     def get_pl_func(self):
+        return _lower_once(self, self._lower)
+
+    def _lower(self):
         full_expr = None
         if len(self.conditions) == 0:
             raise ExpressionSyntaxError(
@@ -581,3 +718,51 @@ class TempFunc:
     def add_arg(self, arg: Union["Func", Classifier, "IfFunc"]):
         self.args.append(arg)
         arg.parent = self
+
+
+@dataclass
+class ColumnSelection:
+    """
+    Represents a column template placeholder ([$col]) bound to concrete columns.
+
+    Lowers to a single multi-column Polars expression, so a formula written once
+    for one column is applied to every selected column in one projection.
+
+    Attributes:
+        columns (Union[List[str], pl.Expr]): The column names, or a Polars selector
+            (e.g. ``polars.selectors.string()``), the placeholder is bound to.
+        parent (Optional[Func]): The parent function of this selection.
+    """
+
+    columns: Union[List[str], pl.Expr]
+    parent: Optional[Func] = field(repr=False, default=None)
+
+    def get_pl_func(self):
+        if isinstance(self.columns, pl.Expr):
+            return self.columns
+        return pl.col(list(self.columns))
+
+    def get_readable_pl_function(self) -> str:
+        if isinstance(self.columns, pl.Expr):
+            return str(self.columns)
+        return self.to_polars_code()
+
+    def to_polars_code(self, prefix: str = "pl") -> str:
+        """
+        Generate native Polars Python code string for this column selection.
+
+        Raises:
+            PolarsCodeGenError: If the selection is bound to a Polars selector,
+                which has no code form; bind it to column names instead.
+        """
+        if isinstance(self.columns, pl.Expr):
+            raise PolarsCodeGenError(
+                f"[{COLUMN_PLACEHOLDER}]",
+                str(self.columns),
+                ValueError(
+                    "A column template bound to a Polars selector has no code form; "
+                    "bind it to a list of column names to generate code."
+                ),
+            )
+        names = ", ".join(f'"{name}"' for name in self.columns)
+        return f"{prefix}.col([{names}])"
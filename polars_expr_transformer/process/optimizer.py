@@ -0,0 +1,153 @@
+"""Rewrite rules for operator trees.
+
+``build_operator_tree`` applies the rules to every tree it builds, while the
+operators are still shallow trees of their own and before the later stages
+recurse through them:
+
+* an ``or`` chain of at least ``MIN_FOLDED_EQUALITIES`` equalities between
+  one column and literals of one type, as in
+  ``[c] = "a" or [c] = "b" or [c] = "c" or [c] = "d"``, becomes the single
+  membership test ``[c] in ("a", "b", "c", "d")``. Polars evaluates it with
+  one hash lookup per row instead of one comparison per value, and a chain of
+  thousands of equalities no longer nests thousands of levels deep.
+
+Example:
+    >>> to_polars_code('[n] = 1 or [n] = 2 or [x] > 1 or [n] = 3 or [n] = 4')
+    'pl.col("n").is_in(pl.lit(pl.Series([1, 2, 3, 4])).implode()) | (pl.col("x") > pl.lit(1))'
+"""
+
+from typing import List, Optional, Tuple
+
+from polars_expr_transformer.configs.settings import operators
+from polars_expr_transformer.process.models import Classifier, Func, ListLiteral, TempFunc
+
+_OR = "pl.Expr.or_"
+_EQ = "pl.Expr.eq"
+_IN = "_in"
+_OPERATOR_FUNCS = frozenset(operators.values())
+
+# Below this many values, comparing each one is faster than the hash lookup.
+MIN_FOLDED_EQUALITIES = 4
+
+
+def _unwrap(node):
+    """The value inside single-value wrappers, such as parentheses."""
+    while isinstance(node, (Func, TempFunc)) and len(node.args) == 1 and (
+        isinstance(node, TempFunc) or _is_call(node, "pl.lit")
+    ):
+        node = node.args[0]
+    return node
+
+
+def _is_call(node, name: str) -> bool:
+    return isinstance(node, Func) and isinstance(node.func_ref, Classifier) and node.func_ref.val == name
+
+
+def _column_name(node) -> Optional[str]:
+    if _is_call(node, "pl.col") and len(node.args) == 1:
+        name = _unwrap(node.args[0])
+        if isinstance(name, Classifier):
+            return name.val
+    return None
+
+
+def _is_literal(node) -> bool:
+    return isinstance(node, Classifier) and (
+        node.val_type in ("number", "boolean") or (node.val_type == "string" and node.val[:1] == '"')
+    )
+
+
+def _equality(node) -> Optional[Tuple[str, Func, Classifier]]:
+    """The column name, column and literal of a ``column = literal`` test, else None."""
+    if not _is_call(node, _EQ) or len(node.args) != 2:
+        return None
+    left, right = map(_unwrap, node.args)
+    for column, literal in ((left, right), (right, left)):
+        name = _column_name(column)
+        if name is not None and _is_literal(literal):
+            return name, column, literal
+    return None
+
+
+def _disjuncts(node) -> List:
+    """The operands of an ``or`` chain, from left to right."""
+    disjuncts = []
+    stack = [node]
+    while stack:
+        current = _unwrap(stack.pop())
+        if _is_call(current, _OR) and len(current.args) == 2:
+            stack += reversed(current.args)
+        else:
+            disjuncts.append(current)
+    return disjuncts
+
+
+def _fold_or_chain(node: Func) -> Tuple[Func, List]:
+    """
+    Fold the equalities of an ``or`` chain into membership tests.
+
+    Returns:
+        The rewritten chain, and its operands that were not folded.
+    """
+    disjuncts = _disjuncts(node)
+    groups = {}
+    for i, disjunct in enumerate(disjuncts):
+        equality = _equality(disjunct)
+        if equality is not None:
+            name, _, literal = equality
+            groups.setdefault((name, literal.val_type), []).append((i, equality))
+    folded = {}
+    for members in groups.values():
+        if len(members) < MIN_FOLDED_EQUALITIES:
+            continue
+        first, (_, column, literal) = members[0]
+        values = ListLiteral.from_items([m[1][2] for m in members], position=literal.position)
+        test = Func(Classifier(_IN, position=disjuncts[first].func_ref.position), [column, values])
+        folded.update({i: None for i, _ in members[1:]})
+        folded[first] = test
+    if not folded:
+        return node, disjuncts
+    kept = []
+    for i, disjunct in enumerate(disjuncts):
+        if i not in folded:
+            kept.append(disjunct)
+        elif folded[i] is not None:
+            kept.append(folded[i])
+    chain = kept[0]
+    for disjunct in kept[1:]:
+        chain = Func(node.func_ref, [chain, disjunct])
+    return chain, [disjunct for i, disjunct in enumerate(disjuncts) if i not in folded]
+
+
+def fold_equality_chains(tree):
+    """
+    Rewrite ``or`` chains of equalities on one column to membership tests.
+
+    Walks the operators of the tree iteratively, so long chains do not hit the
+    recursion limit. Function calls below the operators are left alone; their
+    arguments are operator trees of their own.
+
+    Args:
+        tree: An operator tree, as built by ``build_operator_tree``.
+
+    Returns:
+        The tree, with the chains folded.
+    """
+    holder = Func(Classifier("pl.lit"), [tree])
+    stack = [holder]
+    while stack:
+        node = stack.pop()
+        if not isinstance(node, (Func, TempFunc)):
+            continue
+        if node is not holder and not isinstance(node, TempFunc) and not (
+            isinstance(node.func_ref, Classifier)
+            and (node.func_ref.val in _OPERATOR_FUNCS or node.func_ref.val == "pl.lit")
+        ):
+            continue
+        for i, arg in enumerate(node.args):
+            if _is_call(_unwrap(arg), _OR):
+                node.args[i], rest = _fold_or_chain(_unwrap(arg))
+                stack += rest
+            else:
+                stack.append(arg)
+    return holder.args[0]
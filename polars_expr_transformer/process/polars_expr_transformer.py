@@ -13,17 +13,34 @@ Example:
     >>> df.select(expr.alias('description'))
 """
 
-from typing import List, Union
+import re
+import threading
+from typing import List, Optional, Union
 from polars_expr_transformer.process.models import IfFunc, Func, TempFunc, Classifier
 from polars_expr_transformer.process.hierarchy_builder import build_hierarchy
-from polars_expr_transformer.process.tokenize import tokenize
+from polars_expr_transformer.process.tokenize import lex, tokenize
 from polars_expr_transformer.process.token_classifier import classify_tokens
 from polars_expr_transformer.process.process_inline import parse_inline_functions
 from polars_expr_transformer.process.post_process import (
     post_process_hierarchical_formula,
 )
 from polars_expr_transformer.process.preprocess import preprocess
-from polars_expr_transformer.exceptions import PolarsCodeGenError
+from polars_expr_transformer.process.interning import intern_tree
+from polars_expr_transformer.process.column_template import (
+    bind_column_placeholder,
+    check_columns,
+    missing_placeholder_error,
+    name_template_columns,
+)
+from polars_expr_transformer.exceptions import ExpressionSyntaxError, FormulaTooComplexError, PolarsCodeGenError
+from polars_expr_transformer.process.cost_model import (
+    CostLimits,
+    check_cost,
+    check_source,
+    parse_deadline,
+)
+from polars_expr_transformer import instrumentation
+from polars_expr_transformer.lookup_tables import lookup_table
 import polars as pl
 import datetime
 
@@ -136,7 +153,76 @@ def remove_temp_funcs(hierarchical_formula):
     return hierarchical_formula
 
 
-def build_func(func_str: str = 'concat("1", "2")') -> Func:
+def parse_func(func_str: str, limits: Optional[CostLimits] = None) -> Func:
+    """
+    Parse a function string into a finalized Func hierarchy without lowering it.
+
+    Runs every stage of ``build_func`` except the final construction of the
+    Polars expression, so formulas with unbound ``:name`` parameters can be
+    parsed once and lowered later. Structurally equal subtrees of the result
+    are shared (see ``intern_tree``).
+
+    Args:
+        func_str: The string expression to parse.
+        limits: Optional complexity budget. The text is checked before parsing,
+            lexing runs under its time budget, and the parsed tree is checked
+            before it is returned.
+
+    Returns:
+        The finalized Func hierarchy.
+
+    Raises:
+        ExpressionSyntaxError: If the expression syntax is invalid.
+        FormulaTooComplexError: If the formula exceeds ``limits``.
+    """
+    if limits is not None:
+        check_source(func_str, limits)
+        try:
+            with parse_deadline(limits.max_parse_seconds):
+                func = parse_func(func_str)
+            check_cost(func, limits)
+        except RecursionError:
+            # A shape the source check does not measure nested too deep to parse.
+            raise FormulaTooComplexError(
+                "Formula is too complex: it nests too deeply to parse.",
+                limit="max_depth",
+                value=None,
+                maximum=limits.max_depth,
+            ) from None
+        return func
+    try:
+        if instrumentation.is_enabled():
+            return _parse_func_instrumented(func_str)
+        raw_tokens = lex(func_str)
+        tokens = classify_tokens(raw_tokens)
+        hierarchical_formula = build_hierarchy(tokens)
+        parse_inline_functions(hierarchical_formula)
+        return intern_tree(finalize_hierarchy(hierarchical_formula))
+    except ExpressionSyntaxError as error:
+        if error.expression is not None or error.position is None:
+            raise
+        # Raised at a token lexed with its position: point into the formula.
+        raise ExpressionSyntaxError(error.bare_message, func_str, error.position, error.hint) from None
+
+
+def _parse_func_instrumented(func_str: str) -> Func:
+    """``parse_func`` with every stage timed and reported to the observers."""
+    timed = instrumentation.timed
+    with instrumentation.compile_span(func_str) as stats:
+        raw_tokens = timed(stats, "lex", lex, func_str)
+        tokens = timed(stats, "classify_tokens", classify_tokens, raw_tokens)
+        stats.token_count = len(tokens)
+        hierarchical_formula = timed(stats, "build_hierarchy", build_hierarchy, tokens)
+        timed(stats, "parse_inline_functions", parse_inline_functions, hierarchical_formula)
+        func = timed(stats, "finalize_hierarchy", finalize_hierarchy, hierarchical_formula)
+        func = timed(stats, "intern", intern_tree, func)
+        instrumentation.measure_tree(stats, func)
+        return func
+
+
+def build_func(
+    func_str: str = 'concat("1", "2")', limits: Optional[CostLimits] = None
+) -> Func:
     """
     Build a Func object from a function string.
 
@@ -149,6 +235,8 @@ def build_func(func_str: str = 'concat("1", "2")') -> Func:
         func_str: The string expression to parse. Supports column references
             like [column_name], functions like concat(), operators (+, -, *, /),
             and conditional expressions (if/then/else/endif).
+        limits: Optional complexity budget (see ``CostLimits``); formulas
+            exceeding it are rejected before they are lowered.
 
     Returns:
         A Func object representing the parsed expression tree.
@@ -162,15 +250,17 @@ def build_func(func_str: str = 'concat("1", "2")') -> Func:
         ExpressionSyntaxError: If the expression syntax is invalid, e.g.
             unbalanced parentheses or misplaced/missing conditional keywords
             (if/then/else/elseif/endif). Subclasses ValueError.
+        FormulaTooComplexError: If the formula exceeds ``limits``.
     """
-    formula = preprocess(func_str)
-    raw_tokens = tokenize(formula)
-    tokens = classify_tokens(raw_tokens)
-    hierarchical_formula = build_hierarchy(tokens)
-    parse_inline_functions(hierarchical_formula)
-
-    finalized_hierarchical_formula = finalize_hierarchy(hierarchical_formula)
-    hierarchical_formula.get_pl_func()
+    if instrumentation.is_enabled():
+        with instrumentation.compile_span(func_str) as stats:
+            finalized_hierarchical_formula = parse_func(func_str, limits)
+            instrumentation.timed(
+                stats, "lowering", finalized_hierarchical_formula.get_pl_func
+            )
+            return finalized_hierarchical_formula
+    finalized_hierarchical_formula = parse_func(func_str, limits)
+    finalized_hierarchical_formula.get_pl_func()
     return finalized_hierarchical_formula
 
 
@@ -194,23 +284,60 @@ def test_tokenization(func_str, all_split_vals, all_functions):
     return tokens
 
 
-def _validate_polars_code(func_str: str, code: str) -> None:
+# String and number literals; generated code that differs only in these is
+# built by the same Polars calls, so it is valid or invalid alike.
+_LITERAL_RE = re.compile(
+    r'"(?:[^"\\]|\\.)*"' r"|'(?:[^'\\]|\\.)*'" r"|(?<![\w.])\d+(\.\d*)?"
+)
+_MAX_VALID_SHAPES = 4096
+_valid_shapes = set()
+_valid_shapes_lock = threading.Lock()
+
+
+def _code_shape(code: str) -> str:
+    """The generated code with every string and number literal blanked out."""
+    return _LITERAL_RE.sub(
+        lambda m: '""' if m.group()[0] in "\"'" else ("0.0" if m.group(1) else "0"), code
+    )
+
+
+def _validate_polars_code(
+    func_str: str, code: str, mode: Union[bool, str] = "eval", prefix: str = "pl"
+) -> None:
     """Validate generated Polars code by eval-ing it.
 
-    Builds a scope with ``pl``, ``datetime``, and optionally ``pds``
-    (polars_ds), then attempts ``eval(code, scope)``.
+    Builds a scope with ``pl``, ``datetime`` and ``lookup_table``, then attempts
+    ``eval(code, scope)``. FlowFrame code is eval-ed with its ``prefix``
+    bound to Polars, whose API it mirrors.
+
+    In ``"fast"`` mode code is only eval-ed if no code of the same shape
+    (the same code with other string and number literals) passed before, so
+    bulk code generation from similar formulas evaluates each shape once.
 
     Raises:
         PolarsCodeGenError: If the generated code cannot be evaluated.
+        ValueError: If the mode is unknown.
     """
-    scope = {"pl": pl, "datetime": datetime}
+    if mode is True:
+        mode = "eval"
+    if mode not in ("eval", "fast"):
+        raise ValueError(f"Unknown validation mode {mode!r}; use True, False, 'eval' or 'fast'.")
+    shape = _code_shape(code) if mode == "fast" else None
+    if shape is not None and shape in _valid_shapes:
+        return
+    scope = {"pl": pl, "datetime": datetime, "lookup_table": lookup_table, prefix: pl}
     try:
         eval(code, scope)
     except Exception as e:
         raise PolarsCodeGenError(func_str, code, e) from e
+    if shape is not None:
+        with _valid_shapes_lock:
+            if len(_valid_shapes) >= _MAX_VALID_SHAPES:
+                _valid_shapes.clear()
+            _valid_shapes.add(shape)
 
 
-def to_polars_code(func_str: str, validate: bool = True) -> str:
+def to_polars_code(func_str: str, validate: Union[bool, str] = True) -> str:
     """
     Convert a string expression to a native Polars Python code string.
 
@@ -222,15 +349,17 @@ def to_polars_code(func_str: str, validate: bool = True) -> str:
         func_str: The string expression to convert. Supports the same syntax
             as simple_function_to_expr: column references [col], operators,
             functions, and conditionals.
-        validate: If True (default), eval the generated code to verify it
-            is syntactically and semantically valid. Raises PolarsCodeGenError
-            on failure.
+        validate: If True or "eval" (default), eval the generated code to
+            verify it is syntactically and semantically valid. "fast" evals
+            it only if no code differing just in its string and number
+            literals has passed before, which makes bulk code generation
+            from similar formulas much cheaper. False skips validation.
 
     Returns:
         A string containing valid Polars Python code.
 
     Raises:
-        PolarsCodeGenError: If validate=True and the generated code fails eval.
+        PolarsCodeGenError: If validation is enabled and the generated code fails it.
 
     Example:
         >>> to_polars_code("[col_a] + 'test'")
@@ -245,11 +374,11 @@ def to_polars_code(func_str: str, validate: bool = True) -> str:
     func = build_func(func_str)
     code = func.to_polars_code()
     if validate:
-        _validate_polars_code(func_str, code)
+        _validate_polars_code(func_str, code, validate)
     return code
 
 
-def to_flowframe_code(func_str: str, validate: bool = True) -> str:
+def to_flowframe_code(func_str: str, validate: Union[bool, str] = True) -> str:
     """
     Convert a string expression to a native FlowFrame Python code string.
 
@@ -258,22 +387,21 @@ def to_flowframe_code(func_str: str, validate: bool = True) -> str:
     FlowFrame exposes the same API as Polars, so the same conversion
     rules apply.
 
-    Validation is performed by generating and evaluating the equivalent
-    Polars code — if the Polars code is valid, the FlowFrame code is
-    guaranteed to be valid as well (since the APIs are identical).
+    The code is generated once and validated against Polars with ``ff``
+    bound to ``pl`` — since the APIs are identical, code that is valid
+    Polars code is valid FlowFrame code as well.
 
     Args:
         func_str: The string expression to convert. Supports the same syntax
             as ``to_polars_code``.
-        validate: If True (default), generate the equivalent Polars code and
-            eval it to verify the expression is valid. Raises
-            PolarsCodeGenError on failure.
+        validate: The validation mode, as for ``to_polars_code``: True or
+            "eval" (default), "fast", or False.
 
     Returns:
         A string containing valid FlowFrame Python code.
 
     Raises:
-        PolarsCodeGenError: If validate=True and the generated code fails eval.
+        PolarsCodeGenError: If validation is enabled and the generated code fails it.
 
     Example:
         >>> to_flowframe_code("[col_a] + 'test'")
@@ -282,14 +410,15 @@ def to_flowframe_code(func_str: str, validate: bool = True) -> str:
         >>> to_flowframe_code("uppercase([name])")
         'ff.col("name").str.to_uppercase()'
     """
-    func = build_func(func_str)
+    code = build_func(func_str).to_polars_code(prefix="ff")
     if validate:
-        pl_code = func.to_polars_code()
-        _validate_polars_code(func_str, pl_code)
-    return func.to_polars_code(prefix="ff")
+        _validate_polars_code(func_str, code, validate, prefix="ff")
+    return code
 
 
-def simple_function_to_expr(func_str: str) -> pl.expr.Expr:
+def simple_function_to_expr(
+    func_str: str, limits: Optional[CostLimits] = None
+) -> pl.expr.Expr:
     """
     Convert a string expression to a Polars expression.
 
@@ -304,6 +433,8 @@ def simple_function_to_expr(func_str: str) -> pl.expr.Expr:
             - Functions: concat(), uppercase(), round(), etc.
             - Conditionals: if [col] > 0 then "positive" else "negative" endif
             - Comments: // This is a comment
+        limits: Optional complexity budget for untrusted formulas, see
+            ``CostLimits``. Not checked when omitted.
 
     Returns:
         A Polars expression (pl.Expr) that can be used in DataFrame operations.
@@ -328,6 +459,50 @@ def simple_function_to_expr(func_str: str) -> pl.expr.Expr:
         ExpressionSyntaxError: If the expression syntax is invalid, e.g.
             unbalanced parentheses or misplaced/missing conditional keywords
             (if/then/else/elseif/endif). Subclasses ValueError.
+        FormulaTooComplexError: If the formula exceeds ``limits``.
     """
-    func = build_func(func_str)
+    func = build_func(func_str) if limits is None else build_func(func_str, limits)
     return func.get_pl_func()
+
+
+def template_function_to_expr(
+    func_str: str,
+    columns: Union[List[str], pl.Expr],
+    name_template: Optional[str] = None,
+) -> pl.Expr:
+    """
+    Convert a column template to one multi-column Polars expression.
+
+    A column template references the placeholder ``[$col]`` instead of a
+    concrete column. The template is compiled once and the placeholder is bound
+    to all ``columns`` at lowering time, so applying the same formula to
+    hundreds of columns costs a single compile and a single projection.
+
+    Args:
+        func_str: The template expression, e.g. ``'trim(lowercase([$col]))'``.
+        columns: The column names, or a Polars selector such as
+            ``polars.selectors.string()``, to apply the template to.
+        name_template: Optional output name pattern, e.g. ``"{col}_clean"``.
+            By default every output column keeps its input column's name.
+
+    Returns:
+        A Polars expression producing one output column per selected column.
+
+    Example:
+        >>> import polars.selectors as cs
+        >>> df.with_columns(template_function_to_expr('trim(lowercase([$col]))', cs.string()))
+        >>> df.select(template_function_to_expr('[$col] * 2', ['a', 'b'], '{col}_doubled'))
+
+    Raises:
+        ExpressionSyntaxError: If the expression is invalid or does not
+            reference ``[$col]``.
+
+    Note:
+        Output names come from the left-most column in the formula, as in
+        Polars itself, so ``[$col]`` should be the first column referenced.
+    """
+    check_columns(columns)
+    func = build_func(func_str)
+    if bind_column_placeholder(func, columns) == 0:
+        raise missing_placeholder_error(func_str)
+    return name_template_columns(func.get_pl_func(), name_template)
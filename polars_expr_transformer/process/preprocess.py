@@ -2,6 +2,8 @@ import re
 from copy import deepcopy
 from typing import List, Tuple
 
+from polars_expr_transformer.configs.settings import COLUMN_PLACEHOLDER, PARAMETER_FUNC
+from polars_expr_transformer.process.cost_model import check_deadline
 from polars_expr_transformer.process.expression_validator import (
     find_comment_spans,
     validate_expression_syntax,
@@ -238,7 +240,9 @@ def parse_pl_cols(func_string: str) -> str:
     Parse Polars column expressions in the input string and replace them with appropriate Polars expressions.
 
     This function identifies column references in square brackets (e.g., [column_name]) and
-    converts them to Polars column expressions (e.g., pl.col("column_name")).
+    converts them to Polars column expressions (e.g., pl.col("column_name")). The column
+    template placeholder ([$col], surrounding spaces allowed) is normalized to
+    pl.col("$col") so it can be bound to concrete columns later.
 
     Args:
         func_string: The string containing Polars column expressions.
@@ -289,12 +293,36 @@ def parse_pl_cols(func_string: str) -> str:
                 break
         pos += 1
 
-    col_rename = set((f'pl.col("{func_string[_s:_e]}")', func_string[_s - 1:_e + 1]) for _s, _e in func_op)
+    col_rename = set()
+    for _s, _e in func_op:
+        col_name = func_string[_s:_e]
+        if col_name.strip() == COLUMN_PLACEHOLDER:
+            col_name = COLUMN_PLACEHOLDER
+        col_rename.add((f'pl.col("{col_name}")', func_string[_s - 1:_e + 1]))
     for new_val, old_val in col_rename:
         func_string = func_string.replace(old_val, new_val)
     return func_string
 
 
+def parse_parameters(func_string: str) -> str:
+    """
+    Replace :name parameter placeholders outside quoted substrings with internal
+    parameter references.
+
+    A parameter such as :threshold is rewritten to __param("threshold"), which
+    resolves to the value bound at lowering time (see ``prepare``).
+
+    Args:
+        func_string: The string to process.
+
+    Returns:
+        The processed string with parameter placeholders replaced.
+    """
+    parts = re.split(r"""("[^"]*"|'[^']*')""", func_string)
+    parts[::2] = [re.sub(r':([A-Za-z_]\w*)', rf'{PARAMETER_FUNC}("\1")', v) for v in parts[::2]]
+    return ''.join(parts)
+
+
 def remove_unwanted_characters(func_string: str) -> str:
     """
     Remove unwanted characters outside quoted substrings in the input string,
@@ -335,7 +363,7 @@ def remove_unwanted_characters(func_string: str) -> str:
     return "".join(parts)
 
 
-def preprocess(input_function: str) -> str:
+def preprocess(input_function: str, validate: bool = True) -> str:
     """
     Preprocess an input function string by applying a series of transformations
     to standardize its format for further processing.
@@ -348,12 +376,15 @@ def preprocess(input_function: str) -> str:
     5. Marks and formats special tokens (if, else, endif, elseif, then)
     6. Standardizes equality operators (== becomes =)
     7. Converts column references ([column]) to Polars expressions
-    8. Preserves logical operators during whitespace removal
-    9. Removes unwanted whitespace and characters
-    10. Restores logical operators with proper spacing
+    8. Converts :name parameters to parameter references
+    9. Preserves logical operators during whitespace removal
+    10. Removes unwanted whitespace and characters
+    11. Restores logical operators with proper spacing
 
     Args:
         input_function: The function string to preprocess.
+        validate: Whether to run step 1; False when the caller already
+            validated the input.
 
     Returns:
         The preprocessed function string ready for tokenization and parsing.
@@ -362,7 +393,8 @@ def preprocess(input_function: str) -> str:
         ExpressionSyntaxError: If parentheses are unbalanced or conditional
             keywords (if/then/else/elseif/endif) are misplaced or missing.
     """
-    validate_expression_syntax(input_function)
+    if validate:
+        validate_expression_syntax(input_function)
 
     input_function = remove_comments(input_function)
 
@@ -370,12 +402,18 @@ def preprocess(input_function: str) -> str:
 
     input_function = add_spaces_around_logical_operators(input_function)
 
+    check_deadline("preprocess")
+
     input_function = mark_special_tokens(input_function)
 
     input_function = standardize_equality_operators(input_function)
 
     input_function = parse_pl_cols(input_function)
 
+    input_function = parse_parameters(input_function)
+
+    check_deadline("preprocess")
+
     input_function = preserve_logical_operators_with_markers(input_function)
 
     input_function = remove_unwanted_characters(input_function)
@@ -1,7 +1,9 @@
+from collections import deque
 from typing import List, Union, Any
 from polars_expr_transformer.configs.settings import operators, PRECEDENCE
 from polars_expr_transformer.process.models import IfFunc, Classifier, Func, TempFunc
 from polars_expr_transformer.process.hierarchy_builder import build_hierarchy
+from polars_expr_transformer.process.optimizer import fold_equality_chains
 
 
 def parse_inline_functions(formula: Union[Func, TempFunc, IfFunc]):
@@ -80,7 +82,8 @@ def build_operator_tree(tokens: List[Any]) -> Func:
     Build a tree of function calls from a list of tokens containing operators.
 
     This function uses a recursive descent parser approach to build the tree
-    with correct operator precedence.
+    with correct operator precedence, then applies the rewrite rules of
+    ``optimizer`` to it.
 
     Args:
         tokens: List of tokens potentially containing operators.
@@ -91,7 +94,7 @@ def build_operator_tree(tokens: List[Any]) -> Func:
     if not tokens:
         return None
 
-    tokens = tokens.copy()
+    tokens = deque(tokens)
 
     def parse_expression(token_list, min_precedence=0):
         """Recursive helper function to parse expression with operator precedence."""
@@ -99,7 +102,7 @@ def build_operator_tree(tokens: List[Any]) -> Func:
         left = parse_primary(token_list)
 
         while token_list and is_operator(token_list[0]) and get_precedence(token_list[0]) >= min_precedence:
-            op = token_list.pop(0)
+            op = token_list.popleft()
             op_precedence = get_precedence(op)
 
             right = parse_expression(token_list, op_precedence + 1)
@@ -107,7 +110,7 @@ def build_operator_tree(tokens: List[Any]) -> Func:
             op_func = operators.get(op.val)
             if op_func:
                 left = Func(
-                    func_ref=Classifier(op_func, val_type='function'),
+                    func_ref=Classifier(op_func, val_type='function', position=op.position),
                     args=[left, right]
                 )
 
@@ -119,10 +122,10 @@ def build_operator_tree(tokens: List[Any]) -> Func:
             return None
 
         if isinstance(token_list[0], Func) and token_list[0].func_ref.val == 'pl.lit':
-            inner_tokens = token_list.pop(0).args
-            return parse_expression(inner_tokens)
+            inner_tokens = token_list.popleft().args
+            return parse_expression(deque(inner_tokens))
 
-        return token_list.pop(0)
+        return token_list.popleft()
 
     def is_operator(token):
         """Check if token is an operator."""
@@ -134,7 +137,7 @@ def build_operator_tree(tokens: List[Any]) -> Func:
             return PRECEDENCE.get(token.val, 10)
         return 0
 
-    result = parse_expression(tokens)
+    result = fold_equality_chains(parse_expression(tokens))
 
     if not isinstance(result, Func):
         result = Func(
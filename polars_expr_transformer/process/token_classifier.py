@@ -1,5 +1,8 @@
-from typing import List
-from polars_expr_transformer.process.models import Classifier
+import re
+from typing import List, Optional, Tuple, Union
+from polars_expr_transformer.exceptions import ExpressionSyntaxError
+from polars_expr_transformer.process.models import Classifier, ListLiteral
+from polars_expr_transformer.process.tokenize import Token
 
 
 def replace_ambiguity_minus_sign(tokens: List[Classifier]) -> List[Classifier]:
@@ -56,17 +59,230 @@ def standardize_quotes(tokens: List[str]):
     return output_tokens
 
 
-def classify_tokens(tokens: List[str]) -> List[Classifier]:
+def classify_tokens(tokens: List[Union[str, Token]]) -> List[Classifier]:
     """
     Standardize the list of tokens by converting them to Classifier objects and replacing ambiguous minus signs.
 
     Args:
-        tokens: A list of string tokens.
+        tokens: A list of string tokens, or of positioned tokens from ``lex``,
+            whose positions are kept on the classifiers.
 
     Returns:
         A list of Classifier tokens with standardized quotes and ambiguous minus signs replaced.
     """
-    standardized_tokens = standardize_quotes(tokens)
-    toks = [Classifier(val) for val in standardized_tokens]
+    positions = [tok.start if isinstance(tok, Token) else None for tok in tokens]
+    standardized_tokens = standardize_quotes([tok.val if isinstance(tok, Token) else tok for tok in tokens])
+    toks = [Classifier(val, position=position) for val, position in zip(standardized_tokens, positions)]
     toks = [t for t in toks if t.val_type != 'empty']
-    return toks
+    return attach_over_clauses(collapse_list_literals(toks))
+
+
+def _list_items(tokens: List[Classifier], opening: int) -> Tuple[Optional[list], int]:
+    """
+    The literal tokens of the list that opens at ``opening``, and its closing index.
+
+    A list holds literals separated by commas, with at least one comma, so
+    ``("a",)`` is a list and ``("a")`` a parenthesized value. Returns None as
+    the items if the parentheses hold a single value that is not a literal.
+
+    Raises:
+        ExpressionSyntaxError: If the parentheses are empty, or hold values
+            separated by commas of which one is not a literal.
+    """
+    if opening + 1 < len(tokens) and tokens[opening + 1].val == ')':
+        raise ExpressionSyntaxError(
+            "The list after 'in' is empty; it needs at least one value.",
+            position=tokens[opening].position,
+        )
+    items = []
+    commas = 0
+    i = opening + 1
+    while i < len(tokens):
+        token = tokens[i]
+        if token.val == '-' and i + 1 < len(tokens) and tokens[i + 1].val_type == 'number':
+            items.append(Classifier('-' + tokens[i + 1].val, position=token.position))
+            i += 2
+        elif token.val_type in ('number', 'boolean') or (token.val_type == 'string' and token.val[:1] == '"'):
+            items.append(token)
+            i += 1
+        else:
+            if _has_top_level_comma(tokens, opening):
+                raise ExpressionSyntaxError(
+                    "A list after 'in' can only hold literal values, such as \"a\", 1 or true.",
+                    position=token.position,
+                    hint="Compare with values that are not literals one by one, combined with 'or'.",
+                )
+            return None, i
+        if i < len(tokens) and tokens[i].val == ',':
+            commas += 1
+            i += 1
+        if i < len(tokens) and tokens[i].val == ')':
+            return (items if commas else None), i
+    return None, i
+
+
+def _has_top_level_comma(tokens: List[Classifier], opening: int) -> bool:
+    """Whether the parentheses that open at ``opening`` hold values separated by commas."""
+    depth = 0
+    for token in tokens[opening + 1:]:
+        if token.val == '(':
+            depth += 1
+        elif token.val == ')':
+            if depth == 0:
+                return False
+            depth -= 1
+        elif token.val == ',' and depth == 0:
+            return True
+    return False
+
+
+def collapse_list_literals(tokens: List[Classifier]) -> List[Classifier]:
+    """
+    Replace the list after ``in``, as in ``[c] in ("a", "b")``, by one token.
+
+    Lists can hold thousands of values, so they skip the parser: each becomes
+    a single ``ListLiteral`` in one pass over the tokens.
+
+    Args:
+        tokens: The classified tokens.
+
+    Returns:
+        The tokens, with every list of literals after ``in`` collapsed.
+
+    Raises:
+        ExpressionSyntaxError: If a list mixes strings, numbers and booleans.
+    """
+    if not any(t.val == 'in' for t in tokens):
+        return tokens
+    output = []
+    i = 0
+    while i < len(tokens):
+        token = tokens[i]
+        output.append(token)
+        i += 1
+        if token.val != 'in' or i >= len(tokens) or tokens[i].val != '(':
+            continue
+        items, closing = _list_items(tokens, i)
+        if items is None:
+            continue
+        kinds = {item.val_type for item in items}
+        if len(kinds) > 1:
+            raise ExpressionSyntaxError(
+                "The values of a list must all be strings, all numbers or all booleans.",
+                position=tokens[i].position,
+            )
+        output.append(ListLiteral.from_items(items, position=tokens[i].position))
+        i = closing + 1
+    return output
+
+
+# Whitespace is removed before tokenizing, so ``1 over(...)`` reads as ``1over``.
+_NUMBER_BEFORE_CLAUSE = re.compile(r"(\d+(?:\.\d*)?|\.\d+)(over|order_by)")
+
+
+def _split_number_before_clause(tokens: List[Classifier]) -> List[Classifier]:
+    """Split tokens like ``1over`` that are followed by a parenthesis into the number and the clause."""
+    output = []
+    for i, token in enumerate(tokens):
+        match = _NUMBER_BEFORE_CLAUSE.fullmatch(token.val)
+        if match and i + 1 < len(tokens) and tokens[i + 1].val == '(':
+            output += [Classifier(match.group(1), position=token.position),
+                       Classifier(match.group(2), position=token.position)]
+        else:
+            output.append(token)
+    return output
+
+
+def _operand_start(tokens: List[Classifier]) -> Optional[int]:
+    """
+    Index of the first token of the operand that ends the list of tokens.
+
+    The operand is a function call or column, a parenthesized expression, an
+    ``if ... endif`` block or a literal; None if the tokens end otherwise.
+    """
+    last = tokens[-1]
+    if last.val in (')', '$endif$'):
+        opening = '(' if last.val == ')' else '$if$'
+        depth = 0
+        for i in range(len(tokens) - 1, -1, -1):
+            if tokens[i].val == last.val:
+                depth += 1
+            elif tokens[i].val == opening:
+                depth -= 1
+                if depth == 0:
+                    if opening == '(' and i > 0 and tokens[i - 1].val_type == 'function':
+                        return i - 1
+                    return i
+        return None
+    if last.val_type in ('number', 'string', 'boolean'):
+        return len(tokens) - 1
+    return None
+
+
+def _closing_paren(tokens: List[Classifier], opening: int) -> Optional[int]:
+    """Index of the parenthesis that closes the one at ``opening``, if any."""
+    depth = 0
+    for i in range(opening, len(tokens)):
+        if tokens[i].val == '(':
+            depth += 1
+        elif tokens[i].val == ')':
+            depth -= 1
+            if depth == 0:
+                return i
+    return None
+
+
+def attach_over_clauses(tokens: List[Classifier]) -> List[Classifier]:
+    """
+    Rewrite the window clauses ``over(<keys>)`` and ``order_by(<keys>)`` to calls.
+
+    ``over`` is written after the aggregate it applies to, as in
+    ``sum([amount]) over([region])``, and binds to the operand right before
+    it, so ``[amount] / sum([amount]) over([region])`` divides by the total of
+    the region. It becomes the call ``over(<operand>, <keys>)``.
+
+    ``order_by`` follows a window function or its ``over`` clause and adds the
+    call ``order_by(<keys>)`` as the last argument of the ``over`` call, so
+    ``cumsum([qty]) over([shop]) order_by([date])`` becomes
+    ``over(cumsum([qty]), [shop], order_by([date]))``.
+
+    Args:
+        tokens: The classified tokens.
+
+    Returns:
+        The tokens, with every window clause holding its operand.
+    """
+    if not any(t.val.endswith(('over', 'order_by')) for t in tokens):
+        return tokens
+    tokens = _split_number_before_clause(tokens)
+    output = []
+    i = 0
+    while i < len(tokens):
+        token = tokens[i]
+        end = None
+        if token.val in ('over', 'order_by') and output and i + 1 < len(tokens) and tokens[i + 1].val == '(':
+            start = _operand_start(output)
+            if start is not None:
+                end = _closing_paren(tokens, i + 1)
+        if end is None:
+            output.append(token)
+            i += 1
+            continue
+        operand = output[start:]
+        del output[start:]
+        keys = attach_over_clauses(tokens[i + 2:end])
+        if token.val == 'order_by':
+            keys = [token, tokens[i + 1], *keys, tokens[end]]
+        if operand[0].val == 'over':
+            # A clause right after an over call adds its keys to that call
+            output += operand[:-1]
+            closing = operand[-1]
+        else:
+            over = token if token.val == 'over' else Classifier('over', position=token.position)
+            output += [over, tokens[i + 1], *operand]
+            closing = tokens[end]
+        if keys:
+            output.append(Classifier(','))
+        output += [*keys, closing]
+        i = end + 1
+    return output
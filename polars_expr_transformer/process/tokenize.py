@@ -1,4 +1,76 @@
-from polars_expr_transformer.configs.settings import all_split_vals, all_functions
+import re
+import time
+from functools import lru_cache
+from typing import List, NamedTuple, Optional, Tuple
+
+from polars_expr_transformer.configs.settings import (
+    COLUMN_PLACEHOLDER,
+    PARAMETER_FUNC,
+    all_functions,
+    all_split_vals,
+)
+from polars_expr_transformer.process.cost_model import check_deadline, current_deadline
+from polars_expr_transformer.process.expression_validator import Lexeme, scan_expression
+from polars_expr_transformer.process.preprocess import (
+    add_spaces_around_logical_operators,
+    preprocess,
+    replace_double_spaces,
+)
+
+_OPERATOR_CHARS = frozenset("+-*%/<>=&|!")
+
+_MARKERS = ("__and__", "__or__", "__MARKER_")
+
+# The preprocessed text of each conditional keyword.
+_KEYWORDS = {
+    "if": "$if$(",
+    "then": ")$then$(",
+    "else": ")$else$(",
+    "elseif": ")$elseif$(",
+    "endif": ")$endif$",
+}
+
+_CONDITIONAL_RE = re.compile(r"\b(if|else|endif|elseif|then)\b")
+_NUMBER_RE = re.compile(r"\d+(\.\d*)?|\.\d+")
+_PARAMETER_RE = re.compile(r"[A-Za-z_]\w*")
+
+
+class Token(NamedTuple):
+    """
+    A token and the span of the source text it was lexed from.
+
+    Attributes:
+        val: The token, as ``tokenize`` produces it from the preprocessed text.
+        start: Offset of the first character of its source, or None when the
+            formula was lexed through ``preprocess`` and ``tokenize``.
+        end: Offset just past its source, or None.
+    """
+
+    val: str
+    start: Optional[int] = None
+    end: Optional[int] = None
+
+
+class _Piece(NamedTuple):
+    # A lexeme, or a run of them, with its text after preprocessing. ``key``
+    # stands in for that text when checking how it tokenizes next to the
+    # pieces around it: every string literal tokenizes alike, and so does
+    # every column reference.
+    key: str
+    tokens: Tuple[str, ...]
+    start: int
+    end: int
+
+
+@lru_cache(maxsize=4096)
+def _tokens_of(text: str) -> Tuple[str, ...]:
+    return tuple(tokenize(text))
+
+
+@lru_cache(maxsize=4096)
+def _splits_between(left: str, right: str) -> bool:
+    """Whether ``left + right`` tokenizes as ``left`` and ``right`` apart."""
+    return _tokens_of(left + right) == _tokens_of(left) + _tokens_of(right)
 
 
 def tokenize(formula: str):
@@ -19,8 +91,13 @@ def tokenize(formula: str):
     in_brackets = False
     i = 0
     string_indicator = None
+    deadline = current_deadline()
+    steps = 0
 
     while i < len(r):
+        steps += 1
+        if deadline is not None and not steps & 255 and time.perf_counter() > deadline:
+            check_deadline("tokenize")
         current_val = r[i]
 
         if current_val == string_indicator:
@@ -145,4 +222,154 @@ def tokenize(formula: str):
 
     final_output.reverse()
 
-    return final_output
\ No newline at end of file
+    return final_output
+
+
+def _column_piece(text: str, start: int, end: int) -> Optional[_Piece]:
+    if not text.endswith("]") or len(text) < 2:
+        return None
+    name = text[1:-1]
+    if any(c in name for c in "\"',[\n"):
+        return None
+    # The rewrites that preprocess applies to a column name before
+    # parse_pl_cols quotes it.
+    name = add_spaces_around_logical_operators(replace_double_spaces(name.replace("\t", " ")))
+    if _CONDITIONAL_RE.search(name):
+        return None
+    name = name.replace("==", "=")
+    if name.strip() == COLUMN_PLACEHOLDER:
+        name = COLUMN_PLACEHOLDER
+    return _Piece('pl.col("c")', ("pl.col", "(", f'"{name}"', ")"), start, end)
+
+
+def _pieces(expression: str, lexemes: List[Lexeme]) -> Optional[List[_Piece]]:
+    """
+    Map lexemes to the text ``preprocess`` rewrites them to, and its tokens.
+
+    Returns None for anything whose rewrite depends on more than the lexeme
+    itself, e.g. words that whitespace removal would merge or string literals
+    spanning lines.
+    """
+    pieces = []
+    deadline = current_deadline()
+    n = len(lexemes)
+    i = 0
+    previous_end = 0
+    while i < n:
+        if deadline is not None and not i & 255 and time.perf_counter() > deadline:
+            check_deadline("tokenize")
+        kind, start, end = lexemes[i]
+        if expression[previous_end:start].strip(" \n\t"):
+            return None
+        text = expression[start:end]
+        i += 1
+        if kind == "comment":
+            pass
+        elif kind == "string":
+            if len(text) < 2 or text[-1] != text[0] or "\n" in text or "[" in text:
+                return None
+            text = replace_double_spaces(text.replace("\t", " "))
+            pieces.append(_Piece(text[0] * 2, (text,), start, end))
+        elif kind == "column":
+            piece = _column_piece(text, start, end)
+            if piece is None:
+                return None
+            pieces.append(piece)
+        elif kind == "paren" or text == ",":
+            pieces.append(_Piece(text, (text,), start, end))
+        elif kind == "word" or text == ".":
+            # Words and numbers with a decimal point.
+            while i < n and lexemes[i].start == end and (
+                lexemes[i].kind == "word" or expression[lexemes[i].start:lexemes[i].end] == "."
+            ):
+                end = lexemes[i].end
+                i += 1
+            text = expression[start:end]
+            if "." in text and not _NUMBER_RE.fullmatch(text):
+                return None
+            if text.lower() in ("and", "or"):
+                if pieces and pieces[-1].tokens in (("and",), ("or",)):
+                    return None
+                text = text.lower()
+                pieces.append(_Piece(f" {text} ", (text,), start, end))
+            elif text in _KEYWORDS:
+                keyword = _KEYWORDS[text]
+                pieces.append(_Piece(keyword, _tokens_of(keyword), start, end))
+            elif _NUMBER_RE.fullmatch(text):
+                pieces.append(_Piece("0", (text,), start, end))
+            else:
+                pieces.append(_Piece(text, _tokens_of(text), start, end))
+        elif text == ":":
+            if i == n or lexemes[i].kind != "word" or lexemes[i].start != end:
+                return None
+            name = expression[lexemes[i].start:lexemes[i].end]
+            if not _PARAMETER_RE.fullmatch(name) or name.lower() in ("and", "or") or name in _KEYWORDS:
+                return None
+            end = lexemes[i].end
+            i += 1
+            if i < n and lexemes[i].kind == "column" and lexemes[i].start == end:
+                # Parameters are rewritten after columns: :p[a] reads as :ppl.
+                return None
+            tokens = (PARAMETER_FUNC, "(", f'"{name}"', ")")
+            pieces.append(_Piece(f'{PARAMETER_FUNC}("p")', tokens, start, end))
+        elif text in _OPERATOR_CHARS:
+            # Operator characters join up once whitespace is removed, but ==
+            # is rewritten to = before that.
+            segments = [text]
+            while i < n and lexemes[i].kind in ("char", "comment"):
+                lexeme = lexemes[i]
+                if lexeme.kind == "char" and expression[lexeme.start] not in _OPERATOR_CHARS:
+                    break
+                if expression[end:lexeme.start].strip(" \n\t"):
+                    return None
+                if lexeme.kind == "char":
+                    char = expression[lexeme.start]
+                    if lexeme.start == end:
+                        segments[-1] += char
+                    else:
+                        segments.append(char)
+                else:
+                    segments.append("")
+                end = lexeme.end
+                i += 1
+            text = "".join(segment.replace("==", "=") for segment in segments)
+            pieces.append(_Piece(text, _tokens_of(text), start, end))
+        else:
+            return None
+        previous_end = end
+    if expression[previous_end:].strip(" \n\t"):
+        return None
+    return pieces
+
+
+def lex(expression: str) -> List[Token]:
+    """
+    Validate and tokenize a raw formula in a single scan of its text.
+
+    The lexemes found while validating (see ``scan_expression``) are mapped
+    straight to the tokens that ``preprocess`` followed by ``tokenize`` would
+    produce, so the text is not rewritten and scanned again, and every token
+    records the span of the source it came from. Formulas that the lexemes
+    cannot be mapped for, such as words separated only by whitespace (which
+    preprocessing merges), go through ``preprocess`` and ``tokenize``; their
+    tokens have no positions.
+
+    Args:
+        expression: The formula as written by the user.
+
+    Returns:
+        The tokens of the formula.
+
+    Raises:
+        ExpressionSyntaxError: If parentheses are unbalanced or conditional
+            keywords are misplaced.
+    """
+    lexemes = scan_expression(expression)
+    # preprocess marks logical operators as __and__ and __or__ while removing
+    # whitespace, so text that already contains a marker is rewritten too.
+    pieces = None if any(m in expression for m in _MARKERS) else _pieces(expression, lexemes)
+    if pieces is not None and all(
+        _splits_between(left.key, right.key) for left, right in zip(pieces, pieces[1:])
+    ):
+        return [Token(val, piece.start, piece.end) for piece in pieces for val in piece.tokens]
+    return [Token(val) for val in tokenize(preprocess(expression, validate=False))]
@@ -0,0 +1,103 @@
+"""
+Evaluate formulas that are stored per row.
+
+Some datasets carry their own formula next to each record, for example a
+pricing rule per product. Instead of compiling and evaluating a formula for
+every row, the frame is partitioned by distinct formula: each formula is
+compiled once and evaluated on only the rows that use it, and the partitions
+are stitched back together in the original row order.
+
+Example:
+    >>> import polars as pl
+    >>> from polars_expr_transformer import apply_formula_column
+    >>> df = pl.DataFrame({
+    ...     'price': [10.0, 20.0, 30.0],
+    ...     'rule': ['[price] * 2', '[price] + 1', '[price] * 2'],
+    ... })
+    >>> apply_formula_column(df, 'rule', output_column='new_price')
+"""
+
+from typing import Dict
+
+import polars as pl
+
+from polars_expr_transformer.process.polars_expr_transformer import (
+    simple_function_to_expr,
+)
+
+
+def _unique_column_name(df: pl.DataFrame, base: str) -> str:
+    name = base
+    while name in df.columns:
+        name = f"_{name}"
+    return name
+
+
+def compile_distinct_formulas(formulas: pl.Series) -> Dict[str, pl.Expr]:
+    """
+    Compile every distinct, non-null formula in a Series exactly once.
+
+    Args:
+        formulas: A string Series with one formula per row.
+
+    Returns:
+        A mapping from formula string to its Polars expression.
+
+    Raises:
+        ExpressionSyntaxError: If any of the formulas is invalid.
+    """
+    return {
+        formula: simple_function_to_expr(formula)
+        for formula in formulas.drop_nulls().unique(maintain_order=True)
+    }
+
+
+def apply_formula_column(
+    df: pl.DataFrame, formula_column: str, output_column: str = "result"
+) -> pl.DataFrame:
+    """
+    Evaluate a per-row formula column and add the results as a new column.
+
+    Each distinct formula is compiled once and evaluated only over the rows
+    that carry it. Rows whose formula is null get a null result. Results of
+    different formulas are combined into their common supertype.
+
+    Because every formula sees only its own rows, aggregates and window
+    functions (``sum``, ``avg``, ``count``, ``rank``, ``lag``, ``cumsum``, the
+    ``rolling_*`` functions and ``over``) are computed over the rows that
+    carry the same formula, not over the whole frame.
+
+    Args:
+        df: The DataFrame holding the data and the formulas.
+        formula_column: Name of the string column with one formula per row.
+        output_column: Name of the column to write the results to.
+
+    Returns:
+        A new DataFrame with ``output_column`` added, rows in their original order.
+
+    Raises:
+        ExpressionSyntaxError: If any of the formulas is invalid.
+    """
+    if df.schema[formula_column] != pl.String:
+        raise TypeError(
+            f"Formula column {formula_column!r} must be a string column, "
+            f"got {df.schema[formula_column]}."
+        )
+    compiled = compile_distinct_formulas(df[formula_column])
+    row_index = _unique_column_name(df, "__row_index")
+
+    parts = []
+    indexed = df.with_row_index(row_index)
+    for (formula,), part in indexed.partition_by(
+        formula_column, as_dict=True, maintain_order=True
+    ).items():
+        expr = compiled[formula] if formula is not None else pl.lit(None)
+        parts.append(part.with_columns(expr.alias(output_column)))
+
+    if not parts:
+        return df.with_columns(pl.lit(None).alias(output_column))
+    return (
+        pl.concat(parts, how="diagonal_relaxed")
+        .sort(row_index)
+        .drop(row_index)
+    )
@@ -0,0 +1,199 @@
+"""
+Streaming evaluation of formulas over larger-than-memory sources.
+
+Builds one lazy query that derives every configured formula from a scanned
+source (CSV, Parquet, NDJSON or IPC), optionally filters it with a formula, and
+sinks the result to disk with Polars' streaming engine, so the data never has to
+fit in memory. The ``lookup`` calls of the formulas become left joins with the
+registered lookup tables, see :mod:`polars_expr_transformer.lookup_tables`.
+
+Polars runs parts of a plan it cannot stream on its in-memory engine. When the
+installed Polars can report it, :func:`find_in_memory_fallbacks` lists those
+parts and :func:`stream_formulas` warns about them, since a fallback on a huge
+source is usually what exhausts memory.
+
+Example:
+    >>> from polars_expr_transformer.streaming import stream_formulas
+    >>> stream_formulas(
+    ...     'events/*.parquet',
+    ...     {'amount_eur': '[amount] * [rate]', 'country': 'uppercase([country])'},
+    ...     sink='features.parquet',
+    ...     filter='[amount] > 0',
+    ... )
+"""
+
+import re
+import warnings
+from pathlib import Path
+from typing import List, Mapping, Optional, Union
+
+import polars as pl
+
+from polars_expr_transformer.lookup_tables import collect_lookup_joins
+from polars_expr_transformer.process.polars_expr_transformer import (
+    simple_function_to_expr,
+)
+
+_SCANNERS = {
+    ".csv": pl.scan_csv,
+    ".parquet": pl.scan_parquet,
+    ".ndjson": pl.scan_ndjson,
+    ".jsonl": pl.scan_ndjson,
+    ".ipc": pl.scan_ipc,
+    ".arrow": pl.scan_ipc,
+    ".feather": pl.scan_ipc,
+}
+
+_SINK_FORMATS = {
+    ".parquet": "parquet",
+    ".ipc": "ipc",
+    ".arrow": "ipc",
+    ".feather": "ipc",
+    ".csv": "csv",
+    ".ndjson": "ndjson",
+    ".jsonl": "ndjson",
+}
+
+# Fill colour that Polars' physical plan graph uses for in-memory fallback nodes.
+_FALLBACK_NODE = re.compile(r'\[label="(?P<label>[^"]*)",style=filled,fillcolor="0\.0 0\.3 1\.0"\]')
+
+SourceType = Union[str, Path, pl.LazyFrame]
+
+
+def scan_source(source: SourceType) -> pl.LazyFrame:
+    """
+    Open a source lazily.
+
+    Args:
+        source: A LazyFrame, or a path (globs allowed) ending in .csv, .parquet,
+            .ndjson/.jsonl or .ipc/.arrow/.feather.
+
+    Returns:
+        A LazyFrame scanning the source.
+    """
+    if isinstance(source, pl.LazyFrame):
+        return source
+    suffix = Path(str(source)).suffix.lower()
+    if suffix not in _SCANNERS:
+        raise ValueError(
+            f"Cannot scan {str(source)!r}: unknown file type {suffix!r}. "
+            f"Supported: {', '.join(sorted(_SCANNERS))}."
+        )
+    return _SCANNERS[suffix](source)
+
+
+def build_formula_plan(
+    source: SourceType,
+    formulas: Mapping[str, str],
+    filter: Optional[str] = None,
+) -> pl.LazyFrame:
+    """
+    Build one lazy query that derives every formula from the source.
+
+    The lookups of the formulas are joined to the filtered rows, once per
+    table and key, before the derived columns are computed.
+
+    Args:
+        source: A LazyFrame or a path to scan (see :func:`scan_source`).
+        formulas: Output column name mapped to formula string.
+        filter: Optional formula used as a row filter, applied before the
+            derived columns are computed so it can be pushed into the scan.
+
+    Returns:
+        The LazyFrame with all derived columns; nothing is executed yet.
+
+    Raises:
+        ExpressionSyntaxError: If any of the formulas is invalid.
+    """
+    lf = scan_source(source)
+    if filter is not None:
+        lf = lf.filter(simple_function_to_expr(filter))
+    if formulas:
+        with collect_lookup_joins() as joins:
+            exprs = [simple_function_to_expr(formula).alias(name) for name, formula in formulas.items()]
+        lf = joins.apply(lf).with_columns(exprs)
+        if joins.temporary_columns:
+            lf = lf.drop(joins.temporary_columns)
+    return lf
+
+
+def find_in_memory_fallbacks(lf: pl.LazyFrame) -> Optional[List[str]]:
+    """
+    List the parts of a query the streaming engine would run in memory.
+
+    Args:
+        lf: The query to inspect.
+
+    Returns:
+        One description per in-memory fallback node (empty when the whole query
+        streams), or None when the installed Polars cannot report this.
+    """
+    try:
+        graph = lf.show_graph(engine="streaming", plan_stage="physical", raw_output=True)
+    except (TypeError, ValueError, AttributeError, pl.exceptions.ComputeError):
+        return None
+    return [
+        match.group("label").replace("\\n", " ").strip()
+        for match in _FALLBACK_NODE.finditer(graph)
+    ]
+
+
+def _sink(lf: pl.LazyFrame, sink: Union[str, Path], sink_format: Optional[str]) -> None:
+    if sink_format is None:
+        suffix = Path(str(sink)).suffix.lower()
+        if suffix not in _SINK_FORMATS:
+            raise ValueError(
+                f"Cannot infer the output format of {str(sink)!r}; "
+                "pass sink_format='parquet', 'ipc', 'csv' or 'ndjson'."
+            )
+        sink_format = _SINK_FORMATS[suffix]
+    if sink_format == "parquet":
+        lf.sink_parquet(sink)
+    elif sink_format == "ipc":
+        lf.sink_ipc(sink)
+    elif sink_format == "csv":
+        lf.sink_csv(sink)
+    elif sink_format == "ndjson":
+        lf.sink_ndjson(sink)
+    else:
+        raise ValueError(f"Unknown sink_format {sink_format!r}.")
+
+
+def stream_formulas(
+    source: SourceType,
+    formulas: Mapping[str, str],
+    sink: Union[str, Path],
+    filter: Optional[str] = None,
+    sink_format: Optional[str] = None,
+    check_streaming: bool = True,
+) -> pl.LazyFrame:
+    """
+    Derive formulas from a source and stream the result to a file.
+
+    Args:
+        source: A LazyFrame or a path to scan (see :func:`scan_source`).
+        formulas: Output column name mapped to formula string.
+        sink: The output file path.
+        filter: Optional formula used as a row filter.
+        sink_format: 'parquet', 'ipc', 'csv' or 'ndjson'. Inferred from the
+            sink's suffix when omitted.
+        check_streaming: If True (default), warn when part of the query would
+            fall back to the in-memory engine.
+
+    Returns:
+        The executed LazyFrame plan, e.g. for ``explain()``.
+
+    Raises:
+        ExpressionSyntaxError: If any of the formulas is invalid.
+    """
+    lf = build_formula_plan(source, formulas, filter=filter)
+    if check_streaming:
+        fallbacks = find_in_memory_fallbacks(lf)
+        if fallbacks:
+            warnings.warn(
+                "Part of the formula plan cannot run on the streaming engine and will "
+                "be computed in memory: " + "; ".join(fallbacks),
+                stacklevel=2,
+            )
+    _sink(lf, sink, sink_format)
+    return lf
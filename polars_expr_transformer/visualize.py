@@ -1,3 +1,7 @@
+import time
+from dataclasses import dataclass
+from typing import Any, List, Optional, Union
+
 import polars as pl
 from polars_expr_transformer.process.polars_expr_transformer import build_func, Func
 
@@ -58,7 +62,7 @@ def _get_unwrapped_obj(obj):
     return obj
 
 
-def _generate_tree(obj: Func, prefix="", is_last=True, level=0):
+def _generate_tree(obj: Func, prefix="", is_last=True, level=0, annotate=None):
     """
     Recursively generate tree representation of a function object,
     skipping pl.lit wrappers to show inner expressions directly only when appropriate.
@@ -68,6 +72,7 @@ def _generate_tree(obj: Func, prefix="", is_last=True, level=0):
         prefix: Current line prefix for formatting
         is_last: Whether this is the last item in its branch
         level: Current nesting level
+        annotate: Optional callable returning extra text to append to a node's line
 
     Returns:
         List of formatted lines for the tree
@@ -77,7 +82,7 @@ def _generate_tree(obj: Func, prefix="", is_last=True, level=0):
     # Handle TempFunc wrapper if present
     if hasattr(obj, '__class__') and obj.__class__.__name__ == 'TempFunc':
         if hasattr(obj, 'args') and obj.args:
-            return _generate_tree(obj.args[0], prefix, is_last, level)
+            return _generate_tree(obj.args[0], prefix, is_last, level, annotate)
         else:
             lines.append(f"{prefix}└── TempFunc (empty)")
             return lines
@@ -95,6 +100,8 @@ def _generate_tree(obj: Func, prefix="", is_last=True, level=0):
     if obj is None:
         return lines
 
+    note = annotate(obj) if annotate else ""
+
     # Normal class handling
     if hasattr(obj, '__class__'):
         class_name = obj.__class__.__name__
@@ -104,7 +111,7 @@ def _generate_tree(obj: Func, prefix="", is_last=True, level=0):
     if class_name == "Func":
         # Get function name from classifier
         func_name = obj.func_ref.val if hasattr(obj.func_ref, 'val') else str(obj.func_ref)
-        lines.append(f"{prefix}{branch}Func: {func_name}")
+        lines.append(f"{prefix}{branch}Func: {func_name}{note}")
 
         # Next level prefix
         new_prefix = prefix + ("    " if is_last else "│   ")
@@ -117,13 +124,13 @@ def _generate_tree(obj: Func, prefix="", is_last=True, level=0):
             next_prefix = new_prefix + ("    " if is_last_arg else "│   ")
 
             # Recursively process argument
-            sub_lines = _generate_tree(arg, next_prefix, True, level + 2)
+            sub_lines = _generate_tree(arg, next_prefix, True, level + 2, annotate)
             arg_lines.extend(sub_lines)
             lines.extend(arg_lines)
 
     elif class_name == "IfFunc":
         # Format if function node
-        lines.append(f"{prefix}{branch}IfFunc")
+        lines.append(f"{prefix}{branch}IfFunc{note}")
 
         # Next level prefix
         new_prefix = prefix + ("    " if is_last else "│   ")
@@ -139,14 +146,14 @@ def _generate_tree(obj: Func, prefix="", is_last=True, level=0):
             if hasattr(condition_val, 'condition') and condition_val.condition:
                 cond_lines.append(f"{cond_prefix}├── Condition Expression")
                 cond_expr_prefix = cond_prefix + "│   "
-                sub_lines = _generate_tree(condition_val.condition, cond_expr_prefix, True, level + 3)
+                sub_lines = _generate_tree(condition_val.condition, cond_expr_prefix, True, level + 3, annotate)
                 cond_lines.extend(sub_lines)
 
             # Add then value
             if hasattr(condition_val, 'val') and condition_val.val:
                 cond_lines.append(f"{cond_prefix}└── Then")
                 then_prefix = cond_prefix + "    "
-                sub_lines = _generate_tree(condition_val.val, then_prefix, True, level + 3)
+                sub_lines = _generate_tree(condition_val.val, then_prefix, True, level + 3, annotate)
                 cond_lines.extend(sub_lines)
 
             lines.extend(cond_lines)
@@ -155,13 +162,13 @@ def _generate_tree(obj: Func, prefix="", is_last=True, level=0):
         if obj.else_val:
             else_lines = [f"{new_prefix}└── Else"]
             else_prefix = new_prefix + "    "
-            sub_lines = _generate_tree(obj.else_val, else_prefix, True, level + 2)
+            sub_lines = _generate_tree(obj.else_val, else_prefix, True, level + 2, annotate)
             else_lines.extend(sub_lines)
             lines.extend(else_lines)
 
     elif class_name == "ConditionVal":
         # Format condition value node
-        lines.append(f"{prefix}{branch}ConditionVal")
+        lines.append(f"{prefix}{branch}ConditionVal{note}")
 
         # Next level prefix
         new_prefix = prefix + ("    " if is_last else "│   ")
@@ -171,7 +178,7 @@ def _generate_tree(obj: Func, prefix="", is_last=True, level=0):
             is_last_item = not hasattr(obj, 'val') or obj.val is None
             cond_lines = [f"{new_prefix}{'└── ' if is_last_item else '├── '}Condition"]
             next_prefix = new_prefix + ("    " if is_last_item else "│   ")
-            sub_lines = _generate_tree(obj.condition, next_prefix, True, level + 2)
+            sub_lines = _generate_tree(obj.condition, next_prefix, True, level + 2, annotate)
             cond_lines.extend(sub_lines)
             lines.extend(cond_lines)
 
@@ -179,7 +186,7 @@ def _generate_tree(obj: Func, prefix="", is_last=True, level=0):
         if hasattr(obj, 'val') and obj.val:
             val_lines = [f"{new_prefix}└── Value"]
             next_prefix = new_prefix + "    "
-            sub_lines = _generate_tree(obj.val, next_prefix, True, level + 2)
+            sub_lines = _generate_tree(obj.val, next_prefix, True, level + 2, annotate)
             val_lines.extend(sub_lines)
             lines.extend(val_lines)
 
@@ -192,14 +199,14 @@ def _generate_tree(obj: Func, prefix="", is_last=True, level=0):
 
         # For literals like numbers, strings, etc. - use a better label
         if val_type in ["number", "string", "boolean"]:
-            lines.append(f"{prefix}{branch}Value: {val}{type_str}")
+            lines.append(f"{prefix}{branch}Value: {val}{type_str}{note}")
         else:
-            lines.append(f"{prefix}{branch}Classifier: {val}{type_str}")
+            lines.append(f"{prefix}{branch}Classifier: {val}{type_str}{note}")
 
     else:
         # Handle unknown or primitive value
         display_val = obj.val if hasattr(obj, 'val') else str(obj)
-        lines.append(f"{prefix}{branch}Value: {display_val}")
+        lines.append(f"{prefix}{branch}Value: {display_val}{note}")
 
     return lines
 
@@ -219,3 +226,129 @@ def generate_visualization(expr):
         func_obj = func_obj.args[0]
     visualization = visualize_function_hierarchy(func_obj)
     return visualization
+
+
+@dataclass
+class NodeProfile:
+    """
+    Cost of evaluating one subexpression of a formula.
+
+    Attributes:
+        node: The Func or IfFunc node in the formula tree.
+        seconds: Best wall time of evaluating the node's whole subtree.
+        rows: Number of rows the subexpression produced.
+        size_bytes: Estimated in-memory size of its output.
+    """
+
+    node: Any
+    seconds: float
+    rows: int
+    size_bytes: int
+
+
+def _profiled_nodes(func_obj):
+    """Yield every Func and IfFunc node the tree rendering shows, root first."""
+    to_visit = [func_obj]
+    while to_visit:
+        obj = _get_unwrapped_obj(to_visit.pop())
+        class_name = obj.__class__.__name__
+        if class_name in ("Func", "TempFunc"):
+            if class_name == "Func":
+                yield obj
+            to_visit.extend(reversed(obj.args))
+        elif class_name == "IfFunc":
+            yield obj
+            if obj.else_val:
+                to_visit.append(obj.else_val)
+            for condition_val in reversed(obj.conditions):
+                to_visit.extend([condition_val.val, condition_val.condition])
+
+
+def profile_nodes(func_obj, df: pl.DataFrame, repeat: int = 3) -> List[NodeProfile]:
+    """
+    Evaluate every subexpression of a lowered formula tree on a frame.
+
+    Times are inclusive: a node's time covers its whole subtree.
+
+    Args:
+        func_obj: The tree returned by ``build_func``.
+        df: The data to evaluate on.
+        repeat: Evaluations per node; the fastest one is reported.
+
+    Returns:
+        One NodeProfile per node that lowers to a Polars expression, root first.
+    """
+    profiles = []
+    for node in _profiled_nodes(func_obj):
+        expr = node.get_pl_func()
+        if not isinstance(expr, pl.Expr):
+            continue
+        best = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            result = df.select(expr.alias("_explain"))
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        output = result.to_series()
+        profiles.append(NodeProfile(node, best, output.len(), output.estimated_size()))
+    return profiles
+
+
+def _format_size(size_bytes: int) -> str:
+    size = float(size_bytes)
+    for unit in ("B", "KB", "MB"):
+        if size < 1024:
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GB"
+
+
+def explain(
+    expr: str,
+    df: Union[pl.DataFrame, pl.LazyFrame],
+    sample_rows: Optional[int] = None,
+    repeat: int = 3,
+) -> str:
+    """
+    Profile a formula on data and show the cost of each part of it.
+
+    Renders the same tree as ``generate_visualization``, with every node
+    annotated with the time spent evaluating it on ``df``, that time relative
+    to the most expensive node, and the size of its output. Times are
+    inclusive, so following the largest percentages from the root leads to the
+    expensive part, e.g. the hot branch of a long if/elseif chain.
+
+    Args:
+        expr: The formula to profile.
+        df: The data to evaluate on. A LazyFrame is collected first.
+        sample_rows: If set, profile on this many rows: a random sample of a
+            DataFrame, or the first rows of a LazyFrame, so that it is not
+            collected in full.
+        repeat: Evaluations per node; the fastest one is reported.
+
+    Returns:
+        The annotated tree as a string.
+
+    Example:
+        >>> print(explain('if [a] > 1 then uppercase([b]) else [b] endif', df))
+    """
+    if isinstance(df, pl.LazyFrame):
+        df = df.head(sample_rows).collect() if sample_rows else df.collect()
+    elif sample_rows and df.height > sample_rows:
+        df = df.sample(sample_rows, seed=0)
+
+    func_obj = build_func(expr)
+    profiles = {id(p.node): p for p in profile_nodes(func_obj, df, repeat)}
+    root_seconds = max((p.seconds for p in profiles.values()), default=0.0)
+
+    def annotate(obj):
+        profile = profiles.get(id(obj))
+        if profile is None:
+            return ""
+        share = profile.seconds / root_seconds if root_seconds else 0.0
+        return (
+            f"  [{profile.seconds * 1e3:.3f} ms, {share:.0%}, "
+            f"{profile.rows:,} rows, {_format_size(profile.size_bytes)}]"
+        )
+
+    return "\n".join(_generate_tree(func_obj, annotate=annotate))
@@ -0,0 +1,194 @@
+import polars as pl
+import pytest
+from polars.testing import assert_frame_equal
+
+from polars_expr_transformer import (
+    ExpressionSyntaxError,
+    check,
+    compile_aggregate,
+    simple_function_to_expr,
+    to_polars_code,
+)
+
+
+@pytest.fixture
+def df() -> pl.DataFrame:
+    return pl.DataFrame(
+        {
+            "region": ["EU", "EU", "US", "US", "EU"],
+            "shop": ["a", "b", "a", "a", "a"],
+            "amount": [10, 30, 5, 15, 10],
+            "price": [1.0, 2.0, 3.0, None, 5.0],
+        }
+    )
+
+
+def evaluate(df: pl.DataFrame, formula: str) -> list:
+    return df.select(simple_function_to_expr(formula)).to_series().to_list()
+
+
+@pytest.mark.parametrize(
+    "formula, expected",
+    [
+        ("sum([amount])", [70]),
+        ("sum([amount]) over([region])", [50, 50, 20, 20, 50]),
+        ("avg([amount]) over([region])", [50 / 3, 50 / 3, 10.0, 10.0, 50 / 3]),
+        ("count() over([region])", [3, 3, 2, 2, 3]),
+        ("count([price]) over([region])", [3, 3, 1, 1, 3]),
+        ("min([amount]) over([region])", [10, 10, 5, 5, 10]),
+        ("max([amount]) over([region], [shop])", [10, 30, 15, 15, 10]),
+        ("rank([amount]) over([region])", [1, 3, 1, 2, 1]),
+        ("rank([amount], true) over([region])", [2, 1, 2, 1, 2]),
+        ("row_number() over([region])", [1, 2, 1, 2, 3]),
+        ("row_number()", [1, 2, 3, 4, 5]),
+        ("sum([amount]) over()", [70]),
+        ('sumif([amount], [shop] = "a")', [40]),
+        ('sumif([amount], [shop] = "a") over([region])', [20, 20, 20, 20, 20]),
+        ("countif([amount] > 5) over([region])", [3, 3, 1, 1, 3]),
+        ("countif([price] > 1)", [3]),
+        ("avgif([price], [amount] >= 10) over([region])", [8 / 3, 8 / 3, None, None, 8 / 3]),
+        ("sumif([amount] * 2, [amount] > 10)", [90]),
+    ],
+)
+def test_aggregates(df, formula, expected):
+    assert evaluate(df, formula) == pytest.approx(expected)
+
+
+def test_over_applies_to_the_preceding_operand(df):
+    assert evaluate(df, "[amount] / sum([amount]) over([region]) * 10") == [2, 6, 2.5, 7.5, 2]
+    assert evaluate(df, "(sum([amount]) + 1) over([region])") == [51, 51, 21, 21, 51]
+    assert evaluate(df, "sum(if [shop] = \"a\" then [amount] else 0 endif) over([region])") == [
+        20, 20, 20, 20, 20
+    ]
+    assert evaluate(df, 'concat([region], ":", to_string(count() over([region])))')[0] == "EU:3"
+
+
+@pytest.mark.parametrize("formula", ["[amount] + 1 over([region])", "[amount] + 1over([region])", "[amount] + 1.0 over ([region])"])
+def test_over_a_number(df, formula):
+    assert evaluate(df, formula) == [11, 31, 6, 16, 11]
+    assert evaluate(df, "2 over([region])") == [2] * 5
+
+
+@pytest.mark.parametrize(
+    "formula",
+    [
+        "[amount] / sum([amount]) over([region])",
+        "sum([amount] * 2) over([region], [shop])",
+        "(sum([amount]) + 1) over([region])",
+        "count() over([region])",
+        "rank([amount], true) over([region])",
+        "row_number() over([region]) + 1",
+        'sumif([amount], [shop] = "a") over([region])',
+        "countif([price] > 1) over([region])",
+        "avgif([amount] / 2, [price] > 1)",
+    ],
+)
+def test_polars_code_round_trip(df, formula):
+    code = to_polars_code(formula)
+    assert_frame_equal(df.select(eval(code, {"pl": pl})), df.select(simple_function_to_expr(formula)))
+
+
+def test_compile_aggregate_groups_by_the_over_keys(df):
+    plan = compile_aggregate("sum([amount]) over([region]) / count() over([region])")
+    assert plan.to_polars_code() == (
+        'df.group_by([pl.col("region")], maintain_order=True)'
+        '.agg((pl.col("amount").sum() / pl.len()).alias("result"))'
+    )
+    expected = pl.DataFrame({"region": ["EU", "US"], "result": [50 / 3, 10.0]})
+    assert_frame_equal(plan.apply(df), expected)
+    assert_frame_equal(plan.apply(df.lazy()).collect(), expected)
+    assert_frame_equal(eval(plan.to_polars_code(), {"pl": pl, "df": df}), expected)
+
+
+def test_compile_aggregate_with_conditional_aggregates(df):
+    plan = compile_aggregate('sumif([amount], [shop] = "a") over([region]) / sum([amount]) over([region])')
+    assert plan.apply(df).rows() == [("EU", 0.4), ("US", 1.0)]
+
+
+def test_compile_aggregate_with_several_keys(df):
+    plan = compile_aggregate("max([amount]) over([region], [shop])")
+    result = plan.apply(df, name="top")
+    assert result.columns == ["region", "shop", "top"]
+    assert result.rows() == [("EU", "a", 10), ("EU", "b", 30), ("US", "a", 15)]
+
+
+def test_compile_aggregate_without_over_reduces_the_frame(df):
+    plan = compile_aggregate("sum([amount]) - min([amount])")
+    assert plan.keys == []
+    assert plan.apply(df).rows() == [(65,)]
+    assert plan.to_polars_code() == 'df.select((pl.col("amount").sum() - pl.col("amount").min()).alias("result"))'
+
+
+def test_compile_aggregate_rejects_mixed_keys():
+    formula = "sum([amount]) over([region]) / sum([amount]) over([shop])"
+    with pytest.raises(ExpressionSyntaxError) as info:
+        compile_aggregate(formula)
+    assert info.value.position == formula.index("[shop]")
+    assert "same keys" in str(info.value)
+
+
+def test_check_knows_aggregate_types():
+    schema = {"amount": pl.Int64, "region": pl.String}
+    assert check("[amount] / sum([amount]) over([region])", schema) == []
+    assert check("min([region]) over([amount]) + 1", schema)[0].message == (
+        "Cannot apply '+' to a string and a number."
+    )
+    assert check("avg([region])", schema)[0].message == (
+        "Argument 1 of 'avg' should be a number, but is a string."
+    )
+
+
+@pytest.fixture
+def prices() -> pl.DataFrame:
+    return pl.DataFrame(
+        {
+            "ticker": ["A", "B", "A", "B", "A"],
+            "day": [3, 1, 1, 2, 2],
+            "price": [12.0, 20.0, 10.0, 30.0, 15.0],
+        }
+    )
+
+
+@pytest.mark.parametrize(
+    "formula, expected",
+    [
+        ("lag([price])", [None, 12.0, 20.0, 10.0, 30.0]),
+        ("lead([price], 2)", [10.0, 30.0, 15.0, None, None]),
+        ("lag([price], -1)", [20.0, 10.0, 30.0, 15.0, None]),
+        ("lead([price], -2)", [None, None, 12.0, 20.0, 10.0]),
+        ("pct_change([price], -1)", [-0.4, 1.0, -2 / 3, 1.0, None]),
+        ("lag([price]) over([ticker]) order_by([day])", [15.0, None, None, 20.0, 10.0]),
+        ("lag([price]) order_by([day]) over([ticker])", [15.0, None, None, 20.0, 10.0]),
+        ("[price] - lag([price]) over([ticker]) order_by([day])", [-3.0, None, None, 10.0, 5.0]),
+        ("cumsum([price]) over([ticker]) order_by([day])", [37.0, 20.0, 10.0, 50.0, 25.0]),
+        ("cumsum([price]) order_by([day], [ticker])", [87.0, 30.0, 10.0, 75.0, 45.0]),
+        ("cumsum([price]) order_by(-[day])", [12.0, 77.0, 87.0, 42.0, 57.0]),
+        ("rolling_sum([price], 2) over([ticker]) order_by([day])", [27.0, None, None, 50.0, 25.0]),
+        ("rolling_mean([price], 2)", [None, 16.0, 15.0, 20.0, 22.5]),
+        ("rolling_min([price], 3)", [None, None, 10.0, 10.0, 10.0]),
+        ("rolling_max([price], 3)", [None, None, 20.0, 30.0, 30.0]),
+        ("pct_change([price]) over([ticker]) order_by([day])", [-0.2, None, None, 0.5, 0.5]),
+    ],
+)
+def test_window_functions(prices, formula, expected):
+    assert evaluate(prices, formula) == pytest.approx(expected, nan_ok=True)
+    code = to_polars_code(formula)
+    assert_frame_equal(
+        prices.select(eval(code, {"pl": pl})), prices.select(simple_function_to_expr(formula))
+    )
+
+
+def test_window_clauses_become_one_over_call():
+    assert to_polars_code("cumsum([price]) over([ticker]) order_by([day])") == (
+        'pl.col("price").cum_sum().over([pl.col("ticker")], order_by=[pl.col("day")])'
+    )
+    assert to_polars_code("lag([price], 2) order_by([day])") == (
+        'pl.col("price").shift(2).over(order_by=[pl.col("day")])'
+    )
+
+
+def test_compile_aggregate_rejects_order_by():
+    formula = "sum([price]) over([ticker]) order_by([day])"
+    with pytest.raises(ExpressionSyntaxError) as info:
+        compile_aggregate(formula)
+    assert info.value.position == formula.index("order_by")
@@ -0,0 +1,126 @@
+import asyncio
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import polars as pl
+import pytest
+
+from polars_expr_transformer import CostLimits, ExpressionSyntaxError, FormulaTooComplexError
+from polars_expr_transformer import async_compile
+from polars_expr_transformer.async_compile import compile_async, compile_many_async, configure
+
+
+@pytest.fixture(autouse=True)
+def reset_configuration():
+    yield
+    configure()
+
+
+@pytest.fixture
+def slow_compile(monkeypatch):
+    calls = []
+    running = [0, 0]  # current, maximum
+    lock = threading.Lock()
+    original = async_compile._compile
+
+    def compile_slowly(func_str, limits):
+        with lock:
+            calls.append(func_str)
+            running[0] += 1
+            running[1] = max(running)
+        time.sleep(0.05)
+        with lock:
+            running[0] -= 1
+        return original(func_str, limits)
+
+    monkeypatch.setattr(async_compile, "_compile", compile_slowly)
+    return calls, running
+
+
+def test_compile_async():
+    df = pl.DataFrame({"a": [1, 2]})
+    expr = asyncio.run(compile_async("[a] * 10"))
+    assert df.select(expr.alias("r"))["r"].to_list() == [10, 20]
+
+
+def test_identical_requests_are_coalesced(slow_compile):
+    calls, _ = slow_compile
+
+    async def herd():
+        return await asyncio.gather(*(compile_async("[a] + 1") for _ in range(50)))
+
+    exprs = asyncio.run(herd())
+    assert calls == ["[a] + 1"]
+    assert len(exprs) == 50
+
+
+def test_concurrency_is_bounded(slow_compile):
+    calls, running = slow_compile
+    configure(max_concurrency=2)
+    formulas = [f"[a] + {i}" for i in range(8)]
+    asyncio.run(compile_many_async(formulas))
+    assert sorted(calls) == sorted(formulas)
+    assert running[1] == 2
+
+
+def test_compile_many_async_keeps_order():
+    df = pl.DataFrame({"a": [1, 2]})
+    exprs = asyncio.run(compile_many_async(["[a] + 1", "[a] * 3", "[a] + 1"]))
+    results = [df.select(e.alias("r"))["r"].to_list() for e in exprs]
+    assert results == [[2, 3], [3, 6], [2, 3]]
+
+
+def test_errors_reach_every_waiter():
+    async def compile_twice():
+        return await asyncio.gather(
+            compile_async("((1)"), compile_async("((1)"), return_exceptions=True
+        )
+
+    errors = asyncio.run(compile_twice())
+    assert all(isinstance(e, ExpressionSyntaxError) for e in errors)
+
+
+def test_return_exceptions():
+    results = asyncio.run(compile_many_async(["[a] + 1", "((1)"], return_exceptions=True))
+    assert isinstance(results[0], pl.Expr)
+    assert isinstance(results[1], ExpressionSyntaxError)
+
+
+def test_limits_are_applied():
+    with pytest.raises(FormulaTooComplexError):
+        asyncio.run(compile_async("repeat([a], 1000000)", limits=CostLimits()))
+
+
+def test_cancelled_caller_does_not_cancel_others(slow_compile):
+    calls, _ = slow_compile
+
+    async def cancel_one():
+        first = asyncio.ensure_future(compile_async("[a] - 1"))
+        second = asyncio.ensure_future(compile_async("[a] - 1"))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        return await second
+
+    assert isinstance(asyncio.run(cancel_one()), pl.Expr)
+    assert calls == ["[a] - 1"]
+
+
+def test_thread_executor():
+    with ThreadPoolExecutor(2) as executor:
+        configure(executor=executor)
+        assert isinstance(asyncio.run(compile_async("[a] + 1")), pl.Expr)
+
+
+def test_process_executor():
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(1, mp_context=context) as executor:
+        configure(executor=executor)
+        expr = asyncio.run(compile_async("[a] + 1"))
+    assert pl.DataFrame({"a": [1]}).select(expr.alias("r"))["r"].to_list() == [2]
+
+
+def test_invalid_concurrency():
+    with pytest.raises(ValueError):
+        configure(max_concurrency=0)
@@ -0,0 +1,148 @@
+import datetime
+
+import polars as pl
+import pytest
+
+from polars_expr_transformer import Diagnostic, check, simple_function_to_expr
+from polars_expr_transformer.process.models import Func
+
+SCHEMA = {"age": pl.Int64, "name": pl.String, "joined": pl.Date, "active": pl.Boolean, "score": pl.Float64}
+
+DF = pl.DataFrame(
+    {
+        "age": [30, 25],
+        "name": ["Alice", "Bob"],
+        "joined": [datetime.date(2020, 1, 1), datetime.date(2021, 6, 1)],
+        "active": [True, False],
+        "score": [1.5, 2.5],
+    }
+)
+
+
+def messages(formula, schema=SCHEMA):
+    return [d.message for d in check(formula, schema)]
+
+
+@pytest.mark.parametrize(
+    "formula",
+    [
+        'if [age] > 28 then uppercase([name]) else left([name], 2) endif',
+        'concat([name], " ", to_string(year([joined])))',
+        '[score] * 2 + [age] - [active]',
+        '[active] and [age] >= 18 or [name] = "Bob"',
+        'add_days([joined], 3) > [joined]',
+        '"n: " + [name]',
+        '[joined] - [joined]',
+        '[age] in (1, 2.5) and [name] in ("Bob",)',
+    ],
+)
+def test_valid_formulas_have_no_diagnostics(formula):
+    assert check(formula, SCHEMA) == []
+    DF.select(simple_function_to_expr(formula))
+
+
+def test_every_problem_is_reported_in_order():
+    formula = 'if [age] then left([name]) else [nme] endif'
+    diagnostics = check(formula, SCHEMA)
+    assert [d.severity for d in diagnostics] == ["error", "error", "error"]
+    assert [d.position for d in diagnostics] == [3, 14, 32]
+    assert diagnostics[0].message == "The condition of 'if' should be a boolean, but is a number."
+    assert diagnostics[1].message == "Function 'left' takes 2 arguments, but 1 were given."
+    assert diagnostics[2].message == "Unknown column 'nme'."
+    assert diagnostics[2].hint == "Did you mean [name]?"
+
+
+def test_syntax_error_is_a_single_diagnostic():
+    (diagnostic,) = check("concat([a], (1)")
+    assert diagnostic.severity == "error"
+    assert diagnostic.position is not None
+    assert "^" in str(diagnostic)
+
+
+def test_unknown_function_and_name():
+    (diagnostic,) = check("fooo([a])")
+    assert diagnostic.message == "Unknown function 'fooo'."
+    assert diagnostic.position == 0
+    assert messages("abc + 1", None) == ["Unknown name 'abc'."]
+
+
+def test_missing_values():
+    assert messages("if [a] > 1 then  else 2 endif", None)[0].startswith("Expected a value, but found nothing.")
+    assert messages("[a] +", None) == ["Operator '+' needs a value on both sides."]
+    assert messages("[a] and", None) == ["Operator 'and' needs a value on both sides."]
+
+
+def test_arity_ranges():
+    assert messages("round()", None) == ["Function 'round' takes 1 to 2 arguments, but 0 were given."]
+    assert messages("uppercase([a], [b])", None) == ["Function 'uppercase' takes 1 arguments, but 2 were given."]
+    assert check("concat([a], [b], [c], [d])") == []
+
+
+@pytest.mark.parametrize(
+    "formula, message",
+    [
+        ("uppercase([age])", "Argument 1 of 'uppercase' should be a string, but is a number."),
+        ("year([name])", "Argument 1 of 'year' should be a date, but is a string."),
+        ("[name] - 1", "Cannot apply '-' to a string."),
+        ("uppercase([name]) + 1", "Cannot apply '+' to a string and a number."),
+        ("[joined] + 1", "Cannot apply '+' to a date and a number."),
+        ('[age] > "10"', "Cannot compare a number with a string using '>'."),
+        ("[active] and [name]", "'and' needs booleans, but got a string."),
+        ("if [name] then 1 else 2 endif", "The condition of 'if' should be a boolean, but is a string."),
+        ('[age] in ("1", "2")', "Cannot look up a number in a list of strings."),
+        ("[joined] in (1, 2)", "Cannot look up a date in a list of numbers."),
+    ],
+)
+def test_type_errors_match_polars(formula, message):
+    assert messages(formula) == [message]
+    with pytest.raises(Exception):
+        DF.select(simple_function_to_expr(formula))
+
+
+def test_types_flow_through_functions():
+    assert messages('length(uppercase([name])) > "3"') == [
+        "Cannot compare a number with a string using '>'."
+    ]
+    assert messages('coalesce([name], "x") * 2') == ["Cannot apply '*' to a string."]
+
+
+def test_mixed_branches_are_a_warning():
+    (diagnostic,) = check('if [age] > 1 then "x" else 1 endif', SCHEMA)
+    assert diagnostic.severity == "warning"
+    assert diagnostic.message.startswith("The branches of 'if' have different types: number, string.")
+
+
+def test_types_are_unknown_without_schema():
+    assert check("[age] + 1 > [name]") == []
+    assert check("[x] > 1", {"x": pl.List(pl.Int64)}) == []
+
+
+def test_column_placeholder_is_not_a_missing_column():
+    assert check("[$col] * 2", SCHEMA) == []
+
+
+def test_shared_subtrees_are_reported_once():
+    diagnostics = check("to_integer([nme]) + to_integer([nme])", SCHEMA)
+    assert [d.message for d in diagnostics] == ["Unknown column 'nme'."]
+
+
+def test_diagnostic_str_points_into_the_formula():
+    (diagnostic,) = check("[agee] + 1", SCHEMA)
+    assert isinstance(diagnostic, Diagnostic)
+    assert str(diagnostic).splitlines() == [
+        "error: Unknown column 'agee'.",
+        "[agee] + 1",
+        "^",
+        "Hint: Did you mean [age]?",
+    ]
+
+
+def test_no_polars_expression_is_built(monkeypatch):
+    def fail(self):
+        raise AssertionError("lowered")
+
+    monkeypatch.setattr(Func, "get_pl_func", fail)
+    assert messages("uppercase([age]) + 1") == [
+        "Argument 1 of 'uppercase' should be a string, but is a number.",
+        "Cannot apply '+' to a string and a number.",
+    ]
@@ -0,0 +1,75 @@
+import polars as pl
+import polars.selectors as cs
+import pytest
+from polars.testing import assert_frame_equal
+
+from polars_expr_transformer import ExpressionSyntaxError, PolarsCodeGenError, template_function_to_expr
+from polars_expr_transformer.process.column_template import bind_column_placeholder
+from polars_expr_transformer.process.polars_expr_transformer import build_func
+from polars_expr_transformer.process.preprocess import parse_pl_cols
+
+
+@pytest.fixture
+def df() -> pl.DataFrame:
+    return pl.DataFrame(
+        {
+            "a": [" Foo ", "BAR"],
+            "b": ["x ", " Y"],
+            "n": [1, 2],
+            "m": [10, 20],
+        }
+    )
+
+
+def test_parse_pl_cols_normalizes_placeholder():
+    assert parse_pl_cols("trim([ $col ])") == 'trim(pl.col("$col"))'
+
+
+def test_template_over_column_list(df):
+    result = df.select(template_function_to_expr("trim(lowercase([$col]))", ["a", "b"]))
+    expected = pl.DataFrame({"a": ["foo", "bar"], "b": ["x", "y"]})
+    assert_frame_equal(result, expected)
+
+
+def test_template_over_selector(df):
+    result = df.select(template_function_to_expr("uppercase([$col])", cs.string()))
+    expected = pl.DataFrame({"a": [" FOO ", "BAR"], "b": ["X ", " Y"]})
+    assert_frame_equal(result, expected)
+
+
+def test_template_name_template(df):
+    result = df.select(template_function_to_expr("[$col] * 2", ["n", "m"], "{col}_doubled"))
+    expected = pl.DataFrame({"n_doubled": [2, 4], "m_doubled": [20, 40]})
+    assert_frame_equal(result, expected)
+
+
+def test_template_with_other_columns_and_conditionals(df):
+    expr = template_function_to_expr("if [$col] > 1 then [$col] + [n] else 0 endif", ["n", "m"])
+    result = df.select(expr)
+    expected = pl.DataFrame({"n": [0, 4], "m": [11, 22]})
+    assert_frame_equal(result, expected)
+
+
+def test_template_without_placeholder_raises():
+    with pytest.raises(ExpressionSyntaxError, match=r"\[\$col\]"):
+        template_function_to_expr("trim([a])", ["a"])
+
+
+def test_template_rejects_single_string():
+    with pytest.raises(TypeError):
+        template_function_to_expr("trim([$col])", "a")
+
+
+def test_template_code_over_column_list(df):
+    func = build_func("[$col] * 2 + [n]")
+    bind_column_placeholder(func, ["n", "m"])
+    code = func.to_polars_code()
+    assert code == '(pl.col(["n", "m"]) * pl.lit(2)) + pl.col("n")'
+    assert_frame_equal(df.select(eval(code, {"pl": pl})), df.select(func.get_pl_func()))
+
+
+def test_template_over_selector_has_no_code():
+    func = build_func("uppercase([$col])")
+    bind_column_placeholder(func, cs.string())
+    with pytest.raises(PolarsCodeGenError, match="no code form"):
+        func.to_polars_code()
@@ -0,0 +1,37 @@
+import json
+
+from benchmarks.compile_benchmark import (
+    DEFAULT_BASELINE,
+    STAGES,
+    compare,
+    run_benchmark,
+    uncompared_stages,
+)
+from benchmarks.corpus import CORPUS
+
+
+def test_every_corpus_formula_is_timed_per_stage():
+    results = run_benchmark(repeat=1)
+    assert set(results["results"]) == set(CORPUS)
+    for stages in results["results"].values():
+        assert set(stages) == set(STAGES) | {"total"}
+
+
+def test_compare_reports_only_real_regressions():
+    baseline = {"results": {"f": {"lex": 0.010, "lowering": 0.00001}}}
+    results = {"results": {"f": {"lex": 0.020, "lowering": 0.00004}}}
+    assert compare(results, baseline, tolerance=0.25) == [("f", "lex", 0.010, 0.020)]
+    assert compare(results, baseline, tolerance=1.5) == []
+
+
+def test_stages_missing_from_the_baseline_are_listed():
+    baseline = {"results": {"f": {"lex": 0.010}}}
+    results = {"results": {"f": {"lex": 0.010, "lowering": 0.001}, "g": {"lex": 0.001}}}
+    assert uncompared_stages(results, baseline) == [("f", "lowering"), ("g", "lex")]
+
+
+def test_saved_baseline_has_every_stage():
+    baseline = json.loads(DEFAULT_BASELINE.read_text())
+    assert set(baseline["results"]) == set(CORPUS)
+    for stages in baseline["results"].values():
+        assert set(stages) == set(STAGES) | {"total"}
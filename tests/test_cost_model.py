@@ -0,0 +1,134 @@
+import polars as pl
+import pytest
+
+from polars_expr_transformer import (
+    CostLimits,
+    FormulaTooComplexError,
+    build_func,
+    estimate_cost,
+    simple_function_to_expr,
+)
+from polars_expr_transformer.process.cost_model import check_deadline, check_source, parse_deadline
+from polars_expr_transformer.process.polars_expr_transformer import parse_func
+
+
+def test_deep_nesting_is_rejected_before_parsing():
+    formula = "uppercase(" * 5000 + "[a]" + ")" * 5000
+    with pytest.raises(FormulaTooComplexError) as exc_info:
+        simple_function_to_expr(formula, limits=CostLimits(max_length=None))
+    assert exc_info.value.limit == "max_depth"
+    assert exc_info.value.value == 5000
+
+
+@pytest.mark.parametrize(
+    "formula, limit",
+    [
+        ("if [a] > 1 then " * 600 + "1" + " else 0 endif" * 600, "max_depth"),
+        (" + ".join(["[a]"] * 3000), "max_nodes"),
+        ("-" * 500 + "1", "max_depth"),
+    ],
+)
+def test_deep_trees_without_brackets_are_rejected_before_parsing(formula, limit):
+    with pytest.raises(FormulaTooComplexError) as exc_info:
+        simple_function_to_expr(formula, limits=CostLimits())
+    assert exc_info.value.limit == limit
+
+
+def test_keywords_in_names_and_literals_do_not_count():
+    check_source('if [if endif] = "if if - - -" then 1 else 0 endif', CostLimits(max_depth=1, max_nodes=4))
+
+
+def test_recursion_error_is_reported_as_too_complex():
+    formula = " + ".join(["[a]"] * 3000)
+    with pytest.raises(FormulaTooComplexError) as exc_info:
+        simple_function_to_expr(formula, limits=CostLimits(max_depth=None, max_nodes=None, max_cost=None))
+    assert exc_info.value.limit == "max_depth"
+
+
+def test_long_lists_count_as_values_not_length():
+    formula = "[a] in (" + ", ".join(str(i) for i in range(10_000)) + ")"
+    assert len(formula) > CostLimits().max_length
+    func = build_func(formula, limits=CostLimits())
+    assert estimate_cost(func).nodes < 10
+    with pytest.raises(FormulaTooComplexError) as exc_info:
+        build_func(formula, limits=CostLimits(max_list_values=1_000))
+    assert exc_info.value.limit == "max_list_values"
+    assert exc_info.value.value == 10_000
+
+
+def test_text_that_only_looks_like_a_list_counts_toward_the_length():
+    formula = "[a] in (" + " + ".join(["1"] * 10) + ")"
+    with pytest.raises(FormulaTooComplexError) as exc_info:
+        build_func(formula, limits=CostLimits(max_length=20))
+    assert exc_info.value.limit == "max_length"
+
+
+def test_long_formula_is_rejected():
+    formula = " + ".join(["[a]"] * 10)
+    with pytest.raises(FormulaTooComplexError) as exc_info:
+        build_func(formula, limits=CostLimits(max_length=20))
+    assert exc_info.value.limit == "max_length"
+
+
+def test_huge_string_literal_is_rejected():
+    formula = 'concat([a], "' + "x" * 50_000 + '")'
+    with pytest.raises(FormulaTooComplexError) as exc_info:
+        simple_function_to_expr(formula, limits=CostLimits(max_length=None))
+    assert exc_info.value.limit == "max_string_literal"
+    assert exc_info.value.value == 50_000
+
+
+def test_brackets_inside_literals_do_not_count_as_nesting():
+    formula = 'concat([a], "' + "(" * 200 + '")'
+    simple_function_to_expr(formula, limits=CostLimits())
+
+
+def test_repeat_with_large_count_exceeds_cost():
+    with pytest.raises(FormulaTooComplexError) as exc_info:
+        simple_function_to_expr("repeat([a], 1000000)", limits=CostLimits())
+    assert exc_info.value.limit == "max_cost"
+    assert exc_info.value.value == 5_000_000
+
+
+def test_regex_calls_are_limited():
+    formula = " or ".join(f'contains([a], "x{i}")' for i in range(5))
+    with pytest.raises(FormulaTooComplexError) as exc_info:
+        simple_function_to_expr(formula, limits=CostLimits(max_regex=4))
+    assert exc_info.value.limit == "max_regex"
+    simple_function_to_expr(formula, limits=CostLimits(max_regex=5))
+
+
+def test_estimate_cost():
+    estimate = estimate_cost(parse_func('if contains([a], "x") then repeat([a], 3) else "" endif'))
+    assert estimate.regex_count == 1
+    assert estimate.cost >= 10 + 15
+    assert estimate.nodes > 0 and estimate.depth > 1
+
+
+def test_parse_deadline():
+    with parse_deadline(0):
+        with pytest.raises(FormulaTooComplexError) as exc_info:
+            check_deadline("tokenize")
+    assert exc_info.value.limit == "max_parse_seconds"
+    check_deadline("tokenize")
+
+
+def test_exceeded_time_budget_is_rejected():
+    with pytest.raises(FormulaTooComplexError) as exc_info:
+        build_func("[a] + 1", limits=CostLimits(max_parse_seconds=0))
+    assert exc_info.value.limit == "max_parse_seconds"
+
+
+def test_formula_within_limits_compiles():
+    df = pl.DataFrame({"a": ["x", "y"]})
+    expr = simple_function_to_expr('concat([a], repeat("-", 2))', limits=CostLimits())
+    assert df.select(expr.alias("r"))["r"].to_list() == ["x--", "y--"]
+
+
+def test_no_limits_by_default():
+    simple_function_to_expr("repeat([a], 1000000)")
+
+
+def test_is_value_error():
+    with pytest.raises(ValueError):
+        simple_function_to_expr("[a] + 1", limits=CostLimits(max_length=2))
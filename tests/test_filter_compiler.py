@@ -0,0 +1,79 @@
+import datetime
+
+import polars as pl
+import pytest
+from polars.testing import assert_frame_equal
+
+from polars_expr_transformer import compile_filter, simple_function_to_expr
+
+
+@pytest.fixture
+def df() -> pl.DataFrame:
+    return pl.DataFrame(
+        {
+            "region": ["EU", "US", "EU", "EU"],
+            "amount": [200, 300, 50, 150],
+            "a": [1, 2, 3, 4],
+            "b": [0, 5, 1, 9],
+            "day": [datetime.date(2024, 1, d) for d in (1, 5, 20, 31)],
+        }
+    )
+
+
+def test_and_chain_is_flattened():
+    plan = compile_filter('[region] = "EU" and [amount] > 100 and [a] <= 3')
+    assert [(c.column, c.op) for c in plan.conjuncts] == [
+        ("region", "eq"),
+        ("amount", "gt"),
+        ("a", "le"),
+    ]
+    assert plan.pushdown_count == 3
+
+
+def test_literal_on_left_is_mirrored():
+    plan = compile_filter("100 < [amount] and 3 >= [a]")
+    assert plan.to_polars_code() == '(pl.col("amount") > pl.lit(100)) & (pl.col("a") <= pl.lit(3))'
+
+
+def test_between_becomes_is_between():
+    plan = compile_filter("between([amount], 100, 250)")
+    assert plan.conjuncts[0].op == "is_between"
+    assert plan.to_polars_code(prefix="ff") == 'ff.col("amount").is_between(ff.lit(100), ff.lit(250))'
+
+
+def test_not_equal_is_normalized():
+    plan = compile_filter('[region] != "US"')
+    assert plan.conjuncts[0].op == "ne"
+
+
+def test_non_simple_conjuncts_are_residual():
+    plan = compile_filter('[region] = "EU" and ([a] > [b] or [a] = 3)')
+    assert [c.pushdown for c in plan.conjuncts] == [True, False]
+    assert plan.residual_count == 1
+
+
+@pytest.mark.parametrize(
+    "formula",
+    [
+        '[region] = "EU" and 100 < [amount]',
+        "between([amount], 100, 250) and [a] != 2",
+        '[region] = "EU" and ([a] > [b] or [a] = 3)',
+        "[a] > [b]",
+        'between([region], "B", "F")',
+        'between([day], to_date("2024-01-02"), to_date("2024-01-20")) and [a] > 1',
+    ],
+)
+def test_compiled_filter_matches_formula(df, formula):
+    assert_frame_equal(
+        df.filter(compile_filter(formula).expr),
+        df.filter(simple_function_to_expr(formula)),
+    )
+
+
+def test_pushdown_into_parquet_scan(df, tmp_path):
+    path = tmp_path / "data.parquet"
+    df.write_parquet(path)
+    plan = compile_filter('[region] = "EU" and between([amount], 100, 250)')
+    query = pl.scan_parquet(path).filter(plan.expr)
+    assert "SELECTION" in query.explain()
+    assert query.collect()["a"].to_list() == [1, 4]
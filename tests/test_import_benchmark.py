@@ -0,0 +1,25 @@
+from benchmarks.import_benchmark import LAZY_MODULES, run_benchmark, slowest_modules
+
+
+def test_heavy_dependencies_are_not_imported_with_the_package():
+    results = run_benchmark(repeat=1)
+    assert results["eagerly_loaded"] == []
+    assert results["median"] > 0
+
+
+def test_slowest_modules_only_lists_the_package():
+    modules = slowest_modules()
+    assert modules
+    assert all(not name.startswith(LAZY_MODULES) for name, _ in modules)
+    assert any(name.startswith("polars_expr_transformer") for name, _ in modules)
+
+
+def test_lazy_dependencies_load_on_first_use():
+    import polars as pl
+
+    from polars_expr_transformer import get_expression_overview, simple_function_to_expr
+
+    assert get_expression_overview()
+    df = pl.DataFrame({"a": ["John"], "b": ["Jones"]})
+    expr = simple_function_to_expr('string_similarity([a], [b], "levenshtein")')
+    assert df.select(expr.alias("r"))["r"][0] == 0.4
@@ -0,0 +1,101 @@
+import polars as pl
+import pytest
+
+from polars_expr_transformer import ExpressionSyntaxError
+from polars_expr_transformer.incremental import IncrementalParser, find_regions
+from polars_expr_transformer.process.polars_expr_transformer import parse_func
+
+FORMULA = 'if [a] > 1 then uppercase([b]) else concat([c], "-", left([b], 2)) endif'
+
+TYPED = 'concat(uppercase([a]), if [b] > 1 then left([c], 2) else "x" endif)'
+
+
+def code(tree):
+    return tree.to_polars_code()
+
+
+def test_regions_have_spans():
+    root = find_regions(FORMULA)
+    (block,) = root.children
+    assert (block.kind, block.start, block.end) == ("if", 0, len(FORMULA))
+    texts = [FORMULA[c.start : c.end] for c in block.children]
+    assert texts == ["uppercase([b])", 'concat([c], "-", left([b], 2))']
+    (left,) = block.children[1].children
+    assert FORMULA[left.start : left.end] == "left([b], 2)"
+
+
+def test_strings_comments_and_methods_are_not_regions():
+    text = 'contains([s], "f(") // g(x)\n'
+    assert [text[c.start : c.end] for c in find_regions(text).children] == ['contains([s], "f(")']
+    assert find_regions("[a] + (1 + 2)").children == []
+
+
+def test_unbalanced_formula_has_no_regions():
+    assert find_regions("concat([a], (1)") is None
+    assert find_regions("if [a] then 1 else 2") is None
+
+
+def test_same_tree_as_full_parse():
+    parser = IncrementalParser(FORMULA)
+    assert code(parser.tree) == code(parse_func(FORMULA))
+
+
+def test_edit_reparses_only_the_enclosing_call():
+    parser = IncrementalParser(FORMULA)
+    unchanged = parser.region_at(FORMULA.index("uppercase")).node
+    offset = FORMULA.index("2))")
+    tree = parser.edit(offset, 1, "3")
+    assert parser.last_parsed == ["left([b], 3)"]
+    assert parser.text == FORMULA.replace("2))", "3))")
+    assert code(tree) == code(parse_func(parser.text))
+    assert parser.region_at(FORMULA.index("uppercase")).node is unchanged
+
+
+def test_edit_in_if_block_reparses_the_block_only():
+    parser = IncrementalParser(FORMULA)
+    tree = parser.edit(FORMULA.index("1 then"), 1, "5")
+    assert parser.last_parsed == [parser.text]
+    assert code(tree) == code(parse_func(parser.text))
+
+
+def test_typing_matches_full_parse():
+    parser = IncrementalParser()
+    for end in range(1, len(TYPED) + 1):
+        text = TYPED[:end]
+        try:
+            expected = code(parse_func(text))
+        except Exception as e:
+            with pytest.raises(type(e)):
+                parser.update(text)
+        else:
+            assert code(parser.update(text)) == expected
+
+
+def test_invalid_edit_raises_and_can_be_fixed():
+    parser = IncrementalParser(FORMULA)
+    offset = FORMULA.index("endif")
+    with pytest.raises(ExpressionSyntaxError):
+        parser.edit(offset, 5, "")
+    assert parser.tree is None
+    tree = parser.edit(offset, 0, "endif")
+    assert code(tree) == code(parse_func(FORMULA))
+    assert parser.last_parsed == []
+
+
+def test_region_at():
+    parser = IncrementalParser(FORMULA)
+    assert parser.region_at(FORMULA.index("left") + 1).kind == "call"
+    assert parser.region_at(FORMULA.index("then")).kind == "if"
+    assert IncrementalParser().region_at(0) is None
+
+
+def test_lowered_result():
+    parser = IncrementalParser(FORMULA)
+    df = pl.DataFrame({"a": [0, 2], "b": ["xyz", "uvw"], "c": ["p", "q"]})
+    result = df.select(parser.tree.get_pl_func().alias("r"))["r"].to_list()
+    assert result == ["p-xy", "UVW"]
+
+
+def test_edit_outside_formula():
+    with pytest.raises(ValueError):
+        IncrementalParser("[a]").edit(2, 5, "")
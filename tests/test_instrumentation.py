@@ -0,0 +1,62 @@
+import pytest
+
+from polars_expr_transformer import ExpressionSyntaxError, prepare, simple_function_to_expr
+from polars_expr_transformer.instrumentation import (
+    add_observer,
+    collect_stats,
+    is_enabled,
+    remove_observer,
+)
+
+PIPELINE_STAGES = [
+    "lex",
+    "classify_tokens",
+    "build_hierarchy",
+    "parse_inline_functions",
+    "finalize_hierarchy",
+    "intern",
+]
+
+
+def test_disabled_by_default():
+    assert not is_enabled()
+
+
+def test_build_reports_one_record_per_compile():
+    with collect_stats() as stats:
+        simple_function_to_expr('if [a] > 1 then concat([b], "x") else "y" endif')
+    assert len(stats) == 1
+    record = stats[0]
+    assert list(record.stage_times) == PIPELINE_STAGES + ["lowering"]
+    assert record.total_time >= sum(record.stage_times.values())
+    assert record.token_count > 0
+    assert record.node_count > record.depth > 1
+    assert record.cache_hit is None
+    assert not is_enabled()
+
+
+def test_prepare_reports_cache_hits():
+    with collect_stats() as stats:
+        prepare("[amount] > :instrumented_limit")
+        prepare("[amount] > :instrumented_limit").bind(instrumented_limit=3)
+    assert [s.cache_hit for s in stats] == [False, True, None]
+    assert list(stats[0].stage_times) == PIPELINE_STAGES
+    assert list(stats[2].stage_times) == ["lowering"]
+
+
+def test_failed_compile_is_reported():
+    with collect_stats() as stats:
+        with pytest.raises(ExpressionSyntaxError):
+            simple_function_to_expr("if [a] then 1")
+    assert "else" in stats[0].error
+
+
+def test_failing_observer_does_not_break_compile():
+    def broken(stats):
+        raise RuntimeError("metrics backend down")
+
+    add_observer(broken)
+    try:
+        simple_function_to_expr("[a] + 1")
+    finally:
+        remove_observer(broken)
@@ -0,0 +1,91 @@
+import polars as pl
+import pytest
+
+from polars_expr_transformer import prepare, simple_function_to_expr, template_function_to_expr
+from polars_expr_transformer.process.interning import intern_tree
+from polars_expr_transformer.process.models import Classifier, Func, IfFunc
+from polars_expr_transformer.process.polars_expr_transformer import parse_func
+
+REPEATED = (
+    "if to_float([price]) > 10 then to_float([price]) * 2 "
+    "elseif to_float([price]) > 5 then to_float([price]) + 1 "
+    "else to_float([price]) endif"
+)
+
+
+def find_calls(node, name, found=None):
+    found = [] if found is None else found
+    if isinstance(node, Func):
+        if isinstance(node.func_ref, Classifier) and node.func_ref.val == name:
+            found.append(node)
+        for arg in node.args:
+            find_calls(arg, name, found)
+    elif isinstance(node, IfFunc):
+        for condition in node.conditions:
+            find_calls(condition.condition, name, found)
+            find_calls(condition.val, name, found)
+        find_calls(node.else_val, name, found)
+    return found
+
+
+@pytest.fixture
+def lowered(monkeypatch):
+    """Record every node that is actually lowered."""
+    calls = []
+    original = Func._lower
+
+    def lower(self):
+        calls.append(self)
+        return original(self)
+
+    monkeypatch.setattr(Func, "_lower", lower)
+    return calls
+
+
+def test_equal_subtrees_are_shared():
+    nodes = find_calls(parse_func(REPEATED), "to_float")
+    assert len(nodes) == 5
+    assert all(node is nodes[0] for node in nodes)
+
+
+def test_different_subtrees_stay_apart():
+    nodes = find_calls(parse_func("to_float([price]) + to_float([qty])"), "to_float")
+    assert nodes[0] is not nodes[1]
+
+
+def test_repeated_subtree_is_lowered_once(lowered):
+    parse_func(REPEATED).get_pl_func()
+    to_float = [node for node in lowered if node.func_ref.val == "to_float"]
+    assert len(to_float) == 1
+
+
+def test_memo_is_per_lowering(lowered):
+    func = parse_func("to_float([price]) + to_float([price])")
+    func.get_pl_func()
+    func.get_pl_func()
+    assert sum(node.func_ref.val == "to_float" for node in lowered) == 2
+
+
+def test_results_are_unchanged():
+    df = pl.DataFrame({"price": ["3", "7", "12"]})
+    result = df.select(simple_function_to_expr(REPEATED).alias("r"))["r"].to_list()
+    assert result == [3.0, 8.0, 24.0]
+
+
+def test_parameters_are_bound_per_lowering():
+    formula = prepare("if [a] > :x then [a] + :x else :x endif")
+    df = pl.DataFrame({"a": [1, 5]})
+    assert df.select(formula.bind(x=2).alias("r"))["r"].to_list() == [2, 7]
+    assert df.select(formula.bind(x=4).alias("r"))["r"].to_list() == [4, 9]
+
+
+def test_shared_placeholders_are_all_bound():
+    df = pl.DataFrame({"a": [1, 2], "b": [3, 4]})
+    expr = template_function_to_expr("if [$col] > 1 then [$col] * 10 else [$col] endif", ["a", "b"])
+    assert df.select(expr).to_dict(as_series=False) == {"a": [1, 20], "b": [30, 40]}
+
+
+def test_non_tree_values_pass_through():
+    assert intern_tree(None) is None
+    classifier = Classifier("1")
+    assert intern_tree(classifier) is classifier
@@ -0,0 +1,124 @@
+import polars as pl
+import pytest
+from polars.testing import assert_frame_equal
+
+from polars_expr_transformer import check, simple_function_to_expr, to_polars_code
+from polars_expr_transformer.lookup_tables import (
+    collect_lookup_joins,
+    lookup_table,
+    register_lookup_table,
+    unregister_lookup_table,
+)
+from polars_expr_transformer.pipeline import compile_pipeline
+from polars_expr_transformer.streaming import build_formula_plan, find_in_memory_fallbacks
+
+COUNTRIES = pl.DataFrame(
+    {
+        "code": ["DE", "FR", "NL"],
+        "name": ["Germany", "France", "Netherlands"],
+        "population": [83, 68, 18],
+    }
+)
+
+
+@pytest.fixture(autouse=True)
+def countries():
+    table = register_lookup_table("countries", COUNTRIES)
+    yield table
+    unregister_lookup_table("countries")
+
+
+@pytest.fixture
+def df() -> pl.DataFrame:
+    return pl.DataFrame({"country": ["FR", "XX", "DE", None, "FR"], "amount": [1, 2, 3, 4, 5]})
+
+
+def evaluate(df: pl.DataFrame, formula: str) -> list:
+    return df.select(simple_function_to_expr(formula)).to_series().to_list()
+
+
+def test_lookup(df):
+    assert evaluate(df, 'lookup([country], "countries", "name")') == ["France", None, "Germany", None, "France"]
+    assert evaluate(df, 'lookup([country], "countries", "population") * [amount]') == [68, None, 249, None, 340]
+    assert evaluate(df, 'uppercase(lookup("NL", "countries", "name"))') == ["NETHERLANDS"]
+
+
+def test_table_columns_are_shared(countries):
+    assert countries.column("name") is countries.column("name")
+    assert lookup_table("countries") is countries
+
+
+@pytest.mark.parametrize("suffix", [".parquet", ".ipc"])
+def test_tables_are_read_from_files_on_first_use(df, tmp_path, suffix):
+    path = tmp_path / f"countries{suffix}"
+    table = register_lookup_table("from_file", path, key="code")
+    try:
+        if suffix == ".parquet":
+            COUNTRIES.write_parquet(path)
+        else:
+            COUNTRIES.write_ipc(path)
+        assert evaluate(df, 'lookup([country], "from_file", "population")') == [68, None, 83, None, 68]
+        assert table.frame is table.frame
+    finally:
+        unregister_lookup_table("from_file")
+
+
+def test_errors(df):
+    with pytest.raises(ValueError, match="Unknown lookup table 'missing'"):
+        simple_function_to_expr('lookup([country], "missing", "name")')
+    with pytest.raises(ValueError, match="has no column 'capital'"):
+        simple_function_to_expr('lookup([country], "countries", "capital")')
+    with pytest.raises(ValueError, match="unknown file type"):
+        register_lookup_table("bad", "countries.csv")
+    register_lookup_table("duplicates", pl.DataFrame({"k": [1, 1], "v": [1, 2]}))
+    try:
+        with pytest.raises(ValueError, match="duplicate values"):
+            simple_function_to_expr('lookup([amount], "duplicates", "v")')
+    finally:
+        unregister_lookup_table("duplicates")
+
+
+def test_formula_plan_joins_each_table_and_key_once(df):
+    formulas = {
+        "name": 'lookup([country], "countries", "name")',
+        "label": 'concat(lookup([country], "countries", "name"), ": ", to_string(lookup([country], "countries", "population")))',
+    }
+    lf = build_formula_plan(df.lazy(), formulas, filter="[amount] > 1")
+    assert lf.explain().count("END LEFT JOIN") == 1
+    assert lf.collect_schema().names() == ["country", "amount", "name", "label"]
+    expected = df.filter(pl.col("amount") > 1).with_columns(
+        *(simple_function_to_expr(formula).alias(name) for name, formula in formulas.items())
+    )
+    assert_frame_equal(lf.collect(), expected)
+    fallbacks = find_in_memory_fallbacks(lf)
+    if fallbacks is not None:
+        assert fallbacks == []
+
+
+def test_collect_lookup_joins(df):
+    with collect_lookup_joins() as joins:
+        expr = simple_function_to_expr('lookup([country], "countries", "name")')
+    assert joins.temporary_columns == ["__lookup_0__", "__lookup_0__name"]
+    assert joins.apply(df.lazy()).select(expr).collect().to_series().to_list() == [
+        "France", None, "Germany", None, "France"
+    ]
+
+
+def test_polars_code(df, tmp_path):
+    formula = 'lookup([country], "countries", "name") + "!"'
+    code = to_polars_code(formula)
+    assert code == 'lookup_table("countries").map(pl.col("country"), "name") + pl.lit("!")'
+    assert_frame_equal(
+        df.select(eval(code, {"pl": pl, "lookup_table": lookup_table})),
+        df.select(simple_function_to_expr(formula)),
+    )
+    module = compile_pipeline({"out": formula}, cache_dir=tmp_path)
+    assert module.transform(df.lazy()).collect()["out"].to_list() == ["France!", None, "Germany!", None, "France!"]
+
+
+def test_check_types():
+    schema = {"country": pl.String}
+    assert check('lookup([country], "countries", "name")', schema) == []
+    assert check('lookup([country], 1, "name")', schema)[0].message == (
+        "Argument 2 of 'lookup' should be a string, but is a number."
+    )
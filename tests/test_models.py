@@ -195,7 +195,7 @@ class TestFunc(unittest.TestCase):
         self.func.add_arg(arg1)
         self.func.add_arg(arg2)
 
-        self.assertEqual(self.func.get_readable_pl_function(), "concat('a', 'b')")
+        self.assertEqual(self.func.get_readable_pl_function(), "concat(pl.lit('a'), pl.lit('b'))")
 
     @patch('polars_expr_transformer.process.models.funcs')
     def test_get_pl_func_pl_lit(self, mock_funcs):
@@ -0,0 +1,104 @@
+import polars as pl
+import pytest
+from polars.testing import assert_frame_equal
+
+from polars_expr_transformer import ExpressionSyntaxError, simple_function_to_expr, to_polars_code
+from polars_expr_transformer.process.optimizer import MIN_FOLDED_EQUALITIES
+
+
+@pytest.fixture
+def df() -> pl.DataFrame:
+    return pl.DataFrame(
+        {
+            "n": [1, 2, 3, 4, 5],
+            "x": [0.5, 1.5, 2.5, -1.0, 4.0],
+            "code": ["a", "b", "ab", "c", None],
+            "flag": [True, False, True, None, False],
+        }
+    )
+
+
+def evaluate(df: pl.DataFrame, formula: str) -> list:
+    return df.select(simple_function_to_expr(formula)).to_series().to_list()
+
+
+@pytest.mark.parametrize(
+    "formula, expected",
+    [
+        ("[n] in (2, 4)", [False, True, False, True, False]),
+        ("[x] in (1.5, -1, 4,)", [False, True, False, True, True]),
+        ('[code] in ("a", "c")', [True, False, False, True, None]),
+        ('[code] in ("ab",)', [False, False, True, False, None]),
+        ("[flag] in (true,)", [True, False, True, None, False]),
+        ('if [n] in (1, 5) then "edge" else "middle" endif', ["edge", "middle", "middle", "middle", "edge"]),
+    ],
+)
+def test_list_membership(df, formula, expected):
+    assert evaluate(df, formula) == expected
+    code = to_polars_code(formula)
+    assert_frame_equal(df.select(eval(code, {"pl": pl})), df.select(simple_function_to_expr(formula)))
+
+
+def test_single_value_in_parentheses_is_not_a_list(df):
+    assert evaluate(df, '[code] in ("ab")') == [True, True, True, False, None]
+    assert to_polars_code('[code] in ("ab")') == 'pl.lit("ab").str.contains(pl.col("code"))'
+
+
+def test_list_code():
+    assert to_polars_code('[code] in ("a", "b")') == (
+        'pl.col("code").is_in(pl.lit(pl.Series(["a", "b"])).implode())'
+    )
+
+
+def test_list_values_must_share_a_type():
+    formula = '[code] in ("a", 1)'
+    with pytest.raises(ExpressionSyntaxError) as info:
+        simple_function_to_expr(formula)
+    assert info.value.position == formula.index("(")
+
+
+@pytest.mark.parametrize(
+    "formula, bad",
+    [
+        ('[code] in ("a", [code])', "[code])"),
+        ('[code] in ("a" + "b", "c")', '+ "b"'),
+        ("[n] in ()", "()"),
+    ],
+)
+def test_lists_must_hold_literals(formula, bad):
+    with pytest.raises(ExpressionSyntaxError) as info:
+        simple_function_to_expr(formula)
+    assert info.value.position == formula.rindex(bad)
+
+
+def test_single_expression_in_parentheses_is_not_a_list(df):
+    assert evaluate(df, '[code] in (concat("a", "b"))') == [True, True, True, False, None]
+
+
+def test_equality_chains_fold_into_membership(df):
+    formula = "[n] = 1 or [n] = 2 or [x] > 3 or [n] = 3 or 5 = [n]"
+    assert to_polars_code(formula) == (
+        'pl.col("n").is_in(pl.lit(pl.Series([1, 2, 3, 5])).implode()) | (pl.col("x") > pl.lit(3))'
+    )
+    assert evaluate(df, formula) == [True, True, True, False, True]
+
+
+def test_short_chains_are_left_alone():
+    terms = " or ".join(f"[n] = {i}" for i in range(MIN_FOLDED_EQUALITIES - 1))
+    assert "is_in" not in to_polars_code(terms)
+
+
+def test_chains_fold_inside_functions_and_per_column(df):
+    formula = (
+        'if ([code] = "a" or [code] = "b" or [code] = "c" or [code] = "d") and '
+        "([n] = 1 or [n] = 2 or [n] = 3 or [n] = 4) then 1 else 0 endif"
+    )
+    assert to_polars_code(formula).count("is_in") == 2
+    assert evaluate(df, formula) == [1, 1, 0, 1, 0]
+
+
+def test_long_chains_and_lists(df):
+    chain = " or ".join(f"[n] = {i}" for i in range(10_000))
+    assert evaluate(df, chain) == [True] * 5
+    values = ", ".join(str(i) for i in range(0, 10_000, 2))
+    assert evaluate(df, f"[n] in ({values})") == [False, True, False, True, False]
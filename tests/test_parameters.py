@@ -0,0 +1,66 @@
+import polars as pl
+import pytest
+from polars.testing import assert_frame_equal
+
+from polars_expr_transformer import (
+    ParameterBindingError,
+    prepare,
+    simple_function_to_expr,
+)
+from polars_expr_transformer.process.preprocess import parse_parameters
+
+
+@pytest.fixture
+def df() -> pl.DataFrame:
+    return pl.DataFrame({"amount": [500, 1500, 3000], "name": ["a", "b", "c"]})
+
+
+def test_parse_parameters_skips_quoted_text():
+    assert parse_parameters('concat(":x", :sep)') == 'concat(":x", __param("sep"))'
+
+
+def test_prepare_collects_parameter_names():
+    rule = prepare("if [amount] > :min_rate and [amount] < :origin then 1 else 0 endif")
+    assert rule.parameters == {"min_rate", "origin"}
+
+
+def test_bind_different_values_share_one_parse(df):
+    rule = prepare('if [amount] > :threshold then "high" else "low" endif')
+    assert prepare('if [amount] > :threshold then "high" else "low" endif') is rule
+
+    low = df.select(rule.bind(threshold=1000).alias("band"))
+    high = df.select(rule.bind(threshold=2500).alias("band"))
+
+    assert low["band"].to_list() == ["low", "high", "high"]
+    assert high["band"].to_list() == ["low", "low", "high"]
+
+
+def test_bind_matches_literal_formula(df):
+    rule = prepare("concat([name], :sep, to_string([amount] * :rate))")
+    result = df.select(rule.bind(sep="-", rate=2))
+    expected = df.select(simple_function_to_expr('concat([name], "-", to_string([amount] * 2))'))
+    assert_frame_equal(result, expected)
+
+
+def test_bind_non_expression_argument(df):
+    rule = prepare("left([name], :n)")
+    assert df.select(rule.bind(n=1))["name"].to_list() == ["a", "b", "c"]
+
+
+def test_to_polars_code_inlines_values():
+    rule = prepare("[amount] > :threshold")
+    assert rule.to_polars_code(threshold=1000) == 'pl.col("amount") > pl.lit(1000)'
+    assert rule.to_polars_code(prefix="ff", threshold=5) == 'ff.col("amount") > ff.lit(5)'
+
+
+def test_bind_missing_and_unknown_parameters():
+    rule = prepare("[amount] > :threshold")
+    with pytest.raises(ParameterBindingError) as exc_info:
+        rule.bind(limit=3)
+    assert exc_info.value.missing == ("threshold",)
+    assert exc_info.value.unknown == ("limit",)
+
+
+def test_unbound_parameter_in_simple_function_to_expr():
+    with pytest.raises(ParameterBindingError, match=":threshold"):
+        simple_function_to_expr("[amount] > :threshold")
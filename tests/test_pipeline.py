@@ -0,0 +1,126 @@
+import sys
+
+import polars as pl
+import pytest
+from polars.testing import assert_frame_equal
+
+from polars_expr_transformer import ExpressionSyntaxError, simple_function_to_expr
+from polars_expr_transformer import pipeline
+from polars_expr_transformer.pipeline import (
+    compile_pipeline,
+    generate_pipeline_source,
+    pipeline_module_name,
+)
+
+FORMULAS = {
+    "net": "[price] * [qty]",
+    "gross": "[net] * 1.21",
+    "size": 'if [price] * [qty] > 100 then "big" else "small" endif',
+    "bonus": "if [price] * [qty] > 100 then [price] * [qty] / 10 else 0 endif",
+    "label": "concat(uppercase([name]), [size])",
+    "price": "[price] + 1",
+}
+
+
+@pytest.fixture
+def lf():
+    return pl.LazyFrame({"price": [10.0, 50.0, 5.0], "qty": [1, 3, 0], "name": ["a", "b", "c"]})
+
+
+def apply_one_by_one(lf, formulas, filter=None):
+    if filter is not None:
+        lf = lf.filter(simple_function_to_expr(filter))
+    for name, formula in formulas.items():
+        lf = lf.with_columns(simple_function_to_expr(formula).alias(name))
+    return lf
+
+
+def load(source):
+    namespace = {}
+    exec(source, namespace)
+    return namespace["transform"]
+
+
+def test_matches_applying_formulas_one_by_one(lf):
+    transform = load(generate_pipeline_source(FORMULAS, filter="[qty] > 0"))
+    assert_frame_equal(
+        transform(lf).collect(),
+        apply_one_by_one(lf, FORMULAS, filter="[qty] > 0").collect(),
+        check_column_order=False,
+    )
+
+
+def test_shared_subexpressions_are_bound_once():
+    source = generate_pipeline_source(FORMULAS)
+    assert source.count("pl.col('price') * pl.col('qty')") == 1
+    assert "_shared_0 = pl.col('price') * pl.col('qty')" in source
+    assert "_shared_1 = _shared_0 > pl.lit(100)" in source
+    assert "_shared_2" not in source
+
+
+def test_independent_formulas_share_a_with_columns():
+    source = generate_pipeline_source(FORMULAS)
+    assert source.count("with_columns(") == 2
+    first, second = source.split("with_columns(")[1:]
+    assert "alias('net')" in first and "alias('price')" in first
+    assert "alias('gross')" in second and "alias('label')" in second
+
+
+def test_overwritten_column_is_read_before_it_changes(lf):
+    formulas = {"base": "[price] * 2", "doubled": "[base] + [qty]", "qty": "[qty] * 100"}
+    transform = load(generate_pipeline_source(formulas))
+    assert_frame_equal(transform(lf).collect(), apply_one_by_one(lf, formulas).collect())
+
+
+def test_empty_pipeline(lf):
+    assert_frame_equal(load(generate_pipeline_source({}))(lf).collect(), lf.collect())
+
+
+def test_invalid_formula_raises():
+    with pytest.raises(ExpressionSyntaxError):
+        generate_pipeline_source({"a": "((1)"})
+
+
+def test_module_name_depends_on_formulas():
+    assert pipeline_module_name(FORMULAS) == pipeline_module_name(dict(FORMULAS))
+    assert pipeline_module_name(FORMULAS) != pipeline_module_name(FORMULAS, filter="[qty] > 0")
+    assert pipeline_module_name({"a": "[x]"}) != pipeline_module_name({"b": "[x]"})
+
+
+def test_compile_pipeline_writes_and_imports_module(tmp_path, lf):
+    module = compile_pipeline(FORMULAS, tmp_path)
+    name = pipeline_module_name(FORMULAS)
+    assert (tmp_path / f"{name}.py").exists()
+    assert list((tmp_path / "__pycache__").glob(f"{name}.*.pyc"))
+    assert module.FORMULAS == FORMULAS
+    assert_frame_equal(
+        module.transform(lf).collect(),
+        apply_one_by_one(lf, FORMULAS).collect(),
+        check_column_order=False,
+    )
+
+
+def test_cached_module_is_imported_without_parsing(tmp_path, lf, monkeypatch):
+    compile_pipeline(FORMULAS, tmp_path)
+    del sys.modules[pipeline_module_name(FORMULAS)]
+
+    def fail(*args, **kwargs):
+        raise AssertionError("formulas were parsed again")
+
+    monkeypatch.setattr(pipeline, "to_polars_code", fail)
+    module = compile_pipeline(FORMULAS, tmp_path)
+    assert_frame_equal(
+        module.transform(lf).collect(),
+        apply_one_by_one(lf, FORMULAS).collect(),
+        check_column_order=False,
+    )
+
+
+def test_cached_module_is_importable_by_name(tmp_path, monkeypatch):
+    compile_pipeline({"a": "[x] + 1"}, tmp_path)
+    name = pipeline_module_name({"a": "[x] + 1"})
+    del sys.modules[name]
+    monkeypatch.syspath_prepend(str(tmp_path))
+    module = __import__(name)
+    result = module.transform(pl.LazyFrame({"x": [1]})).collect()
+    assert result["a"].to_list() == [2]
@@ -57,18 +57,16 @@ class TestFinalizeHierarchy(unittest.TestCase):
 
 class TestBuildFunc(unittest.TestCase):
 
-    @patch('polars_expr_transformer.process.polars_expr_transformer.preprocess')
-    @patch('polars_expr_transformer.process.polars_expr_transformer.tokenize')
+    @patch('polars_expr_transformer.process.polars_expr_transformer.lex')
     @patch('polars_expr_transformer.process.polars_expr_transformer.classify_tokens')
     @patch('polars_expr_transformer.process.polars_expr_transformer.build_hierarchy')
     @patch('polars_expr_transformer.process.polars_expr_transformer.parse_inline_functions')
     @patch('polars_expr_transformer.process.polars_expr_transformer.finalize_hierarchy')
     def test_build_func_with_mocks(self, mock_finalize, mock_parse, mock_build,
-                                   mock_classify, mock_tokenize, mock_preprocess):
+                                   mock_classify, mock_lex):
         """Test the build_func function with mocked dependencies."""
         # Setup mocks
-        mock_preprocess.return_value = "preprocessed"
-        mock_tokenize.return_value = ["token1", "token2"]
+        mock_lex.return_value = ["token1", "token2"]
         mock_classify.return_value = ["classified1", "classified2"]
         mock_hierarchical = MagicMock()
         mock_build.return_value = mock_hierarchical
@@ -79,8 +77,7 @@ class TestBuildFunc(unittest.TestCase):
         result = build_func("test_func")
 
         # Verify the function call sequence
-        mock_preprocess.assert_called_once_with("test_func")
-        mock_tokenize.assert_called_once_with("preprocessed")
+        mock_lex.assert_called_once_with("test_func")
         mock_classify.assert_called_once_with(["token1", "token2"])
         mock_build.assert_called_once_with(["classified1", "classified2"])
         mock_parse.assert_called_once_with(mock_hierarchical)
@@ -89,19 +86,17 @@ class TestBuildFunc(unittest.TestCase):
         # Verify the result
         self.assertEqual(result, mock_final)
 
-    @patch('polars_expr_transformer.process.polars_expr_transformer.preprocess')
-    @patch('polars_expr_transformer.process.polars_expr_transformer.tokenize')
+    @patch('polars_expr_transformer.process.polars_expr_transformer.lex')
     @patch('polars_expr_transformer.process.polars_expr_transformer.classify_tokens')
     @patch('polars_expr_transformer.process.polars_expr_transformer.build_hierarchy')
     @patch('polars_expr_transformer.process.polars_expr_transformer.parse_inline_functions')
     @patch('polars_expr_transformer.process.polars_expr_transformer.finalize_hierarchy')
     @patch('polars_expr_transformer.process.models.Func.get_pl_func')
     def test_build_func_integration(self, mock_get_pl_func, mock_finalize, mock_parse,
-                                    mock_build, mock_classify, mock_tokenize, mock_preprocess):
+                                    mock_build, mock_classify, mock_lex):
         """Test build_func with minimal mocking to verify integration."""
         # Setup mocks
-        mock_preprocess.return_value = "preprocessed"
-        mock_tokenize.return_value = ["token1", "token2"]
+        mock_lex.return_value = ["token1", "token2"]
         mock_classify.return_value = ["classified1", "classified2"]
 
         # Make get_pl_func return something simple to avoid errors
@@ -117,8 +112,7 @@ class TestBuildFunc(unittest.TestCase):
         result = build_func("test_func")
 
         # Verify basic interactions
-        mock_preprocess.assert_called_once()
-        mock_tokenize.assert_called_once()
+        mock_lex.assert_called_once()
         mock_classify.assert_called_once()
         mock_build.assert_called_once()
         mock_parse.assert_called_once()
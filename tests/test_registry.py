@@ -0,0 +1,55 @@
+import subprocess
+import sys
+
+import pytest
+
+from generate_registry import DEFAULT_OUTPUT, build_registry, render
+from polars_expr_transformer.configs.settings import funcs
+from polars_expr_transformer.funcs import all_functions
+from polars_expr_transformer.funcs.logic_functions import does_not_equal
+from polars_expr_transformer.funcs.registry import FUNCTION_INFO, FunctionRegistry
+
+
+def test_generated_registry_is_up_to_date():
+    assert DEFAULT_OUTPUT.read_text() == render(build_registry()), (
+        "The function registry is out of date; run `python generate_registry.py`."
+    )
+
+
+def test_function_info():
+    assert FUNCTION_INFO["left"] == ("string", 2, 2)
+    assert FUNCTION_INFO["concat"].max_args is None
+    assert FUNCTION_INFO["round"].min_args == 1
+
+
+def test_only_functions_are_registered():
+    assert "pl" not in all_functions
+    assert "partial" not in all_functions
+    assert "__doc__" not in all_functions
+    assert "concat" in all_functions and "_in" in all_functions
+
+
+def test_functions_resolve_on_lookup():
+    assert funcs["does_not_equal"] is does_not_equal
+    assert funcs["not"] is funcs["_not"]
+    assert callable(funcs["pl.Expr.add"])
+    with pytest.raises(KeyError):
+        funcs["no_such_function"]
+
+
+def test_extended_registry_leaves_the_original_unchanged():
+    registry = FunctionRegistry({"left": ("polars_expr_transformer.funcs.string_functions", "left")})
+    extended = registry.extended({"pl.lit": len}, {"lft": "left"})
+    assert set(extended) == {"left", "pl.lit", "lft"}
+    assert extended["lft"] is extended["left"]
+    assert set(registry) == {"left"}
+
+
+def test_function_modules_load_on_first_use():
+    code = (
+        "import sys, polars_expr_transformer as p\n"
+        "assert 'polars_expr_transformer.funcs.date_functions' not in sys.modules\n"
+        "p.simple_function_to_expr('year([d])')\n"
+        "assert 'polars_expr_transformer.funcs.date_functions' in sys.modules\n"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True)
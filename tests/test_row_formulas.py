@@ -0,0 +1,66 @@
+from unittest.mock import patch
+
+import polars as pl
+import pytest
+from polars.testing import assert_frame_equal
+
+from polars_expr_transformer import ExpressionSyntaxError, apply_formula_column, simple_function_to_expr
+
+
+@pytest.fixture
+def df() -> pl.DataFrame:
+    return pl.DataFrame(
+        {
+            "price": [10.0, 20.0, 30.0, 40.0],
+            "rule": ["[price] * 2", "[price] + 1", None, "[price] * 2"],
+        }
+    )
+
+
+def test_apply_formula_column_keeps_row_order(df):
+    result = apply_formula_column(df, "rule", output_column="new_price")
+    expected = df.with_columns(pl.Series("new_price", [20.0, 21.0, None, 80.0]))
+    assert_frame_equal(result, expected)
+
+
+def test_apply_formula_column_compiles_each_formula_once(df):
+    with patch(
+        "polars_expr_transformer.row_formulas.simple_function_to_expr",
+        wraps=simple_function_to_expr,
+    ) as compile_mock:
+        apply_formula_column(df, "rule")
+    assert compile_mock.call_count == 2
+
+
+def test_apply_formula_column_mixed_result_types():
+    df = pl.DataFrame({"n": [1, 2], "rule": ["[n] + 1", 'concat("n=", to_string([n]))']})
+    result = apply_formula_column(df, "rule")
+    assert result["result"].to_list() == ["2", "n=2"]
+
+
+def test_apply_formula_column_invalid_formula(df):
+    bad = df.with_columns(pl.lit("if [price] then 1").alias("rule"))
+    with pytest.raises(ExpressionSyntaxError):
+        apply_formula_column(bad, "rule")
+
+
+def test_apply_formula_column_requires_string_column(df):
+    with pytest.raises(TypeError):
+        apply_formula_column(df, "price")
+
+
+def test_aggregates_and_windows_see_only_the_rows_of_their_formula():
+    df = pl.DataFrame(
+        {
+            "price": [10.0, 20.0, 30.0, 40.0, 50.0],
+            "rule": [
+                "[price] / sum([price])",
+                "cumsum([price])",
+                "[price] / sum([price])",
+                "cumsum([price])",
+                "lag([price])",
+            ],
+        }
+    )
+    result = apply_formula_column(df, "rule")["result"].to_list()
+    assert result == [0.25, 20.0, 0.75, 60.0, None]
@@ -0,0 +1,34 @@
+import pytest
+
+from benchmarks.runtime_benchmark import (
+    CASES,
+    NONDETERMINISTIC,
+    find_slowdowns,
+    make_frame,
+    results_match,
+    run_benchmark,
+)
+from polars_expr_transformer import get_all_expressions
+from polars_expr_transformer.lookup_tables import lookup_table
+
+
+def test_every_function_has_a_reference():
+    assert set(CASES) == set(get_all_expressions())
+
+
+@pytest.mark.parametrize("name", sorted(set(CASES) - NONDETERMINISTIC))
+def test_reference_matches_generated_expression(name):
+    assert results_match(make_frame(500), name)
+
+
+def test_find_slowdowns_uses_threshold():
+    results = run_benchmark(rows=100, repeat=1, only=["abs", "repeat"])
+    results["results"]["abs"].update(generated=0.030, reference=0.010, ratio=3.0)
+    results["results"]["repeat"].update(generated=0.011, reference=0.010, ratio=1.1)
+    assert find_slowdowns(results, threshold=0.2) == ["abs"]
+
+
+def test_lookup_tables_are_registered_only_while_running():
+    assert results_match(make_frame(100), "lookup")
+    with pytest.raises(ValueError, match="Unknown lookup table"):
+        lookup_table("word_lengths")
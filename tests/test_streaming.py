@@ -0,0 +1,210 @@
+import datetime
+
+import polars as pl
+import pytest
+from polars.testing import assert_frame_equal
+
+from polars_expr_transformer import get_all_expressions
+from polars_expr_transformer.lookup_tables import register_lookup_table, unregister_lookup_table
+from polars_expr_transformer.streaming import (
+    build_formula_plan,
+    find_in_memory_fallbacks,
+    scan_source,
+    stream_formulas,
+)
+
+# One representative call per formula function, evaluated against sample_lf().
+SAMPLE_CALLS = {
+    "abs": "abs([num])",
+    "acos": "acos([ratio])",
+    "add_days": "add_days([ts], 5)",
+    "add_hours": "add_hours([ts], 3)",
+    "add_minutes": "add_minutes([ts], 15)",
+    "add_months": "add_months([ts], 2)",
+    "add_seconds": "add_seconds([ts], 30)",
+    "add_weeks": "add_weeks([ts], 2)",
+    "add_years": "add_years([ts], 1)",
+    "asin": "asin([ratio])",
+    "atan": "atan([ratio])",
+    "avg": "avg([num]) over([txt])",
+    "avgif": "avgif([num], [ratio] > 0)",
+    "between": "between([num], 1, 2)",
+    "ceil": "ceil([num])",
+    "coalesce": "coalesce([num], 0)",
+    "concat": 'concat([txt], " ", [txt])',
+    "contains": 'contains([txt], "a")',
+    "cos": "cos([num])",
+    "count": "count() over([txt])",
+    "count_match": 'count_match([txt], "a")',
+    "countif": "countif([ratio] > 0) over([txt])",
+    "cumsum": "cumsum([num])",
+    "date_diff_days": "date_diff_days([ts], [ts])",
+    "date_trim": 'date_trim([ts], "day")',
+    "date_truncate": 'date_truncate([ts], "1d")',
+    "datetime_diff_nanoseconds": "datetime_diff_nanoseconds([ts], [ts])",
+    "datetime_diff_seconds": "datetime_diff_seconds([ts], [ts])",
+    "day": "day([ts])",
+    "dayofweek": "dayofweek([ts])",
+    "dayofyear": "dayofyear([ts])",
+    "does_not_equal": 'does_not_equal([txt], "a")',
+    "end_of_month": "end_of_month([ts])",
+    "ends_with": 'ends_with([txt], "a")',
+    "equals": 'equals([txt], "a")',
+    "exp": "exp([num])",
+    "find_position": 'find_position([txt], "a")',
+    "floor": "floor([num])",
+    "format_date": 'format_date([ts], "%Y")',
+    "greatest": "greatest([num], 1)",
+    "hour": "hour([ts])",
+    "ifnull": "ifnull([num], 0)",
+    "is_empty": "is_empty([txt])",
+    "is_not_empty": "is_not_empty([txt])",
+    "is_string": 'is_string("a")',
+    "lag": "lag([num])",
+    "lead": "lead([num]) over([txt])",
+    "least": "least([num], 1)",
+    "left": "left([txt], 1)",
+    "left_trim": "left_trim([txt])",
+    "length": "length([txt])",
+    "log": "log([num])",
+    "log10": "log10([num])",
+    "log2": "log2([num])",
+    "lookup": 'lookup([txt], "codes", "code")',
+    "lowercase": "lowercase([txt])",
+    "max": "max([num])",
+    "mid": "mid([txt], 0, 1)",
+    "min": "min([num])",
+    "minute": "minute([ts])",
+    "mod": "mod([num], 2)",
+    "month": "month([ts])",
+    "negation": "-[num]",
+    "negative": "negative()",
+    "now": "now()",
+    "nullif": 'nullif([txt], "a")',
+    "nvl": 'nvl([txt], "x")',
+    "order_by": "cumsum([num]) over([txt]) order_by([ts])",
+    "over": "[num] / sum([num]) over([txt])",
+    "pad_left": 'pad_left([txt], 4, "0")',
+    "pad_right": 'pad_right([txt], 4, "0")',
+    "pct_change": "pct_change([num])",
+    "pow": "pow([num], 2)",
+    "power": "power([num], 2)",
+    "quarter": "quarter([ts])",
+    "random_int": "random_int(1, 100)",
+    "rank": "rank([num]) over([txt])",
+    "repeat": "repeat([txt], 2)",
+    "replace": 'replace([txt], "a", "b")',
+    "reverse": "reverse([txt])",
+    "right": "right([txt], 1)",
+    "right_trim": "right_trim([txt])",
+    "rolling_max": "rolling_max([num], 2)",
+    "rolling_mean": "rolling_mean([num], 2)",
+    "rolling_min": "rolling_min([num], 2)",
+    "rolling_sum": "rolling_sum([num], 2)",
+    "round": "round([num], 1)",
+    "row_number": "row_number()",
+    "second": "second([ts])",
+    "sign": "sign([num])",
+    "sin": "sin([num])",
+    "split": 'split([txt], "a")',
+    "sqrt": "sqrt([num])",
+    "start_of_month": "start_of_month([ts])",
+    "starts_with": 'starts_with([txt], "a")',
+    "string_similarity": 'string_similarity([txt], [txt], "levenshtein")',
+    "substring": "substring([txt], 0, 1)",
+    "sum": "sum([num])",
+    "sumif": "sumif([num], [ratio] > 0) over([txt])",
+    "tan": "tan([num])",
+    "tanh": "tanh([num])",
+    "titlecase": "titlecase([txt])",
+    "to_boolean": "to_boolean([num])",
+    "to_date": "to_date([date_txt])",
+    "to_datetime": 'to_datetime([date_txt], "%Y-%m-%d")',
+    "to_decimal": "to_decimal([num], 2)",
+    "to_float": "to_float([num])",
+    "to_integer": "to_integer([num])",
+    "to_number": "to_number([num])",
+    "to_string": "to_string([num])",
+    "today": "today()",
+    "trim": "trim([txt])",
+    "uppercase": "uppercase([txt])",
+    "week": "week([ts])",
+    "weekday": "weekday([ts])",
+    "year": "year([ts])",
+}
+
+# Functions that are known to need the in-memory engine: random_int samples
+# over the whole column, the polars-ds similarity plugins are not streamable and
+# the streaming engine has no rolling windows or pct_change yet.
+KNOWN_IN_MEMORY = {
+    "random_int",
+    "string_similarity",
+    "pct_change",
+    "rolling_max",
+    "rolling_mean",
+    "rolling_min",
+    "rolling_sum",
+}
+
+
+@pytest.fixture(autouse=True)
+def codes():
+    register_lookup_table("codes", pl.DataFrame({"txt": ["abc", "xyz"], "code": [1, 2]}))
+    yield
+    unregister_lookup_table("codes")
+
+
+def sample_lf() -> pl.LazyFrame:
+    return pl.LazyFrame(
+        {
+            "num": [1.5, 2.5],
+            "ratio": [0.0, 0.5],
+            "txt": ["abc", "bca"],
+            "date_txt": ["2024-01-15", "2024-02-15"],
+            "ts": [datetime.datetime(2024, 1, 15, 10), datetime.datetime(2024, 2, 15, 11)],
+        }
+    )
+
+
+def test_sample_calls_cover_every_function():
+    assert set(SAMPLE_CALLS) == set(get_all_expressions())
+
+
+@pytest.mark.parametrize("name", sorted(SAMPLE_CALLS))
+def test_function_lowers_to_streaming_plan(name):
+    lf = build_formula_plan(sample_lf(), {"out": SAMPLE_CALLS[name]})
+    fallbacks = find_in_memory_fallbacks(lf)
+    if fallbacks is None:
+        pytest.skip("Installed Polars cannot report in-memory fallbacks")
+    if name in KNOWN_IN_MEMORY:
+        assert fallbacks
+    else:
+        assert fallbacks == []
+
+
+def test_scan_source_rejects_unknown_suffix():
+    with pytest.raises(ValueError, match="unknown file type"):
+        scan_source("data.xlsx")
+
+
+def test_stream_formulas_round_trip(tmp_path):
+    source = tmp_path / "source.parquet"
+    sample_lf().collect().write_parquet(source)
+    sink = tmp_path / "out.ipc"
+
+    stream_formulas(
+        str(source),
+        {"double": "[num] * 2", "upper": "uppercase([txt])"},
+        sink=sink,
+        filter="[num] > 2",
+    )
+
+    result = pl.read_ipc(sink, memory_map=False).select("double", "upper")
+    assert_frame_equal(result, pl.DataFrame({"double": [5.0], "upper": ["BCA"]}))
+
+
+def test_stream_formulas_warns_on_in_memory_fallback(tmp_path):
+    if find_in_memory_fallbacks(sample_lf()) is None:
+        pytest.skip("Installed Polars cannot report in-memory fallbacks")
+    with pytest.warns(UserWarning, match="streaming engine"):
+        stream_formulas(sample_lf(), {"r": "random_int(1, 5)"}, sink=tmp_path / "out.parquet")
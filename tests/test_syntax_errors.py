@@ -192,6 +192,21 @@ class TestSeparatorOutsideFunction:
         with pytest.raises(ExpressionSyntaxError, match="outside of a function call"):
             simple_function_to_expr('1, 2')
 
+    def test_comma_position(self):
+        with pytest.raises(ExpressionSyntaxError) as exc_info:
+            simple_function_to_expr('[a] + 1, 2')
+        assert exc_info.value.position == 7
+        assert str(exc_info.value).splitlines()[1:3] == ['[a] + 1, 2', '       ^']
+
+
+class TestFunctionWithoutParentheses:
+    def test_position_points_at_function(self):
+        expr = '[a] + concat'
+        with pytest.raises(ExpressionSyntaxError, match="must be called with parentheses") as exc_info:
+            simple_function_to_expr(expr)
+        assert exc_info.value.position == 6
+        assert exc_info.value.expression == expr
+
 
 class TestEmptyValues:
     @pytest.mark.parametrize(
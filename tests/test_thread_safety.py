@@ -0,0 +1,104 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import polars as pl
+import pytest
+
+from polars_expr_transformer import build_func, prepare, simple_function_to_expr, to_polars_code
+from polars_expr_transformer.configs.settings import funcs, operators
+from polars_expr_transformer.function_overview import get_expression_overview
+from polars_expr_transformer.instrumentation import collect_stats
+
+FORMULAS = [
+    '[a] + [b] * 2',
+    'concat("x", to_string([a]), "y")',
+    'if [a] > 2 then "big" elseif [a] > 1 then "mid" else "small" endif',
+    'round([b] / 3, 2)',
+    'uppercase(left([s], 2))',
+    'contains([s], "o") and [a] != 3',
+    '1 + 2 * 3',
+    'coalesce([n], 0) + length([s])',
+]
+
+WORKERS = 16
+ROUNDS = 250
+
+
+@pytest.fixture
+def df() -> pl.DataFrame:
+    return pl.DataFrame(
+        {
+            "a": [1, 2, 3, 4],
+            "b": [1.5, 2.5, 3.5, 4.5],
+            "s": ["foo", "bar", "baz", "qux"],
+            "n": [None, 1, None, 2],
+        }
+    )
+
+
+def _evaluate(df: pl.DataFrame, formula: str) -> list:
+    return df.select(simple_function_to_expr(formula).alias("r"))["r"].to_list()
+
+
+def test_concurrent_compiles_match_serial(df):
+    expected = {formula: _evaluate(df, formula) for formula in FORMULAS}
+    jobs = FORMULAS * ROUNDS
+    with ThreadPoolExecutor(WORKERS) as pool:
+        results = list(pool.map(lambda formula: (formula, _evaluate(df, formula)), jobs))
+    assert len(results) == len(jobs)
+    for formula, result in results:
+        assert result == expected[formula]
+
+
+def test_concurrent_code_generation_matches_serial():
+    expected = {formula: to_polars_code(formula, validate=False) for formula in FORMULAS}
+    with ThreadPoolExecutor(WORKERS) as pool:
+        results = list(
+            pool.map(lambda f: (f, to_polars_code(f, validate=False)), FORMULAS * ROUNDS)
+        )
+    for formula, code in results:
+        assert code == expected[formula]
+
+
+def test_lowering_does_not_change_the_tree():
+    func = build_func('concat("a", [s], 1)')
+    before = func.get_readable_pl_function()
+    args = list(func.args)
+    func.get_pl_func()
+    assert func.args == args
+    assert func.get_readable_pl_function() == before
+
+
+def test_shared_prepared_formula_binds_concurrently(df):
+    rule = prepare('if [a] > :threshold then "high" else "low" endif')
+    expected = {
+        t: df.select(rule.bind(threshold=t).alias("r"))["r"].to_list() for t in range(5)
+    }
+
+    def bind(threshold):
+        return threshold, df.select(rule.bind(threshold=threshold).alias("r"))["r"].to_list()
+
+    with ThreadPoolExecutor(WORKERS) as pool:
+        results = list(pool.map(bind, list(range(5)) * ROUNDS))
+    for threshold, result in results:
+        assert result == expected[threshold]
+
+
+def test_observers_see_every_concurrent_compile():
+    with collect_stats() as stats:
+        with ThreadPoolExecutor(WORKERS) as pool:
+            list(pool.map(build_func, FORMULAS * 20))
+    assert len(stats) == len(FORMULAS) * 20
+    assert all(s.error is None for s in stats)
+
+
+def test_expression_overview_is_built_once():
+    with ThreadPoolExecutor(WORKERS) as pool:
+        overviews = list(pool.map(lambda _: get_expression_overview(), range(100)))
+    assert all(overview is overviews[0] for overview in overviews)
+
+
+def test_registries_are_read_only():
+    with pytest.raises(TypeError):
+        funcs["concat"] = None
+    with pytest.raises(TypeError):
+        operators["^"] = "pl.Expr.pow"
@@ -1,5 +1,5 @@
 from polars_expr_transformer import to_polars_code, simple_function_to_expr, PolarsCodeGenError
-from polars_expr_transformer.process.polars_expr_transformer import _validate_polars_code
+from polars_expr_transformer.process.polars_expr_transformer import _code_shape, _validate_polars_code
 from polars_expr_transformer.process.models import Func, Classifier
 import polars as pl
 from polars.testing import assert_frame_equal
@@ -523,6 +523,50 @@ class TestValidation:
         assert "my_expr" in str(err)
 
 
+class TestFastValidation:
+    """Tests for the "fast" validation mode, which evals each code shape once."""
+
+    def test_fast_mode_returns_same_code(self):
+        assert to_polars_code("[a] + 1", validate="fast") == to_polars_code("[a] + 1")
+
+    def test_fast_mode_raises_on_bad_code(self):
+        with pytest.raises(PolarsCodeGenError) as exc_info:
+            to_polars_code('string_similarity([a], [b], "levenshtein")', validate="fast")
+        assert isinstance(exc_info.value.eval_error, NameError)
+
+    def test_code_shape_blanks_literals(self):
+        assert _code_shape('pl.col("a\\"b").str.slice(1, 25) + pl.lit(1.5)') == (
+            'pl.col("").str.slice(0, 0) + pl.lit(0.0)'
+        )
+        assert _code_shape("pl.col('x').cast(pl.Int64)") == 'pl.col("").cast(pl.Int64)'
+
+    def test_repeated_shape_is_evaluated_once(self, monkeypatch):
+        import polars_expr_transformer.process.polars_expr_transformer as module
+
+        monkeypatch.setattr(module, "_valid_shapes", set())
+        evaluated = []
+        original_eval = eval
+
+        def counting_eval(code, scope):
+            evaluated.append(code)
+            return original_eval(code, scope)
+
+        monkeypatch.setattr(module, "eval", counting_eval, raising=False)
+        for i in range(5):
+            _validate_polars_code("expr", f'pl.col("c{i}") + pl.lit({i})', mode="fast")
+        _validate_polars_code("expr", 'pl.col("c") - pl.lit(1)', mode="fast")
+        assert len(evaluated) == 2
+
+    def test_failed_shape_is_not_cached(self):
+        for _ in range(2):
+            with pytest.raises(PolarsCodeGenError):
+                _validate_polars_code("expr", 'pl.col("x").no_such_method(1)', mode="fast")
+
+    def test_unknown_mode_raises(self):
+        with pytest.raises(ValueError):
+            to_polars_code("[a] + 1", validate="strict")
+
+
 class TestUnknownFunctionWarning:
     """Tests for warnings on unknown function fallback in Func.to_polars_code()."""
 
@@ -539,3 +583,8 @@ class TestUnknownFunctionWarning:
             warning_messages = [str(warning.message) for warning in w]
             assert any("unknown_test_func" in msg for msg in warning_messages)
         assert "unknown_test_func" in result
+
+
+def test_operator_chain_as_method_receiver_is_parenthesized():
+    assert to_polars_code("uppercase([a] + [b])") == '(pl.col("a") + pl.col("b")).str.to_uppercase()'
+    assert to_polars_code("round(([a] / 3), 2)") == '(pl.col("a") / pl.lit(3)).round(2)'
@@ -1,6 +1,7 @@
 import unittest
+from polars_expr_transformer import ExpressionSyntaxError
 from polars_expr_transformer.configs.settings import all_split_vals, all_functions
-from polars_expr_transformer.process.tokenize import tokenize
+from polars_expr_transformer.process.tokenize import Token, lex, tokenize
 from polars_expr_transformer.process.preprocess import preprocess
 
 
@@ -129,3 +130,51 @@ class TestTokenizer(unittest.TestCase):
         formula = ""
         tokens = tokenize(formula)
         self.assertEqual(tokens, [])
+
+
+class TestLex(unittest.TestCase):
+
+    def test_same_tokens_as_preprocess_and_tokenize(self):
+        """lex yields exactly the tokens of preprocess followed by tokenize."""
+        formulas = [
+            'if [a] > 1 AND [b] <= 2 then concat([c], "x  y") elseif [a] == 0 then "z" else -3.5 endif',
+            "[a] != 'q' or [b] = 1 // comment\n + 2",
+            'round([x] * 1.5, 2) + :rate - [ $col ]',
+            'to_date([d], "%Y-%m-%d") >= to_date("2020-01-01")',
+            '[first name] in ("x", "y") and not(is_empty([b]))',
+            'contains([a], "f(") and string_similarity([a], [b]) > .5',
+            '1 < = 2',
+            '[a]and[b]',
+            '',
+        ]
+        for formula in formulas:
+            with self.subTest(formula=formula):
+                self.assertEqual([t.val for t in lex(formula)], tokenize(preprocess(formula)))
+
+    def test_tokens_carry_source_spans(self):
+        """Every token records the span of the source it was lexed from."""
+        formula = 'concat([a], "x") // c'
+        self.assertEqual(lex(formula), [
+            Token('concat', 0, 6), Token('(', 6, 7),
+            Token('pl.col', 7, 10), Token('(', 7, 10), Token('"a"', 7, 10), Token(')', 7, 10),
+            Token(',', 10, 11), Token('"x"', 12, 15), Token(')', 15, 16),
+        ])
+
+    def test_keywords_expand_to_their_span(self):
+        """The tokens a conditional keyword is rewritten to share its span."""
+        tokens = lex('if 1 then 2 else 3 endif')
+        self.assertEqual(tokens[:2], [Token('$if$', 0, 2), Token('(', 0, 2)])
+        self.assertEqual(tokens[3:6], [Token(')', 5, 9), Token('$then$', 5, 9), Token('(', 5, 9)])
+
+    def test_fallback_has_no_positions(self):
+        """Text that preprocessing would merge goes through preprocess and tokenize."""
+        for formula in ['concat(a b)', ':p[a] + 1', '[a]__and__[b]']:
+            with self.subTest(formula=formula):
+                tokens = lex(formula)
+                self.assertEqual([t.val for t in tokens], tokenize(preprocess(formula)))
+                self.assertTrue(all(t.start is None for t in tokens))
+
+    def test_invalid_formula_raises(self):
+        """lex validates the formula in the same scan."""
+        with self.assertRaises(ExpressionSyntaxError):
+            lex('if [a] then 1 else 2')
@@ -0,0 +1,32 @@
+import polars as pl
+
+from polars_expr_transformer.process.polars_expr_transformer import build_func
+from polars_expr_transformer.visualize import explain, generate_visualization, profile_nodes
+
+IF_FORMULA = 'if [code] = 0 then "a" elseif [code] = 1 then repeat(uppercase([txt]), 20) else [txt] endif'
+
+
+def test_explain_annotates_the_visualized_tree():
+    df = pl.DataFrame({"code": [0, 1, 2], "txt": ["x", "y", "z"]})
+    report = explain(IF_FORMULA, df, repeat=1).splitlines()
+    plain = generate_visualization(IF_FORMULA).splitlines()
+
+    assert any("Func: repeat  [" in line for line in report)
+    assert any("IfFunc  [" in line and "3 rows" in line for line in report)
+    assert any(line.endswith("Value: 0 (number)") for line in report)
+    assert all("ms" not in line for line in plain)
+
+
+def test_profile_nodes_finds_expensive_branch():
+    df = pl.DataFrame({"code": list(range(40)) * 250, "txt": ["abc def"] * 10_000})
+    profiles = profile_nodes(build_func(IF_FORMULA), df, repeat=1)
+
+    branches = [p for p in profiles if p.node.__class__.__name__ == "Func"][1:]
+    slowest = max(branches, key=lambda p: p.seconds)
+    assert slowest.node.func_ref.val == "repeat"
+    assert slowest.rows == 10_000
+
+
+def test_explain_on_sample_of_lazy_frame():
+    lf = pl.LazyFrame({"a": list(range(1000))})
+    assert "10 rows" in explain("[a] * 2", lf, sample_rows=10, repeat=1)